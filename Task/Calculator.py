@@ -1,4 +1,25 @@
 # Simple Calculator
+import sys
+
+import calc_expr
+from calc_ops import DIVIDE_BY_ZERO, INVALID_CHOICE, OPERATIONS, calculate
+
+# Expressions on the command line skip the menu (see calc_expr):
+#   python Calculator.py "(3+4)*2^10 / sqrt(16)"     python Calculator.py -i
+# Batch mode works through a file of number columns (see calc_batch), exact
+# mode keeps full precision (see calc_tower), gui opens a window (calc_gui):
+#   python Calculator.py batch divide numbers.csv     python Calculator.py exact 0.1 + 0.2
+if __name__ == "__main__" and len(sys.argv) > 1:
+    if sys.argv[1] == "batch":
+        import calc_batch
+        sys.exit(calc_batch.main(sys.argv[2:]))
+    if sys.argv[1] == "exact":
+        import calc_tower
+        sys.exit(calc_tower.main(sys.argv[2:]))
+    if sys.argv[1] == "gui":
+        import calc_gui
+        sys.exit(calc_gui.main())
+    sys.exit(calc_expr.main(sys.argv[1:]))
 
 # Prompt user for numbers
 num1 = float(input("Enter first number: "))
@@ -6,32 +27,18 @@ num2 = float(input("Enter second number: "))
 
 # Show operation menu
 print("\nChoose operation:")
-print("1. Add")
-print("2. Subtract")
-print("3. Multiply")
-print("4. Divide")
+for key, (name, _) in OPERATIONS.items():
+    print(f"{key}. {name.capitalize()}")
 
 choice = input("Enter choice (1/2/3/4): ")
 
 # Perform calculation
-if choice == "1":
-    result = num1 + num2
-    print("Result:", result)
-
-elif choice == "2":
-    result = num1 - num2
-    print("Result:", result)
-
-elif choice == "3":
-    result = num1 * num2
-    print("Result:", result)
-
-elif choice == "4":
-    if num2 == 0:
-        print("Error: Cannot divide by zero!")
-    else:
-        result = num1 / num2
+if choice in OPERATIONS:
+    try:
+        result = calculate(choice, num1, num2)
         print("Result:", result)
+    except ZeroDivisionError:
+        print(DIVIDE_BY_ZERO)
 
 else:
-    print("Invalid choice! Please choose 1–4.")
+    print(INVALID_CHOICE)
@@ -1,12 +1,21 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageSequence
-import random
 import json
 import os
+import sys
+import time
+import rps_engine
+import rps_strategy
+import tk_latency
+from rps_history import HistoryLog, WIN, LOSE
+from rps_thumbs import ThumbnailLoader
 
 # ----------------- Config -----------------
 SCOREFILE = "rps_scores.json"
+MODELFILE = "rps_model.json"     # learned state of the computer strategy
+STRATEGY = os.environ.get("RPS_STRATEGY", "markov")   # see rps_strategy.STRATEGIES
+HISTORY_BASE = "rps_history"     # rps_history.time/.user/.comp/.result + .json
+SAVE_DELAY_MS = 1000             # rounds played closer together share one save
 
 # Optional images: place in same folder or edit paths below
 ROCK_IMG = "rock.png"          # optional
@@ -15,23 +24,102 @@ SCISSORS_IMG = "scissors.png"  # optional
 
 # Developer-provided uploaded file path (used as home background if present)
 UPLOADED_BG = "/mnt/data/fa450121-4956-43b8-a0f0-35de8dd1a8c7.png"
+
+TICK_MS = 60           # one animation frame for the whole app
+TICK_BUDGET_MS = 8     # animations left over when a tick runs long wait for the next one
+
+# result-page pulse: one dark -> light -> dark cycle, computed once
+PULSE_PALETTE = [f"#{v:02x}{v:02x}{v:02x}"
+                 for v in list(range(32, 72, 2)) + list(range(72, 32, -2))]
 # ------------------------------------------
 
-class RPSApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("SUPER Rock-Paper-Scissors")
-        self.geometry("900x600")
-        self.minsize(780, 520)
-        self.configure(bg="#111")
+
+class AnimationClock:
+    # A single after() timer drives every animation in the app.  Pages
+    # register step functions under a name (registering the same name again
+    # replaces it), only the animations of the raised page run, and the timer
+    # stops completely when there is nothing to run.
+    def __init__(self, widget, interval=TICK_MS, budget=TICK_BUDGET_MS):
+        self.widget = widget
+        self.interval = interval
+        self.budget = budget / 1000
+        self.animations = {}     # page -> {name: step}
+        self.active = None
+        self._job = None
+        self._next = 0           # where a tick cut short by the budget resumes
+
+    def register(self, page, name, step):
+        # step() is called once per tick; returning False ends the animation
+        self.animations.setdefault(page, {})[name] = step
+        self._arm()
+
+    def unregister(self, page, name=None):
+        steps = self.animations.get(page, {})
+        if name is None:
+            steps.clear()
+        else:
+            steps.pop(name, None)
+
+    def set_active(self, page):
+        self.active = page
+        self._next = 0
+        self._arm()
+
+    def pending(self):
+        # number of after() timers this clock has scheduled (0 or 1)
+        return 0 if self._job is None else 1
+
+    def _arm(self):
+        if self._job is None and self.animations.get(self.active):
+            self._job = self.widget.after(self.interval, self._tick)
+
+    def _tick(self):
+        self._job = None
+        steps = self.animations.get(self.active)
+        if steps:
+            items = list(steps.items())
+            n = len(items)
+            deadline = time.perf_counter() + self.budget
+            for i in range(n):
+                name, step = items[(self._next + i) % n]
+                if step() is False:
+                    steps.pop(name, None)
+                if time.perf_counter() > deadline:
+                    self._next = (self._next + i + 1) % n
+                    break
+        self._arm()
+
+class RPSGame(tk.Frame):
+    # the whole game in one frame: RPSApp puts it in a window of its own,
+    # the launcher shows it as one of its pages
+    def __init__(self, parent, on_quit=None):
+        super().__init__(parent, bg="#111")
+        self.on_quit = on_quit    # Quit button; default: save and close the window
+        self.current = None       # the raised page
 
         self.user_score = 0
         self.comp_score = 0
         self.load_scores()
 
+        # computer player, warm-started from its saved model
+        self.strategy = rps_strategy.load_strategy(MODELFILE, STRATEGY)
+
+        # every round played, with running statistics
+        self.history = HistoryLog(HISTORY_BASE)
+        try:
+            self.history.load()
+        except OSError as e:
+            print("History error:", e)
+        self._save_job = None
+
         # image storage to avoid GC
         self._images = {}
-        self._gif_frames = []
+
+        # drives every animation; pages register with it
+        self.clock = AnimationClock(self)
+
+        # resized images come from a disk cache, made on a worker thread
+        self.thumbs = ThumbnailLoader(self)
 
         # create container
         container = tk.Frame(self, bg="#111")
@@ -48,14 +136,12 @@ class RPSApp(tk.Tk):
 
     def show_frame(self, name):
         frame = self.frames[name]
+        if name == "HomePage":
+            frame.refresh_stats()
         frame.tkraise()
-
-    def save_scores(self):
-        try:
-            with open(SCOREFILE, "w", encoding="utf-8") as f:
-                json.dump({"user": self.user_score, "comp": self.comp_score}, f)
-        except Exception as e:
-            print("Save error:", e)
+        # only the raised page animates
+        self.current = frame
+        self.clock.set_active(frame)
 
     def load_scores(self):
         if os.path.exists(SCOREFILE):
@@ -76,17 +162,67 @@ class RPSApp(tk.Tk):
         if "GamePage" in self.frames:
             self.frames["GamePage"].update_scoreboard()
 
-# ---------- utility ----------
-def load_image(path, size=None):
-    if not os.path.exists(path):
-        return None
-    try:
-        img = Image.open(path).convert("RGBA")
-        if size:
-            img = img.resize(size, Image.LANCZOS)
-        return ImageTk.PhotoImage(img)
-    except Exception:
-        return None
+    def save_scores(self):
+        try:
+            with open(SCOREFILE, "w", encoding="utf-8") as f:
+                json.dump({"user": self.user_score, "comp": self.comp_score}, f)
+        except Exception as e:
+            print("Save error:", e)
+
+    def save_model(self):
+        try:
+            rps_strategy.save_strategy(self.strategy, MODELFILE)
+        except Exception as e:
+            print("Save error:", e)
+
+    def schedule_save(self):
+        # one write of scores, model and history for a burst of rounds
+        if self._save_job is None:
+            self._save_job = self.after(SAVE_DELAY_MS, self.save_all)
+
+    def save_all(self):
+        if self._save_job is not None:
+            self.after_cancel(self._save_job)
+            self._save_job = None
+        self.save_scores()
+        self.save_model()
+        try:
+            self.history.flush()
+        except OSError as e:
+            print("Save error:", e)
+
+    def on_show(self):
+        self.clock.set_active(self.current)
+
+    def on_hide(self):
+        # hidden launcher page: no animation ticks, nothing unsaved
+        self.clock.set_active(None)
+        self.save_all()
+
+    def close(self):
+        self.save_all()
+        self.thumbs.close()
+
+    def on_close(self):
+        if self.on_quit is not None:
+            self.on_quit()
+            return
+        self.close()
+        self.winfo_toplevel().destroy()
+
+
+class RPSApp(tk.Tk):
+    # the game in its own window
+    def __init__(self):
+        super().__init__()
+        self.title("SUPER Rock-Paper-Scissors")
+        self.geometry("900x600")
+        self.minsize(780, 520)
+        self.configure(bg="#111")
+        self.game = RPSGame(self)
+        self.game.pack(fill="both", expand=True)
+        self.protocol("WM_DELETE_WINDOW", self.game.on_close)
+
 
 # ---------- Home Page ----------
 class HomePage(tk.Frame):
@@ -94,16 +230,14 @@ class HomePage(tk.Frame):
         super().__init__(parent, bg="#111")
         self.controller = controller
 
-        # Attempt to use uploaded file as decorative background on home if available
+        # Attempt to use uploaded file as decorative background on home if available;
+        # it is rendered at the page size, in the background, whenever that changes
+        self._bg_size = None
+        self._bg_job = None
         if os.path.exists(UPLOADED_BG):
-            try:
-                img = Image.open(UPLOADED_BG).convert("RGBA")
-                img = img.resize((900, 600), Image.LANCZOS)
-                controller._images["home_bg"] = ImageTk.PhotoImage(img)
-                bg_label = tk.Label(self, image=controller._images["home_bg"])
-                bg_label.place(relx=0.5, rely=0.5, anchor="center")
-            except Exception:
-                pass
+            self.bg_label = tk.Label(self, bd=0, bg="#111")
+            self.bg_label.place(relx=0, rely=0, relwidth=1, relheight=1)
+            self.bind("<Configure>", self._on_resize)
 
         # overlay frame so text is readable
         overlay = tk.Frame(self, bg="#000000", bd=0)
@@ -126,7 +260,7 @@ class HomePage(tk.Frame):
         scores_btn = ttk.Button(btn_frame, text="Reset Scores", command=self.confirm_reset)
         scores_btn.grid(row=0, column=1, padx=12, pady=12)
 
-        quit_btn = ttk.Button(btn_frame, text="Quit", command=controller.quit)
+        quit_btn = ttk.Button(btn_frame, text="Quit", command=controller.on_close)
         quit_btn.grid(row=0, column=2, padx=12, pady=12)
 
         # show current scoreboard
@@ -136,10 +270,63 @@ class HomePage(tk.Frame):
                                     fg="#aaf7c7", bg="#111")
         self.score_label.pack(pady=(20, 6))
 
+        # stats from the round history
+        self.stats_label = tk.Label(overlay, text="", font=("Segoe UI", 11),
+                                    fg="#ddd", bg="#111", justify="center")
+        self.stats_label.pack(pady=(6, 4))
+        self.chart = tk.Canvas(overlay, width=400, height=60, bd=0,
+                               highlightthickness=0, bg="#111")
+        self.chart.pack(pady=(0, 10))
+
+    def _on_resize(self, event):
+        # wait until the user stops dragging before rendering a new size
+        if self._bg_job is not None:
+            self.after_cancel(self._bg_job)
+        self._bg_job = self.after(150, self._render_bg, (event.width, event.height))
+
+    def _render_bg(self, size):
+        self._bg_job = None
+        if size == self._bg_size or min(size) < 2:
+            return
+        self._bg_size = size
+        self.controller.thumbs.request(UPLOADED_BG, size,
+                                       lambda photo, size=size: self._set_bg(photo, size))
+
+    def _set_bg(self, photo, size):
+        # results for an older size are dropped
+        if photo is None or size != self._bg_size:
+            return
+        self.controller._images["home_bg"] = photo
+        self.bg_label.config(image=photo)
+
     def _score_text(self):
         c = self.controller
         return f"High Scores — You: {c.user_score}    Computer: {c.comp_score}"
 
+    def refresh_stats(self):
+        # everything here is kept up to date round by round, so this is cheap
+        # however long the history is
+        self.score_label.config(text=self._score_text())
+        s = self.controller.history.stats
+        if not s.rounds:
+            self.stats_label.config(text="No rounds played yet.")
+            self.chart.delete("bar")
+            return
+        streak = {WIN: "wins", LOSE: "losses"}.get(s.streak_kind, "ties")
+        moves = "   ".join(f"{m.capitalize()} {n / s.rounds:.0%}"
+                           for m, n in zip(rps_engine.MOVES, s.user_moves))
+        self.stats_label.config(text=(
+            f"Rounds: {s.rounds:,}    Win rate: {s.win_rate():.1%}    "
+            f"Last {len(s.recent)}: {s.recent_win_rate():.1%}\n"
+            f"Streak: {s.streak} {streak}    Best: {s.best_win} wins, {s.best_lose} losses\n"
+            f"Your moves: {moves}"))
+        # win rate per block of rounds, oldest on the left
+        self.chart.delete("bar")
+        w = 400 / max(len(s.buckets), 1)
+        for i, rate in enumerate(s.buckets):
+            self.chart.create_rectangle(i * w + 1, 60 - rate * 60, (i + 1) * w - 1, 60,
+                                        fill="#7ef0a0", width=0, tags="bar")
+
     def confirm_reset(self):
         if messagebox.askyesno("Reset Scores", "Are you sure you want to reset scores?"):
             self.controller.reset_scores()
@@ -172,19 +359,23 @@ class GamePage(tk.Frame):
         main = tk.Frame(self, bg="#0f0f12")
         main.pack(expand=True, fill="both", padx=20, pady=10)
 
-        # load images if available (fall back to emoji)
-        img_size = (160, 160)
-        rock_img = load_image(ROCK_IMG, img_size) or None
-        paper_img = load_image(PAPER_IMG, img_size) or None
-        scissor_img = load_image(SCISSORS_IMG, img_size) or None
-
         # three columns
         col_frame = tk.Frame(main, bg="#0f0f12")
         col_frame.pack(expand=True)
 
-        self.btn_rock = self._make_choice_button(col_frame, "rock", rock_img)
-        self.btn_paper = self._make_choice_button(col_frame, "paper", paper_img)
-        self.btn_scissors = self._make_choice_button(col_frame, "scissors", scissor_img)
+        self.btn_rock = self._make_choice_button(col_frame, "rock")
+        self.btn_paper = self._make_choice_button(col_frame, "paper")
+        self.btn_scissors = self._make_choice_button(col_frame, "scissors")
+
+        # images if available: the emoji buttons stay until they are loaded
+        img_size = (160, 160)
+        for choice, path, btn in (("rock", ROCK_IMG, self.btn_rock),
+                                  ("paper", PAPER_IMG, self.btn_paper),
+                                  ("scissors", SCISSORS_IMG, self.btn_scissors)):
+            if os.path.exists(path):
+                controller.thumbs.request(
+                    path, img_size,
+                    lambda img, c=choice, b=btn: self._set_choice_image(b, c, img))
 
         # quick instructions
         instr = tk.Label(self, text="Choose your move — first click registers your selection.",
@@ -195,38 +386,45 @@ class GamePage(tk.Frame):
         self.round_label = tk.Label(self, text="", font=("Segoe UI", 14, "bold"), fg="#ffd37f", bg="#0f0f12")
         self.round_label.pack(pady=4)
 
-    def _make_choice_button(self, parent, choice, img):
+    def _make_choice_button(self, parent, choice):
         frame = tk.Frame(parent, bg="#0f0f12", padx=20)
         frame.pack(side="left", padx=8)
-        if img:
-            btn = tk.Button(frame, image=img, text=choice.capitalize(), compound="top",
-                            font=("Segoe UI", 10, "bold"), command=lambda c=choice: self.play_round(c),
-                            bd=2, relief="ridge", bg="#121218", fg="white", activebackground="#2a2a33")
-            # keep reference so not GC'd
-            self.controller._images[f"{choice}_img"] = img
-        else:
-            # fallback big emoji
-            btn = tk.Button(frame, text=f"{self.EMOJI[choice]}\n{choice.capitalize()}",
-                            font=("Segoe UI", 18), width=8, height=4,
-                            command=lambda c=choice: self.play_round(c),
-                            bd=2, relief="ridge", bg="#121218", fg="white", activebackground="#2a2a33")
+        # big emoji, replaced by the image once it has loaded
+        btn = tk.Button(frame, text=f"{self.EMOJI[choice]}\n{choice.capitalize()}",
+                        font=("Segoe UI", 18), width=8, height=4,
+                        command=lambda c=choice: self.play_round(c),
+                        bd=2, relief="ridge", bg="#121218", fg="white", activebackground="#2a2a33")
         btn.pack()
         return btn
 
+    def _set_choice_image(self, btn, choice, img):
+        if img is None:
+            return
+        # keep reference so not GC'd
+        self.controller._images[f"{choice}_img"] = img
+        # width/height count pixels once there is an image
+        btn.config(image=img, text=choice.capitalize(), compound="top",
+                   font=("Segoe UI", 10, "bold"), width=0, height=0)
+
     def update_scoreboard(self):
         c = self.controller
         self.scoreboard.config(text=f"Score — You: {c.user_score}    Computer: {c.comp_score}")
 
     def play_round(self, user_choice):
-        comp_choice = random.choice(self.CHOICES)
+        strategy = self.controller.strategy
+        comp_code = strategy.choose()
+        comp_choice = rps_engine.MOVES[comp_code]
         result = self.judge(user_choice, comp_choice)
+        user_code = rps_engine.CODE[user_choice]
+        strategy.observe(user_code, comp_code)
+        self.controller.history.record(user_code, comp_code, (user_code - comp_code) % 3)
 
         # update scores
         if result == "win":
             self.controller.user_score += 1
         elif result == "lose":
             self.controller.comp_score += 1
-        self.controller.save_scores()
+        self.controller.schedule_save()
         self.update_scoreboard()
 
         # show brief result then go to ResultPage with details
@@ -245,14 +443,8 @@ class GamePage(tk.Frame):
 
     @staticmethod
     def judge(user, comp):
-        if user == comp:
-            return "tie"
-        wins = {
-            "rock": "scissors",
-            "scissors": "paper",
-            "paper": "rock"
-        }
-        return "win" if wins[user] == comp else "lose"
+        # (user - comp) % 3 on move codes, see rps_engine
+        return rps_engine.judge(user, comp)
 
 # ---------- Result Page ----------
 class ResultPage(tk.Frame):
@@ -299,8 +491,7 @@ class ResultPage(tk.Frame):
         self.summary.pack(pady=(8,20))
 
         # for animation
-        self._pulse_dir = 1
-        self._pulse_step = 0
+        self._pulse_index = 0
 
     def set_round(self, user_choice, comp_choice, result):
         # show choices (use images if available)
@@ -324,27 +515,17 @@ class ResultPage(tk.Frame):
         c = self.controller
         self.summary.config(text=f"Scoreboard — You: {c.user_score}    Computer: {c.comp_score}")
 
-        # start pulsing animation
-        self._pulse_step = 0
-        self._pulse_dir = 1
-        self.animate_pulse()
+        # (re)start the pulse; the clock keeps a single pulse per page
+        self._pulse_index = 0
+        self.controller.clock.register(self, "pulse", self.animate_pulse)
 
     def animate_pulse(self):
-        # simple pulsing by changing rectangle color intensity
-        self._pulse_step += self._pulse_dir * 2
-        if self._pulse_step > 40:
-            self._pulse_dir = -1
-        if self._pulse_step < 0:
-            self._pulse_dir = 1
-        # map step to color
-        intensity = 30 + self._pulse_step
-        color = f"#{intensity:02x}{intensity:02x}{intensity:02x}"
+        # simple pulsing by stepping through the precomputed color ramp
+        self._pulse_index = (self._pulse_index + 1) % len(PULSE_PALETTE)
         try:
-            self.canvas.itemconfig(self.rect, fill=color)
-        except Exception:
-            pass
-        # continue animation for a while
-        self.after(60, self.animate_pulse)
+            self.canvas.itemconfig(self.rect, fill=PULSE_PALETTE[self._pulse_index])
+        except tk.TclError:
+            return False
 
     def play_again(self):
         # go back to Game page for another round
@@ -353,5 +534,7 @@ class ResultPage(tk.Frame):
 
 # ---------- Run App ----------
 if __name__ == "__main__":
+    tk_latency.install(sys.argv)    # TK_LATENCY=1 or --latency[=overlay]
     app = RPSApp()
+    tk_latency.attach(app)
     app.mainloop()
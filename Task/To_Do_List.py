@@ -1,133 +1,380 @@
-import json
+import csv
 import os
+import sqlite3
+import sys
+import time
+from datetime import datetime
 from tkinter import *
-from tkinter import ttk, messagebox
-from PIL import Image, ImageTk, ImageSequence
+from tkinter import ttk, messagebox, filedialog
+import task_io
+import tk_latency
+from task_images import open_image
+from task_journal import Journal, OTHER, apply_record
+from task_sqlite import SqliteStore
+from task_schedule import SORT_KEYS, ScheduleIndex
+from task_search import SearchIndex
+from task_store import TaskStore
+from task_undo import UndoHistory
+from task_writer import BackgroundWriter
+from task_view import VirtualList
 
 # ---------- Config ----------
 DATA_FILE = "tasks.json"
+DB_FILE = "tasks.db"
+STORAGE = os.environ.get("TODO_STORAGE", "journal")   # "journal" or "sqlite"
+SAVE_DEBOUNCE_MS = 250     # bursts of edits closer than this become one write
 ICON_IMAGE = "anime_icon.jpg"
 GIF_IMAGE = "anime_wave.gif"
+PRIORITIES = ["None", "Low", "Medium", "High"]   # stored as 0..3
+DUE_FORMATS = ("%Y-%m-%d %H:%M", "%Y-%m-%d")
+MAX_TIMER_S = 3600         # re-arm the reminder timer at least this often
+UNDO_BUDGET = 1 << 20      # bytes of undo/redo history, however many steps that is
 # -----------------------------
 
-root = Tk()
-root.title("SUPER To-Do — Anime Edition")
-root.geometry("900x600")
-root.minsize(820, 520)
 
-root.configure(bg="#1a1a1a")  # Dark background
+def make_backend():
+    if STORAGE == "sqlite":
+        return SqliteStore(DB_FILE, json_path=DATA_FILE)
+    return Journal(DATA_FILE)
+
+
+# Widgets and state, set up by build(); the functions below use them.
+root = None              # the Tk root, shared with the launcher's other pages
+page = None              # the frame holding the to-do UI
+icon = gif = gif_label = None
+entry = search_var = priority_var = due_var = sort_var = status = None
+pending_listbox = completed_listbox = None
+views = {}
+store = journal = writer = search = schedule = history = None
 
 
 # ---------- ICON ----------
 def load_icon():
+    img = open_image(ICON_IMAGE, (60, 60))
     try:
-        img = Image.open(ICON_IMAGE).convert("RGBA")
-        img = img.resize((60, 60))
-        return ImageTk.PhotoImage(img)
-    except:
+        return img.frame(0) if img else None
+    except (OSError, EOFError):
         return None
 
 
-icon = load_icon()
-
-
-# ---------- HEADER ----------
-title_frame = Frame(root, bg="#1a1a1a")
-title_frame.pack(fill=X, pady=10)
-
-if icon:
-    Label(title_frame, image=icon, bg="#1a1a1a").pack(side=LEFT, padx=10)
-
-Label(title_frame,
-      text="SUPER TO-DO LIST",
-      font=("Segoe UI", 26, "bold"),
-      fg="white",
-      bg="#1a1a1a").pack(side=LEFT)
-
-# ---------- ENTRY + BUTTONS ----------
-control = Frame(root, bg="#1a1a1a")
-control.pack(fill=X, pady=10)
-
-entry = ttk.Entry(control, width=50, font=("Segoe UI", 12))
-entry.grid(row=0, column=0, padx=10)
-
-btn_add = ttk.Button(control, text="Add")
-btn_edit = ttk.Button(control, text="Edit")
-
-btn_add.grid(row=0, column=1, padx=5)
-btn_edit.grid(row=0, column=2, padx=5)
-
-# ---------- MAIN AREA ----------
-area = Frame(root, bg="#1a1a1a")
-area.pack(fill=BOTH, expand=True)
-
-# Pending panel
-pending_panel = Frame(area, bg="#1a1a1a")
-pending_panel.pack(side=LEFT, fill=BOTH, expand=True, padx=20)
-
-Label(pending_panel, text="Pending Tasks",
-      font=("Segoe UI", 14, "bold"),
-      fg="white", bg="#1a1a1a").pack(anchor="w")
-
-pending_listbox = Listbox(pending_panel, font=("Segoe UI", 12),
-                          bg="#2b2b2b", fg="white",
-                          selectbackground="#6fa8dc")
-pending_listbox.pack(fill=BOTH, expand=True, pady=10)
-
-# Completed panel
-completed_panel = Frame(area, bg="#1a1a1a")
-completed_panel.pack(side=RIGHT, fill=BOTH, expand=True, padx=20)
-
-Label(completed_panel, text="Completed",
-      font=("Segoe UI", 14, "bold"),
-      fg="#90ff9c", bg="#1a1a1a").pack(anchor="w")
-
-completed_listbox = Listbox(completed_panel, font=("Segoe UI", 12),
-                            bg="#2b2b2b", fg="#90ff9c",
-                            selectbackground="#9fe6b0")
-completed_listbox.pack(fill=BOTH, expand=True, pady=10)
-
-# ---------- BOTTOM BUTTONS ----------
-bottom = Frame(root, bg="#1a1a1a")
-bottom.pack(pady=10)
-
-btn_comp = ttk.Button(bottom, text="→ Mark Completed")
-btn_pend = ttk.Button(bottom, text="← Move to Pending")
-btn_del = ttk.Button(bottom, text="Delete")
-
-btn_comp.grid(row=0, column=0, padx=10)
-btn_pend.grid(row=0, column=1, padx=10)
-btn_del.grid(row=0, column=2, padx=10)
+def task_label(task):
+    label = task.text
+    if task.priority:
+        label = "!" * task.priority + " " + label
+    if task.due is not None:
+        label += time.strftime("  (due %Y-%m-%d %H:%M)", time.localtime(task.due))
+    return label
+
+
+# ---------- UI ----------
+def build(parent):
+    # the whole to-do UI in a new frame inside parent (a Tk root or a
+    # launcher page); the caller packs it
+    global root, page, icon, entry, search_var, priority_var, due_var, sort_var, status
+    global pending_listbox, completed_listbox, views, store, journal, writer, search, schedule
+    global history
+    global gif, gif_label
+    root = parent.winfo_toplevel()
+    page = Frame(parent, bg="#1a1a1a")
+    icon = load_icon()
+
+    # ---------- HEADER ----------
+    title_frame = Frame(page, bg="#1a1a1a")
+    title_frame.pack(fill=X, pady=10)
+
+    if icon:
+        Label(title_frame, image=icon, bg="#1a1a1a").pack(side=LEFT, padx=10)
+
+    Label(title_frame,
+          text="SUPER TO-DO LIST",
+          font=("Segoe UI", 26, "bold"),
+          fg="white",
+          bg="#1a1a1a").pack(side=LEFT)
+
+    # ---------- ENTRY + BUTTONS ----------
+    control = Frame(page, bg="#1a1a1a")
+    control.pack(fill=X, pady=10)
+
+    entry = ttk.Entry(control, width=50, font=("Segoe UI", 12))
+    entry.grid(row=0, column=0, padx=10)
+
+    btn_add = ttk.Button(control, text="Add")
+    btn_edit = ttk.Button(control, text="Edit")
+
+    btn_add.grid(row=0, column=1, padx=5)
+    btn_edit.grid(row=0, column=2, padx=5)
+
+    search_var = StringVar()
+    Label(control, text="Search", font=("Segoe UI", 11),
+          fg="white", bg="#1a1a1a").grid(row=1, column=0, sticky="w", padx=10, pady=(8, 0))
+    search_entry = ttk.Entry(control, width=50, font=("Segoe UI", 12), textvariable=search_var)
+    search_entry.grid(row=2, column=0, padx=10)
+
+    priority_var = StringVar(value=PRIORITIES[0])
+    due_var = StringVar()
+    Label(control, text="Priority", font=("Segoe UI", 11),
+          fg="white", bg="#1a1a1a").grid(row=1, column=1, sticky="w", pady=(8, 0))
+    Label(control, text="Due (YYYY-MM-DD HH:MM)", font=("Segoe UI", 11),
+          fg="white", bg="#1a1a1a").grid(row=1, column=2, columnspan=2, sticky="w", pady=(8, 0))
+    ttk.Combobox(control, textvariable=priority_var, values=PRIORITIES,
+                 state="readonly", width=8).grid(row=2, column=1, padx=5)
+    ttk.Entry(control, textvariable=due_var, width=16,
+              font=("Segoe UI", 12)).grid(row=2, column=2, padx=5)
+    btn_schedule = ttk.Button(control, text="Set")
+    btn_schedule.grid(row=2, column=3, padx=5)
+
+    # ---------- MAIN AREA ----------
+    area = Frame(page, bg="#1a1a1a")
+    area.pack(fill=BOTH, expand=True)
+
+    # Pending panel
+    pending_panel = Frame(area, bg="#1a1a1a")
+    pending_panel.pack(side=LEFT, fill=BOTH, expand=True, padx=20)
+
+    pending_head = Frame(pending_panel, bg="#1a1a1a")
+    pending_head.pack(fill=X)
+
+    Label(pending_head, text="Pending Tasks",
+          font=("Segoe UI", 14, "bold"),
+          fg="white", bg="#1a1a1a").pack(side=LEFT)
+
+    sort_var = StringVar(value="Added")
+    ttk.Combobox(pending_head, textvariable=sort_var, values=["Added", "Priority", "Due"],
+                 state="readonly", width=9).pack(side=RIGHT)
+    Label(pending_head, text="Sort by", font=("Segoe UI", 11),
+          fg="white", bg="#1a1a1a").pack(side=RIGHT, padx=5)
+
+    pending_listbox = VirtualList(pending_panel, font=("Segoe UI", 12),
+                                  bg="#2b2b2b", fg="white",
+                                  selectbackground="#6fa8dc",
+                                  text_of=task_label)
+    pending_listbox.pack(fill=BOTH, expand=True, pady=10)
+
+    # Completed panel
+    completed_panel = Frame(area, bg="#1a1a1a")
+    completed_panel.pack(side=RIGHT, fill=BOTH, expand=True, padx=20)
+
+    Label(completed_panel, text="Completed",
+          font=("Segoe UI", 14, "bold"),
+          fg="#90ff9c", bg="#1a1a1a").pack(anchor="w")
+
+    completed_listbox = VirtualList(completed_panel, font=("Segoe UI", 12),
+                                    bg="#2b2b2b", fg="#90ff9c",
+                                    selectbackground="#9fe6b0",
+                                    text_of=task_label)
+    completed_listbox.pack(fill=BOTH, expand=True, pady=10)
+
+    # ---------- BOTTOM BUTTONS ----------
+    bottom = Frame(page, bg="#1a1a1a")
+    bottom.pack(pady=10)
+
+    btn_comp = ttk.Button(bottom, text="→ Mark Completed")
+    btn_pend = ttk.Button(bottom, text="← Move to Pending")
+    btn_del = ttk.Button(bottom, text="Delete")
+    btn_import = ttk.Button(bottom, text="Import…")
+    btn_export = ttk.Button(bottom, text="Export…")
+    btn_undo = ttk.Button(bottom, text="Undo")
+    btn_redo = ttk.Button(bottom, text="Redo")
+
+    btn_comp.grid(row=0, column=0, padx=10)
+    btn_pend.grid(row=0, column=1, padx=10)
+    btn_del.grid(row=0, column=2, padx=10)
+    btn_import.grid(row=0, column=3, padx=10)
+    btn_export.grid(row=0, column=4, padx=10)
+    btn_undo.grid(row=0, column=5, padx=(20, 5))
+    btn_redo.grid(row=0, column=6, padx=5)
+
+    status = Label(bottom, text="", font=("Segoe UI", 10), fg="#aaaaaa", bg="#1a1a1a")
+    status.grid(row=1, column=0, columnspan=7, pady=(6, 0))
+
+    # The TaskStore is the only copy of the data; the list views and the
+    # persistence backend both follow its change events.
+    store = TaskStore()
+    views = {"pending": pending_listbox, "completed": completed_listbox}
+    journal = make_backend()
+    writer = BackgroundWriter(journal, debounce=SAVE_DEBOUNCE_MS / 1000)
+    # load saved tasks before anything is bound to the shared root, so a
+    # backend that cannot be read leaves nothing behind
+    load_tasks()
+
+    # Bind button functions
+    btn_add.config(command=add_task)
+    btn_edit.config(command=edit_task)
+    btn_schedule.config(command=schedule_task)
+    btn_comp.config(command=mark_completed)
+    btn_pend.config(command=mark_pending)
+    btn_del.config(command=delete_task)
+    btn_import.config(command=import_file)
+    btn_export.config(command=export_file)
+    btn_undo.config(command=undo)
+    btn_redo.config(command=redo)
+
+    def shortcut(action):
+        # the root is shared with the launcher's other pages
+        return lambda event: action() if page.winfo_ismapped() else None
+    root.bind("<Control-z>", shortcut(undo), add="+")
+    root.bind("<Control-y>", shortcut(redo), add="+")
+    root.bind("<Control-Z>", shortcut(redo), add="+")     # Ctrl+Shift+Z
+
+    # animated GIF, decoded lazily (see task_images)
+    gif = open_image(GIF_IMAGE, (120, 120))
+    if gif:
+        gif_label = Label(page, bg="#1a1a1a")
+        gif_label.place(x=760, y=420)
+        root.bind("<Map>", resume_animation, add="+")
+        page.bind("<Map>", resume_animation, add="+")
+        animate()
+
+    for state, view in views.items():
+        view.set_items(store.tasks_in(state))
+    search = SearchIndex(store)
+    schedule = ScheduleIndex(store)
+    # user actions go through the history; imports and remote merges do not
+    history = UndoHistory(store, UNDO_BUDGET)
+    search_var.trace_add("write", apply_filter)
+    sort_var.trace_add("write", apply_filter)
+    store.subscribe(update_views)
+    # on its own, so the reminder follows every change whatever the views do
+    store.subscribe(lambda event, task: arm_reminder())
+    store.subscribe(writer.submit)
+    writer.start(store)
+    poll_writer()
+    arm_reminder()
+    return page
 
 
 # ---------- TASK FUNCTIONS ----------
 def load_tasks():
-    if not os.path.exists(DATA_FILE):
-        return {"pending": [], "completed": []}
-    try:
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    except:
-        return {"pending": [], "completed": []}
-
-
-def save_tasks():
-    data = {
-        "pending": list(pending_listbox.get(0, END)),
-        "completed": list(completed_listbox.get(0, END))
-    }
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+    # snapshot + replay of the journal tail
+    if hasattr(journal, "reserve_ids"):
+        store.id_block = journal.reserve_ids
+    # errors are not caught: an empty store over a backend that still holds
+    # tasks would hand out ids that are already taken
+    journal.load(store)
+    return store
+
+
+def poll_writer():
+    # the writer thread cannot touch Tk, so its failures and the changes it
+    # merged from other instances are picked up here
+    errors = writer.poll_errors()
+    if errors:
+        messagebox.showerror("Save error", str(errors[-1]))
+    records = writer.poll_remote()
+    if records:
+        merge_remote(records)
+    root.after(500, poll_writer)
+
+
+def merge_remote(records):
+    with writer.suspended():
+        for rec in records:
+            try:
+                apply_record(store, rec, notify=True)
+            except (KeyError, StopIteration):
+                pass
+
+
+def sort_order():
+    # "priority", "due", or None for the order the tasks were added
+    order = sort_var.get().lower()
+    return order if order in SORT_KEYS else None
+
+
+def update_views(event, task):
+    if search_var.get().strip():
+        apply_filter()
+        return
+    # when sorted, the pending view reads straight from the schedule index,
+    # which has already seen this event
+    live = {"pending"} if sort_order() else set()
+    op = event["op"]
+    if op == "add":
+        if task.state not in live:
+            insert_row(views[task.state], event, task)
+    elif op == "add_many":
+        for state, view in views.items():
+            if state not in live:
+                view.extend([t for t in task if t.state == state])
+    elif op in ("edit", "schedule"):
+        views[task.state].redraw()
+    elif op == "move":
+        if OTHER[task.state] not in live:
+            views[OTHER[task.state]].remove_item(task)
+        if task.state not in live:
+            insert_row(views[task.state], event, task)
+    elif op == "delete":
+        if task.state not in live:
+            views[task.state].remove_item(task)
+    if live:
+        pending_listbox.refresh()
+
+
+def insert_row(view, event, task):
+    # at the end, or in front of the task it was put back before (undo)
+    index = END
+    if "before" in event:
+        try:
+            index = view.index_of(store.get(event["before"]))
+        except (KeyError, ValueError):
+            pass
+    view.insert(index, task)
+
+
+def apply_filter(*args):
+    # show only the tasks matching the search box (runs on every keystroke)
+    ids = search.search(search_var.get())
+    order = sort_order()
+    if ids is None:
+        for state, view in views.items():
+            if state == "pending" and order:
+                view.set_model(schedule.view(order))
+            else:
+                view.set_items(store.tasks_in(state))
+        return
+    shown = {state: [] for state in views}
+    for task in store.in_order(ids):
+        shown[task.state].append(task)
+    if order:
+        shown["pending"].sort(key=SORT_KEYS[order])
+    for state, view in views.items():
+        view.set_items(shown[state])
+
+
+def read_schedule():
+    # (priority, due timestamp or None) from the entry fields, or None if the
+    # date cannot be parsed
+    priority = PRIORITIES.index(priority_var.get())
+    text = due_var.get().strip()
+    if not text:
+        return priority, None
+    for fmt in DUE_FORMATS:
+        try:
+            return priority, datetime.strptime(text, fmt).timestamp()
+        except ValueError:
+            continue
+    messagebox.showwarning("Warning", "Due date must look like 2024-12-31 18:00")
+    return None
+
+
+def selected_task(*states):
+    for state in states:
+        sel = views[state].curselection()
+        if sel:
+            return views[state].get(sel[0])
+    return None
 
 
 def add_task():
-    task = entry.get().strip()
-    if not task:
+    text = entry.get().strip()
+    if not text:
         messagebox.showwarning("Warning", "Enter a task!")
         return
-    pending_listbox.insert(END, task)
+    fields = read_schedule()
+    if fields is None:
+        return
+    history.do({"op": "add", "text": text, "priority": fields[0], "due": fields[1]})
     entry.delete(0, END)
-    save_tasks()
 
 
 def edit_task():
@@ -136,97 +383,223 @@ def edit_task():
         messagebox.showwarning("Warning", "Type new text")
         return
 
-    if pending_listbox.curselection():
-        idx = pending_listbox.curselection()[0]
-        pending_listbox.delete(idx)
-        pending_listbox.insert(idx, new)
-    elif completed_listbox.curselection():
-        idx = completed_listbox.curselection()[0]
-        completed_listbox.delete(idx)
-        completed_listbox.insert(idx, new)
-    else:
+    task = selected_task("pending", "completed")
+    if task is None:
         messagebox.showwarning("Warning", "Select a task")
         return
 
+    history.do({"op": "edit", "id": task.id, "text": new})
     entry.delete(0, END)
-    save_tasks()
+
+
+def schedule_task():
+    task = selected_task("pending", "completed")
+    if task is None:
+        messagebox.showwarning("Warning", "Select a task")
+        return
+    fields = read_schedule()
+    if fields is not None:
+        history.do({"op": "schedule", "id": task.id, "priority": fields[0], "due": fields[1]})
 
 
 def mark_completed():
-    if not pending_listbox.curselection():
+    task = selected_task("pending")
+    if task is None:
         messagebox.showwarning("Warning", "Select a pending task")
         return
-    idx = pending_listbox.curselection()[0]
-    task = pending_listbox.get(idx)
-    pending_listbox.delete(idx)
-    completed_listbox.insert(END, task)
-    save_tasks()
+    history.do({"op": "move", "id": task.id, "state": "completed"})
 
 
 def mark_pending():
-    if not completed_listbox.curselection():
+    task = selected_task("completed")
+    if task is None:
         messagebox.showwarning("Warning", "Select a completed task")
         return
-    idx = completed_listbox.curselection()[0]
-    task = completed_listbox.get(idx)
-    completed_listbox.delete(idx)
-    pending_listbox.insert(END, task)
-    save_tasks()
+    history.do({"op": "move", "id": task.id, "state": "pending"})
 
 
 def delete_task():
-    if pending_listbox.curselection():
-        pending_listbox.delete(pending_listbox.curselection()[0])
-    elif completed_listbox.curselection():
-        completed_listbox.delete(completed_listbox.curselection()[0])
-    else:
+    task = selected_task("pending", "completed")
+    if task is None:
         messagebox.showwarning("Warning", "Select a task")
         return
-    save_tasks()
+    history.do({"op": "delete", "id": task.id})
 
 
-# Bind button functions
-btn_add.config(command=add_task)
-btn_edit.config(command=edit_task)
-btn_comp.config(command=mark_completed)
-btn_pend.config(command=mark_pending)
-btn_del.config(command=delete_task)
+def undo():
+    # each step is one inverse event, saved like any other change
+    task = history.undo()
+    status.config(text="Nothing to undo" if task is None else f"Undone: {task.text}")
 
 
-# ---------- GIF ANIMATION ----------
-gif_frames = []
-gif_index = 0
+def redo():
+    task = history.redo()
+    status.config(text="Nothing to redo" if task is None else f"Redone: {task.text}")
+
+
+# ---------- REMINDERS ----------
+# One root.after() timer, armed for the earliest due task; it is moved only
+# when that changes.
+reminder_job = None
+reminder_at = None
+
+
+def arm_reminder():
+    global reminder_job, reminder_at
+    due = schedule.next_due()
+    if due == reminder_at and reminder_job is not None:
+        return
+    if reminder_job is not None:
+        root.after_cancel(reminder_job)
+        reminder_job = None
+    reminder_at = due
+    if due is not None:
+        delay = min(max(due - time.time(), 0), MAX_TIMER_S)
+        reminder_job = root.after(int(delay * 1000), fire_reminders)
+
+
+def fire_reminders():
+    global reminder_job
+    reminder_job = None
+    due = schedule.pop_due(time.time())
+    arm_reminder()
+    if due:
+        messagebox.showinfo("Reminder", "Due now:\n" + "\n".join(t.text for t in due))
 
-if os.path.exists(GIF_IMAGE):
+
+# ---------- IMPORT / EXPORT ----------
+FILE_TYPES = [("CSV", "*.csv"), ("JSON Lines", "*.jsonl *.ndjson"), ("All files", "*.*")]
+
+
+def run_steps(steps, f, verb, done=None, total=0):
+    # advance an import/export generator by one batch per event-loop turn;
+    # the file is closed however the run ends
+    finished = True
+    try:
+        total = next(steps)
+        finished = False
+    except StopIteration:
+        status.config(text=f"{verb} {total} tasks")
+        if done:
+            done()
+    except (OSError, ValueError, csv.Error) as e:
+        status.config(text="")
+        messagebox.showerror(f"{verb} failed", str(e))
+    finally:
+        if finished:
+            f.close()
+    if not finished:
+        status.config(text=f"{verb} {total} tasks…")
+        root.after(1, run_steps, steps, f, verb, done, total)
+
+
+def open_file(path, mode, verb):
+    # the opened file, or None after telling the user why not
     try:
-        gif = Image.open(GIF_IMAGE)
-        for frame in ImageSequence.Iterator(gif):
-            f = frame.convert("RGBA").resize((120, 120))
-            gif_frames.append(ImageTk.PhotoImage(f))
-    except:
-        gif_frames = []
+        return open(path, mode, encoding="utf-8", newline="")
+    except OSError as e:
+        messagebox.showerror(f"{verb} failed", str(e))
+        return None
 
-gif_label = None
 
-def animate():
-    global gif_index
-    if gif_frames:
-        gif_label.config(image=gif_frames[gif_index])
-        gif_index = (gif_index + 1) % len(gif_frames)
-    root.after(120, animate)
+def import_file():
+    path = filedialog.askopenfilename(filetypes=FILE_TYPES)
+    if not path:
+        return
+    f = open_file(path, "r", "Import")
+    if f is None:
+        return
+    steps = task_io.import_batches(store, f, task_io.detect_format(path))
+    # one snapshot once everything is in, without waiting for it here
+    run_steps(steps, f, "Imported", done=lambda: writer.flush(wait=False))
+
 
+def export_file():
+    path = filedialog.asksaveasfilename(filetypes=FILE_TYPES, defaultextension=".csv")
+    if not path:
+        return
+    f = open_file(path, "w", "Export")
+    if f is None:
+        return
+    run_steps(task_io.export_rows(store, f, task_io.detect_format(path)), f, "Exported")
 
-if gif_frames:
-    gif_label = Label(root, bg="#1a1a1a")
-    gif_label.place(x=760, y=420)
-    animate()
 
+# ---------- GIF ANIMATION ----------
+# frames are decoded when first shown, each for its own duration, and the
+# timer stops while the page is hidden or the window is minimized
+gif_index = 0
+gif_job = None
 
-# ---------- Load saved tasks ----------
-saved = load_tasks()
-for t in saved["pending"]:
-    pending_listbox.insert(END, t)
-for t in saved["completed"]:
-    completed_listbox.insert(END, t)
 
-root.mainloop()
+def animate():
+    global gif_index, gif_job
+    gif_job = None
+    if root.state() == "iconic" or not page.winfo_ismapped():
+        return                     # <Map> restarts it
+    try:
+        gif_label.config(image=gif.frame(gif_index))
+        delay = gif.duration(gif_index)
+        gif_index = (gif_index + 1) % gif.n_frames
+        gif_job = root.after(delay, animate)
+    except (OSError, EOFError):
+        return                     # truncated file: keep the last good frame
+    root.after_idle(prefetch_frame, gif_index)
+
+
+def prefetch_frame(index):
+    # still on the Tk thread, but once this frame has been drawn and the
+    # pending events handled, instead of inside the tick that shows it
+    try:
+        gif.prefetch(index)
+    except (OSError, EOFError):
+        pass                       # animate() hits the same error and stops
+
+
+def resume_animation(event):
+    if event.widget in (root, page) and gif_job is None:
+        animate()
+
+
+def close():
+    # stop the writer and report anything it could not save
+    try:
+        writer.close()
+    except (OSError, sqlite3.Error):
+        pass
+    for e in writer.poll_errors():
+        print("Save error:", e)
+    if writer.mutations:
+        print(writer.summary())
+
+
+def on_close():
+    close()
+    root.destroy()
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    # TK_LATENCY=1 or --latency[=overlay] times every Tk callback (see tk_latency)
+    tk_latency.install(argv)
+    # command-line import/export runs without opening a window
+    if len(argv) > 1:
+        return task_io.main(argv[1:], make_backend())
+    tk_root = Tk()
+    tk_root.title("SUPER To-Do — Anime Edition")
+    tk_root.geometry("900x600")
+    tk_root.minsize(820, 520)
+    tk_root.configure(bg="#1a1a1a")  # Dark background
+    try:
+        build(tk_root).pack(fill=BOTH, expand=True)
+    except (OSError, sqlite3.Error) as e:
+        messagebox.showerror("Load error", f"Could not load the saved tasks:\n{e}")
+        tk_root.destroy()
+        return 1
+    tk_root.protocol("WM_DELETE_WINDOW", on_close)
+    tk_latency.attach(tk_root)
+    tk_root.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,434 @@
+# Headless benchmarks for the three apps, with a stored baseline.
+#
+# Every benchmark runs the code behind a window or input() prompt directly:
+# the to-do persistence (TaskStore + Journal / SqliteStore, what load_tasks
+# and the writer's flush do) and undo history, RPS judging and saving
+# (GamePage.judge, RPSGame.save_scores, the history log and strategy) and
+# the calculator (calc_ops, calc_expr, calc_batch, calc_tower).  No display
+# or network is needed; files go to a temporary directory.  Each benchmark is
+# run at every size (tasks, rounds or calculations) up to its own limit, best
+# of a few repeats, and the results are written as JSON with the commit and
+# machine.
+#
+#   python bench_suite.py                               all sizes, 10 .. 1M
+#   python bench_suite.py --quick --only todo rps       10 .. 10k, two groups
+#   python bench_suite.py --save-baseline               make these the baseline
+#
+# With a baseline (bench_baseline.json) every result is compared to it and a
+# run that is more than --tolerance slower on any benchmark exits with 1.
+
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SIZES = (10, 1_000, 100_000, 1_000_000)
+QUICK_SIZES = (10, 1_000, 10_000)
+RESULTS_FILE = "bench_results.json"
+BASELINE_FILE = os.path.join(HERE, "bench_baseline.json")
+TOLERANCE = 0.25         # fraction slower than the baseline that fails the run
+NOISE_FLOOR = 0.0005     # seconds; smaller differences are never regressions
+REPEAT = 5
+REPEAT_BUDGET = 1.0      # seconds of repeats per benchmark and size
+
+BENCHMARKS = {}          # name -> (setup function, largest size)
+
+
+def benchmark(name, max_size=None):
+    # setup(n, tmp) prepares a run of size n in directory tmp and returns the
+    # zero-argument function that is timed
+    def register(setup):
+        BENCHMARKS[name] = (setup, max_size)
+        return setup
+    return register
+
+
+def texts(n):
+    return [f"task {i} " + ("buy milk", "write report", "call mum", "fix bike")[i % 4]
+            for i in range(n)]
+
+
+# ---------- to-do ----------
+def _filled_store(n):
+    from task_store import TaskStore
+    store = TaskStore()
+    store.add_many((t, "completed" if i % 3 == 0 else "pending") for i, t in enumerate(texts(n)))
+    return store
+
+
+@benchmark("todo.add_many")
+def _(n, tmp):
+    from task_store import TaskStore
+    items = [(t, "pending") for t in texts(n)]
+    return lambda: TaskStore().add_many(items)
+
+
+@benchmark("todo.journal.save")
+def _(n, tmp):
+    # writer.flush(): fold the store into a fresh snapshot
+    from task_journal import Journal
+    journal = Journal(os.path.join(tmp, "tasks.json"))
+    journal.store = _filled_store(n)
+    return journal.compact
+
+
+@benchmark("todo.journal.load")
+def _(n, tmp):
+    # load_tasks(): snapshot + log replay
+    from task_journal import Journal
+    from task_store import TaskStore
+    path = os.path.join(tmp, "tasks.json")
+    journal = Journal(path)
+    journal.store = _filled_store(n)
+    journal.compact()
+    return lambda: Journal(path).load(TaskStore())
+
+
+@benchmark("todo.journal.append")
+def _(n, tmp):
+    # one burst of n edits written by the background writer
+    from task_journal import Journal
+    from task_store import TaskStore
+    journal = Journal(os.path.join(tmp, "tasks.json"), compact_every=float("inf"))
+    store = journal.load(TaskStore())
+    events = []
+    store.subscribe(lambda event, task: events.append(event))
+    store.add_many((t, "pending") for t in texts(n))
+    for task in list(store.tasks.values()):
+        store.edit(task.id, task.text + "!")
+    return lambda: journal.append_many(events[1:])
+
+
+@benchmark("todo.sqlite.save")
+def _(n, tmp):
+    from task_sqlite import SqliteStore
+    from task_store import TaskStore
+    backend = SqliteStore(os.path.join(tmp, "tasks.db"))
+    store = backend.load(TaskStore())
+    events = []
+    store.subscribe(lambda event, task: events.append(event))
+    store.add_many((t, "pending") for t in texts(n))
+    return lambda: backend.append_many(events)
+
+
+@benchmark("todo.sqlite.load")
+def _(n, tmp):
+    from task_sqlite import SqliteStore
+    from task_store import TaskStore
+    path = os.path.join(tmp, "tasks.db")
+    backend = SqliteStore(path)
+    store = backend.load(TaskStore())
+    store.subscribe(lambda event, task: backend.append(event))
+    store.add_many((t, "pending") for t in texts(n))
+    backend.close()
+    return lambda: SqliteStore(path).load(TaskStore())
+
+
+@benchmark("todo.search_index")
+def _(n, tmp):
+    from task_search import SearchIndex
+    store = _filled_store(n)
+    return lambda: SearchIndex(store).search("report")
+
+
+@benchmark("todo.schedule_index")
+def _(n, tmp):
+    from task_schedule import ScheduleIndex
+    store = _filled_store(n)
+    for i, task in enumerate(list(store.tasks_in("pending"))):
+        store.schedule(task.id, i % 4, 1.7e9 + i * 37 % 10007 if i % 2 else None)
+    return lambda: ScheduleIndex(store).view("due")[:20]
+
+
+@benchmark("todo.undo", max_size=100_000)
+def _(n, tmp):
+    # n edits, moves and deletes undone and redone again
+    from task_undo import UndoHistory
+    store = _filled_store(n)
+    history = UndoHistory(store, budget=float("inf"))
+    for i, task in enumerate(list(store.tasks.values())):
+        if i % 3 == 0:
+            history.do({"op": "edit", "id": task.id, "text": task.text + "!"})
+        elif i % 3 == 1:
+            history.do({"op": "move", "id": task.id, "state": "completed"})
+        else:
+            history.do({"op": "delete", "id": task.id})
+
+    def run():
+        while history.undo() is not None:
+            pass
+        while history.redo() is not None:
+            pass
+    return run
+
+
+# ---------- rock-paper-scissors ----------
+def _judge():
+    # GamePage.judge itself when the GUI module imports, else the engine's
+    try:
+        from RockPaperScissor import GamePage
+        return GamePage.judge
+    except ImportError:
+        from rps_engine import judge
+        return judge
+
+
+@benchmark("rps.judge")
+def _(n, tmp):
+    from rps_engine import MOVES
+    rng = random.Random(n)
+    rounds = [(rng.choice(MOVES), rng.choice(MOVES)) for _ in range(n)]
+    judge = _judge()
+    return lambda: [judge(u, c) for u, c in rounds]
+
+
+@benchmark("rps.judge_codes")
+def _(n, tmp):
+    import rps_engine
+    if rps_engine.np is None:
+        return None
+    stream = rps_engine.MoveStream(seed=n)
+    user, comp = stream.draw(n), stream.draw(n)
+    return lambda: rps_engine.judge_codes(user, comp)
+
+
+@benchmark("rps.save_scores", max_size=10_000)
+def _(n, tmp):
+    # n rounds, each saved the way the app saved after every round
+    try:
+        import RockPaperScissor as rps
+    except ImportError:
+        return None
+    app = SimpleNamespace(user_score=0, comp_score=0)
+    path = os.path.join(tmp, "rps_scores.json")
+
+    def run():
+        old, rps.SCOREFILE = rps.SCOREFILE, path
+        try:
+            for i in range(n):
+                app.user_score = i
+                rps.RPSGame.save_scores(app)
+        finally:
+            rps.SCOREFILE = old
+    return run
+
+
+@benchmark("rps.strategy")
+def _(n, tmp):
+    from rps_strategy import make_strategy
+    rng = random.Random(n)
+    moves = [rng.randrange(3) for _ in range(n)]
+
+    def run():
+        s = make_strategy("markov", seed=1)
+        for m in moves:
+            s.observe(m, s.choose())
+    return run
+
+
+@benchmark("rps.history.record")
+def _(n, tmp):
+    from rps_history import HistoryLog
+    rng = random.Random(n)
+    rounds = [(u, c, (u - c) % 3) for u, c in ((rng.randrange(3), rng.randrange(3))
+                                              for _ in range(n))]
+    log = HistoryLog(os.path.join(tmp, "rps_history"))
+
+    def run():
+        for u, c, r in rounds:
+            log.record(u, c, r, 0.0)
+        log.flush()
+    return run
+
+
+@benchmark("rps.history.rebuild")
+def _(n, tmp):
+    from rps_history import HistoryLog
+    rng = random.Random(n)
+    base = os.path.join(tmp, "rps_history")
+    log = HistoryLog(base, batch=1 << 16)
+    for _ in range(n):
+        u, c = rng.randrange(3), rng.randrange(3)
+        log.record(u, c, (u - c) % 3, 0.0)
+    log.flush()
+    os.remove(log.summary_path)
+    return lambda: HistoryLog(base).load()
+
+
+# ---------- calculator ----------
+@benchmark("calc.ops")
+def _(n, tmp):
+    from calc_ops import calculate
+    calls = [(str(i % 4 + 1), float(i), float(i % 7 + 1)) for i in range(n)]
+    return lambda: [calculate(c, a, b) for c, a, b in calls]
+
+
+@benchmark("calc.expr", max_size=100_000)
+def _(n, tmp):
+    from calc_expr import Calculator
+    exprs = [f"({i}+4)*2^10 / sqrt(x) - {i % 7}" for i in range(n)]
+
+    def run():
+        calc = Calculator()
+        calc.evaluate("x = 16")
+        for e in exprs:
+            calc.evaluate(e)
+    return run
+
+
+@benchmark("calc.batch")
+def _(n, tmp):
+    import calc_batch
+    data = "".join(f"{i} {i % 7}\n" for i in range(n)).encode("ascii")
+    return lambda: calc_batch.run(io.BytesIO(data), io.BytesIO(), "4")
+
+
+@benchmark("calc.tower")
+def _(n, tmp):
+    from calc_tower import Tower, number
+    calls = [(str(i % 4 + 1), number(f"{i}.{i % 100:02d}"), number(str(i % 7 + 1)))
+             for i in range(n)]
+
+    def run():
+        tower = Tower()
+        for c, a, b in calls:
+            tower.calculate(c, a, b)
+    return run
+
+
+# ---------- running ----------
+def time_one(setup, n, repeat):
+    # best wall time of up to `repeat` runs, each on freshly set-up data
+    best = None
+    spent = 0.0
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            run = setup(n, tmp)
+            if run is None:
+                return None
+            t0 = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        if spent > REPEAT_BUDGET:
+            break
+    return best
+
+
+def machine_info():
+    try:
+        import numpy
+        numpy_version = numpy.__version__
+    except ImportError:
+        numpy_version = None
+    return {"node": platform.node(), "platform": platform.platform(),
+            "machine": platform.machine(), "processor": platform.processor(),
+            "cpus": os.cpu_count(), "python": platform.python_version(),
+            "implementation": platform.python_implementation(), "numpy": numpy_version}
+
+
+def commit_info():
+    def git(*args):
+        try:
+            return subprocess.run(["git", *args], cwd=HERE, capture_output=True, text=True,
+                                  timeout=10).stdout.strip() or None
+        except (OSError, subprocess.SubprocessError):
+            return None
+    return {"commit": git("rev-parse", "HEAD"), "dirty": bool(git("status", "--porcelain", "."))}
+
+
+def run_all(names, sizes, repeat):
+    results = {}
+    for name in names:
+        setup, max_size = BENCHMARKS[name]
+        for n in sizes:
+            if max_size is not None and n > max_size:
+                continue
+            seconds = time_one(setup, n, repeat)
+            if seconds is None:
+                print(f"{name:<22}{n:>10,}   skipped (dependency missing)")
+                break
+            results[f"{name}/{n}"] = {"benchmark": name, "size": n, "seconds": seconds,
+                                      "per_item_us": seconds / n * 1e6}
+            print(f"{name:<22}{n:>10,}{seconds * 1000:>12.3f} ms{seconds / n * 1e6:>12.3f} us/item",
+                  flush=True)
+    return results
+
+
+def compare(results, baseline, tolerance):
+    # (key, baseline seconds, now seconds) for every regression
+    regressions = []
+    for key, now in results.items():
+        old = baseline.get("results", {}).get(key)
+        if old is None:
+            continue
+        if (now["seconds"] > old["seconds"] * (1 + tolerance)
+                and now["seconds"] - old["seconds"] > NOISE_FLOOR):
+            regressions.append((key, old["seconds"], now["seconds"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Headless benchmarks of the three apps.")
+    parser.add_argument("--only", nargs="+", metavar="PREFIX",
+                        help="benchmarks whose name starts with one of these (todo, rps.history, ...)")
+    parser.add_argument("--sizes", type=int, nargs="+", help=f"default {list(SIZES)}")
+    parser.add_argument("--quick", action="store_true", help=f"sizes {list(QUICK_SIZES)}")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--out", default=RESULTS_FILE, help="where to write the results")
+    parser.add_argument("--baseline", default=BASELINE_FILE)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the results as the new baseline instead of comparing")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--list", action="store_true")
+    args = parser.parse_args(argv)
+    if args.list:
+        print("\n".join(BENCHMARKS))
+        return 0
+    names = [n for n in BENCHMARKS if not args.only or any(n.startswith(p) for p in args.only)]
+    if not names:
+        parser.error("no benchmark matches --only")
+    sizes = args.sizes or (QUICK_SIZES if args.quick else SIZES)
+
+    sys.path.insert(0, HERE)
+    report = {"time": time.strftime("%Y-%m-%dT%H:%M:%S%z"), **commit_info(),
+              "machine": machine_info(), "sizes": list(sizes),
+              "results": run_all(names, sizes, args.repeat)}
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"results written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"baseline written to {args.baseline}")
+        return 0
+    try:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print("no baseline to compare with (make one with --save-baseline)")
+        return 0
+    if baseline.get("machine", {}).get("node") != report["machine"]["node"]:
+        print("warning: the baseline was recorded on another machine")
+    regressions = compare(report["results"], baseline, args.tolerance)
+    for key, old, now in regressions:
+        print(f"REGRESSION {key}: {old * 1000:.3f} ms -> {now * 1000:.3f} ms "
+              f"({now / old - 1:+.0%})")
+    compared = sum(1 for k in report["results"] if k in baseline.get("results", {}))
+    print(f"{compared} results compared with the baseline from commit "
+          f"{(baseline.get('commit') or 'unknown')[:10]}: {len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
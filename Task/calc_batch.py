@@ -0,0 +1,224 @@
+# Batch mode for the calculator: one menu operation over columns of numbers.
+#
+#   python Calculator.py batch divide numbers.csv > results.txt
+#   seq 1 2000000 | paste - - | python Calculator.py batch 3
+#   python Calculator.py batch sub data.csv --header --columns 3,1 --stats
+#
+# Each line holds two or more numbers separated by commas and/or
+# whitespace; the operation is applied left to right across the columns
+# (a / b / c), and one result is written per line, printed like the menu
+# prints it.  A zero divisor gives DIVIDE_BY_ZERO for that line, as the
+# menu's divide branch does, and a line that is not numbers gives
+# INVALID_LINE; neither stops the run.  Blank lines are skipped.
+#
+# Input is read CHUNK bytes at a time, cut at the last newline.  A chunk in
+# which every line has the same number of fields is parsed by one
+# np.fromstring call and computed with whole-column operations; any other
+# chunk (or every chunk without NumPy) is done line by line.  With
+# --workers chunks are spread over a process pool, at most a few per worker
+# in flight and written in input order, so memory use is bounded by the
+# chunk size and worker count whatever the size of the input.
+
+import argparse
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from calc_ops import DIVIDE_BY_ZERO, OPERATIONS, calculate, choice_of
+
+try:
+    import numpy as np
+except ImportError:          # batch mode still works, a line at a time
+    np = None
+
+CHUNK = 4 << 20
+IN_FLIGHT_PER_WORKER = 4
+INVALID_LINE = "Error: invalid input"
+
+if np is not None:
+    UFUNCS = {"1": np.add, "2": np.subtract, "3": np.multiply, "4": np.divide}
+
+
+def read_blocks(f, size=CHUNK):
+    # blocks of whole lines, each ending with b"\n"
+    rest = b""
+    while True:
+        data = f.read(size)
+        if not data:
+            if rest.strip():
+                yield rest + b"\n"
+            return
+        if rest:
+            data = rest + data
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:         # a line longer than the chunk: keep reading
+            rest = data
+            continue
+        rest = data[cut:]
+        yield data[:cut]
+
+
+def fields_per_line(block):
+    # number of fields on each line of a block, in one pass over its bytes
+    raw = np.frombuffer(block, dtype=np.uint8)
+    sep = (raw <= 32) | (raw == 44)      # whitespace, control bytes and commas
+    start = ~sep
+    start[1:] &= sep[:-1]
+    ends = np.flatnonzero(raw == 10)
+    firsts = np.concatenate(([0], ends[:-1] + 1))
+    return np.add.reduceat(start.view(np.uint8), firsts, dtype=np.intp)
+
+
+def compute_block(block, choice, columns):
+    # result lines for a block, or None if it needs the line-by-line path
+    counts = fields_per_line(block)
+    ncols = int(counts[0])
+    if ncols < 2 or not (counts == ncols).all():
+        return None
+    if columns and max(columns) >= ncols:
+        return None
+    try:
+        values = np.fromstring(block.replace(b",", b" "), sep=" ")
+    except ValueError:
+        return None
+    if values.size != counts.size * ncols:
+        return None
+    table = values.reshape(-1, ncols)
+    cols = [table[:, c] for c in (columns or range(ncols))]
+    ufunc = UFUNCS[choice]
+    with np.errstate(all="ignore"):
+        result = cols[0]
+        for col in cols[1:]:
+            result = ufunc(result, col)
+    lines = list(map(repr, result.tolist()))
+    if choice == "4":
+        zero = np.zeros(result.size, dtype=bool)
+        for col in cols[1:]:
+            zero |= col == 0
+        for i in np.flatnonzero(zero).tolist():
+            lines[i] = DIVIDE_BY_ZERO
+    return lines
+
+
+def compute_line(line, choice, columns):
+    fields = line.replace(b",", b" ").split()
+    if not fields:
+        return None
+    try:
+        values = [float(fields[c]) for c in columns] if columns else [float(v) for v in fields]
+    except (ValueError, IndexError):
+        return INVALID_LINE
+    if len(values) < 2:
+        return INVALID_LINE
+    result = values[0]
+    try:
+        for value in values[1:]:
+            result = calculate(choice, result, value)
+    except ZeroDivisionError:
+        return DIVIDE_BY_ZERO
+    return repr(result)
+
+
+def process_block(task):
+    # worker entry point: (output bytes, lines, error lines) for one block
+    block, choice, columns = task
+    lines = compute_block(block, choice, columns) if np is not None else None
+    if lines is None:
+        lines = [r for r in (compute_line(l, choice, columns) for l in block.splitlines())
+                 if r is not None]
+    errors = sum(1 for r in lines if r.startswith("Error"))
+    text = ("\n".join(lines) + "\n").encode("ascii") if lines else b""
+    return text, len(lines), errors
+
+
+def stream_results(task_iter, workers):
+    # results in input order with a bounded number of blocks in flight
+    if workers <= 1:
+        for task in task_iter:
+            yield process_block(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for task in task_iter:
+            window.append(pool.submit(process_block, task))
+            if len(window) >= workers * IN_FLIGHT_PER_WORKER:
+                yield window.popleft().result()
+        while window:
+            yield window.popleft().result()
+
+
+def run(src, out, choice, columns=None, header=False, chunk=CHUNK, workers=1):
+    # stream results from binary file src to binary file out; returns
+    # (lines written, error lines, bytes read)
+    nbytes = 0
+
+    def task_iter():
+        nonlocal nbytes, header
+        for block in read_blocks(src, chunk):
+            nbytes += len(block)
+            if header:
+                header = False
+                block = block[block.find(b"\n") + 1:]
+                if not block.strip():
+                    continue
+            yield block, choice, columns
+
+    written = errors = 0
+    for text, lines, bad in stream_results(task_iter(), workers):
+        out.write(text)
+        written += lines
+        errors += bad
+    return written, errors, nbytes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="Calculator.py batch",
+        description="Apply one calculator operation to every line of a file of numbers.")
+    parser.add_argument("operation", help="1-4, add/subtract/multiply/divide or + - * /")
+    parser.add_argument("input", nargs="?", default="-", help="input file (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    parser.add_argument("--columns", help="1-based columns to use, in order, e.g. 3,1")
+    parser.add_argument("--header", action="store_true", help="skip the first line")
+    parser.add_argument("--chunk", type=int, default=CHUNK, help="bytes read at a time")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes computing chunks (e.g. the number of cores)")
+    parser.add_argument("--stats", action="store_true", help="print a summary to stderr")
+    args = parser.parse_args(argv)
+    choice = choice_of(args.operation)
+    if choice is None:
+        parser.error(f"unknown operation {args.operation!r}")
+    columns = None
+    if args.columns:
+        try:
+            columns = [int(c) - 1 for c in args.columns.split(",")]
+        except ValueError:
+            parser.error("--columns takes numbers like 3,1")
+        if len(columns) < 2 or min(columns) < 0:
+            parser.error("--columns needs at least two columns, counted from 1")
+
+    t0 = time.perf_counter()
+    src = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    out = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+    try:
+        written, errors, nbytes = run(src, out, choice, columns, args.header,
+                                       args.chunk, args.workers)
+        out.flush()
+    except BrokenPipeError:  # e.g. piped into head
+        return 0
+    finally:
+        if src is not sys.stdin.buffer:
+            src.close()
+        if out is not sys.stdout.buffer:
+            out.close()
+    if args.stats:
+        elapsed = time.perf_counter() - t0
+        print(f"{OPERATIONS[choice][0]}: {written:,} lines ({errors:,} errors) from "
+              f"{nbytes / 1e6:,.1f} MB in {elapsed:.2f} s = {nbytes / 1e6 / elapsed:,.1f} MB/s"
+              + ("" if np is not None else " (no NumPy: line by line)"), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
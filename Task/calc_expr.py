@@ -0,0 +1,398 @@
+# Expression engine for the calculator.
+#
+#   (3+4)*2^10 / sqrt(x)        x = 16        f(a, b) = a^2 + b
+#
+# Text is tokenized and parsed by a small recursive-descent parser (never
+# eval), and the tree is compiled into nested Python closures, folding
+# constant sub-expressions on the way.  Compiled expressions are kept in an
+# LRU cache keyed on the text, so a formula that is evaluated again skips
+# tokenizing and parsing.  Only numbers, the operators + - * / % ^ **,
+# parentheses, variables and the functions in FUNCTIONS or defined by the
+# user are accepted, and every number and function result is a float, so
+# there is no way to reach Python objects or build huge integers.  Trees are
+# limited in height and size, so compiling and evaluating them cannot run out
+# of stack.
+#
+#   python Calculator.py "(3+4)*2^10 / sqrt(16)"
+#   python Calculator.py -i
+#   python Calculator.py --bench
+
+import math
+import operator
+import re
+import sys
+import time
+from functools import lru_cache
+
+MAX_LENGTH = 10_000      # characters per expression
+MAX_DEPTH = 100          # nesting of parentheses / unary operators
+MAX_HEIGHT = 500         # levels of the parsed tree (1+1+...+1 is one per term)
+MAX_NODES = 5_000        # nodes of the parsed tree
+CACHE_SIZE = 1024        # compiled expressions kept
+
+
+class CalcError(ValueError):
+    pass
+
+
+def _div(a, b):
+    if b == 0:
+        raise CalcError("Cannot divide by zero!")
+    return a / b
+
+
+def _mod(a, b):
+    if b == 0:
+        raise CalcError("Cannot divide by zero!")
+    return a % b
+
+
+def _pow(a, b):
+    try:
+        result = float(a) ** float(b)
+    except OverflowError:
+        raise CalcError("result too large") from None
+    if isinstance(result, complex):
+        raise CalcError("result is not a real number")
+    return result
+
+
+BINARY = {"+": operator.add, "-": operator.sub, "*": operator.mul,
+          "/": _div, "%": _mod, "^": _pow}
+PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2, "%": 2, "^": 4}
+UNARY_PRECEDENCE = 3     # -2^2 is -(2^2), 2*-3 is 2*(-3)
+
+FUNCTIONS = {
+    "sqrt": math.sqrt, "exp": math.exp, "ln": math.log, "log": math.log10,
+    "log2": math.log2, "sin": math.sin, "cos": math.cos, "tan": math.tan,
+    "asin": math.asin, "acos": math.acos, "atan": math.atan,
+    # floor, ceil and round would give Python ints, which ^ could make huge
+    "abs": abs, "floor": lambda x: float(math.floor(x)),
+    "ceil": lambda x: float(math.ceil(x)),
+    "round": lambda x, digits=0: float(round(x, int(digits))),
+    "min": min, "max": max, "hypot": math.hypot,
+}
+CONSTANTS = {"pi": math.pi, "e": math.e, "tau": math.tau}
+
+_TOKEN = re.compile(r"""
+    \s*(?:
+      (?P<num>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+    | (?P<name>[A-Za-z_]\w*)
+    | (?P<op>\*\*|[-+*/%^(),=])
+    )""", re.VERBOSE)
+
+
+# ---------- tokenizer ----------
+def tokenize(text):
+    # list of (kind, value) ending with ("end", None)
+    if len(text) > MAX_LENGTH:
+        raise CalcError("expression too long")
+    tokens = []
+    pos = 0
+    end = len(text.rstrip())
+    while pos < end:
+        m = _TOKEN.match(text, pos)
+        if m is None:
+            raise CalcError(f"unexpected character {text[pos:].lstrip()[:1]!r}")
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == "num":
+            value = float(value)
+        elif value == "**":
+            value = "^"
+        tokens.append((kind, value))
+        pos = m.end()
+    tokens.append(("end", None))
+    return tokens
+
+
+# ---------- parser ----------
+# nodes: ("num", v) ("var", name) ("neg", x) ("bin", op, a, b) ("call", name, [args])
+class _Parser:
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+        self.depth = 0
+        self.height = 0          # height of the node returned last
+        self.nodes = 0
+
+    def node(self, height, *node):
+        self.nodes += 1
+        if self.nodes > MAX_NODES:
+            raise CalcError("expression too long")
+        if height > MAX_HEIGHT:
+            raise CalcError("expression nested too deeply")
+        self.height = height
+        return node
+
+    def peek(self):
+        return self.tokens[self.pos]
+
+    def take(self):
+        tok = self.tokens[self.pos]
+        self.pos += 1
+        return tok
+
+    def expect(self, value):
+        kind, v = self.take()
+        if v != value:
+            raise CalcError(f"expected {value!r}, found {v if v is not None else 'end'!r}")
+
+    def expression(self, min_prec=1):
+        self.depth += 1
+        if self.depth > MAX_DEPTH:
+            raise CalcError("expression nested too deeply")
+        left = self.unary()
+        height = self.height
+        while True:
+            kind, op = self.peek()
+            prec = PRECEDENCE.get(op) if kind == "op" else None
+            if prec is None or prec < min_prec:
+                break
+            self.take()
+            # ^ is right-associative, the rest left-associative
+            right = self.expression(prec if op == "^" else prec + 1)
+            left = self.node(max(height, self.height) + 1, "bin", op, left, right)
+            height = self.height
+        self.depth -= 1
+        self.height = height
+        return left
+
+    def unary(self):
+        kind, value = self.peek()
+        if kind == "op" and value in ("-", "+"):
+            self.take()
+            operand = self.expression(UNARY_PRECEDENCE)
+            return self.node(self.height + 1, "neg", operand) if value == "-" else operand
+        return self.atom()
+
+    def atom(self):
+        kind, value = self.take()
+        if kind == "num":
+            return self.node(1, "num", value)
+        if kind == "name":
+            if self.peek()[1] == "(":
+                self.take()
+                args = []
+                height = 0
+                if self.peek()[1] != ")":
+                    args.append(self.expression())
+                    height = self.height
+                    while self.peek()[1] == ",":
+                        self.take()
+                        args.append(self.expression())
+                        height = max(height, self.height)
+                self.expect(")")
+                return self.node(height + 1, "call", value, args)
+            return self.node(1, "var", value)
+        if value == "(":
+            node = self.expression()
+            self.expect(")")
+            return node
+        raise CalcError(f"unexpected {value if value is not None else 'end of input'!r}")
+
+
+def parse(text):
+    # ("expr", node), ("assign", name, node) or ("def", name, params, node)
+    tokens = tokenize(text)
+    eq = [i for i, (kind, v) in enumerate(tokens) if v == "="]
+    if len(eq) > 1:
+        raise CalcError("only one '=' allowed")
+    if eq:
+        head, body = tokens[:eq[0]] + [("end", None)], tokens[eq[0] + 1:]
+        target = _Parser(head).expression()
+        node = _parse_all(body)
+        if target[0] == "var":
+            return ("assign", target[1], node)
+        if target[0] == "call" and all(a[0] == "var" for a in target[2]):
+            params = [a[1] for a in target[2]]
+            if len(set(params)) != len(params):
+                raise CalcError("duplicate parameter name")
+            return ("def", target[1], params, node)
+        raise CalcError("can only assign to a name or define name(params)")
+    return ("expr", _parse_all(tokens))
+
+
+def _parse_all(tokens):
+    parser = _Parser(tokens)
+    node = parser.expression()
+    if parser.peek()[0] != "end":
+        raise CalcError(f"unexpected {parser.peek()[1]!r}")
+    return node
+
+
+# ---------- compiler ----------
+def fold(node):
+    # replace constant sub-trees by their value; an error (1/0) is left in
+    # the tree so it is reported when the expression is evaluated
+    kind = node[0]
+    if kind == "neg":
+        inner = fold(node[1])
+        return ("num", -inner[1]) if inner[0] == "num" else ("neg", inner)
+    if kind == "bin":
+        a, b = fold(node[2]), fold(node[3])
+        if a[0] == "num" and b[0] == "num":
+            return _try_fold(BINARY[node[1]], (a[1], b[1])) or ("bin", node[1], a, b)
+        return ("bin", node[1], a, b)
+    if kind == "call":
+        args = [fold(a) for a in node[2]]
+        if node[1] in FUNCTIONS and all(a[0] == "num" for a in args):
+            folded = _try_fold(FUNCTIONS[node[1]], [a[1] for a in args])
+            if folded:
+                return folded
+        return ("call", node[1], args)
+    return node
+
+
+def _try_fold(func, args):
+    try:
+        return ("num", func(*args))
+    except (ArithmeticError, ValueError, TypeError):
+        return None
+
+
+def compile_node(node, calc):
+    # closure env -> float; env maps variable names to values
+    kind = node[0]
+    if kind == "num":
+        value = node[1]
+        return lambda env: value
+    if kind == "var":
+        name = node[1]
+
+        def var(env):
+            try:
+                return env[name]
+            except KeyError:
+                raise CalcError(f"unknown variable {name!r}") from None
+        return var
+    if kind == "neg":
+        inner = compile_node(node[1], calc)
+        return lambda env: -inner(env)
+    if kind == "bin":
+        op = BINARY[node[1]]
+        fa, fb = compile_node(node[2], calc), compile_node(node[3], calc)
+        return lambda env: op(fa(env), fb(env))
+    if kind == "call":
+        name, args = node[1], [compile_node(a, calc) for a in node[2]]
+        if name in FUNCTIONS:
+            func = FUNCTIONS[name]
+            return lambda env: func(*[a(env) for a in args])
+        # user functions are looked up when called, so they can be (re)defined later
+        return lambda env: calc.call(name, [a(env) for a in args])
+    raise CalcError(f"bad node {kind!r}")
+
+
+class Calculator:
+    def __init__(self, cache_size=CACHE_SIZE):
+        self.variables = dict(CONSTANTS)
+        self.functions = {}      # name -> (params, compiled body)
+        self.ans = 0.0
+        self.compile = lru_cache(maxsize=cache_size)(self._compile)
+
+    def _compile(self, text):
+        statement = parse(text)
+        if statement[0] == "expr":
+            return ("expr", compile_node(fold(statement[1]), self))
+        if statement[0] == "assign":
+            return ("assign", statement[1], compile_node(fold(statement[2]), self))
+        name, params, body = statement[1:]
+        if name in FUNCTIONS:
+            raise CalcError(f"{name!r} is a built-in function")
+        return ("def", name, params, compile_node(fold(body), self))
+
+    def call(self, name, args):
+        try:
+            params, body = self.functions[name]
+        except KeyError:
+            raise CalcError(f"unknown function {name!r}") from None
+        if len(args) != len(params):
+            raise CalcError(f"{name}() takes {len(params)} argument(s), got {len(args)}")
+        env = dict(self.variables)
+        env.update(zip(params, args))
+        return body(env)
+
+    def evaluate(self, text):
+        # value of an expression or assignment; None for a function definition
+        try:
+            code = self.compile(text.strip())
+            if code[0] == "def":
+                self.functions[code[1]] = (code[2], code[3])
+                return None
+            value = code[-1](self.variables)
+        except CalcError:
+            raise
+        except RecursionError:
+            raise CalcError("recursion too deep") from None
+        except (ArithmeticError, ValueError, TypeError) as e:
+            raise CalcError(str(e) or type(e).__name__) from None
+        if code[0] == "assign":
+            self.variables[code[1]] = value
+        self.variables["ans"] = self.ans = value
+        return value
+
+
+# ---------- command line ----------
+def repl(calc):
+    print("Expression calculator — e.g. (3+4)*2^10, x = 5, f(a) = a^2. Empty line quits.")
+    while True:
+        try:
+            line = input("> ").strip()
+        except EOFError:
+            return
+        if not line:
+            return
+        try:
+            value = calc.evaluate(line)
+        except CalcError as e:
+            print("Error:", e)
+            continue
+        if value is not None:
+            print(value)
+
+
+def bench(n=20000):
+    texts = [f"({i}+4)*2^10 / sqrt(x) - f({i % 7}, 3)" for i in range(n)]
+    calc = Calculator(cache_size=n)
+    calc.evaluate("x = 16")
+    calc.evaluate("f(a, b) = a^2 + b")
+    t0 = time.perf_counter()
+    for t in texts:
+        parse(t)
+    parse_time = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for t in texts:
+        calc.evaluate(t)
+    cold = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for t in texts:
+        calc.evaluate(t)
+    warm = time.perf_counter() - t0
+    print(f"parse:               {n / parse_time:12,.0f} expressions/s")
+    print(f"compile + evaluate:  {n / cold:12,.0f} expressions/s (cache misses)")
+    print(f"cached evaluate:     {n / warm:12,.0f} expressions/s (cache hits)")
+
+
+def main(argv):
+    calc = Calculator()
+    if argv == ["--bench"]:
+        bench()
+        return 0
+    if argv == ["-i"]:
+        repl(calc)
+        return 0
+    status = 0
+    for text in argv:
+        try:
+            value = calc.evaluate(text)
+        except CalcError as e:
+            print("Error:", e)
+            status = 1
+            continue
+        if value is not None:
+            print("Result:", value)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
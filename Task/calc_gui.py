@@ -0,0 +1,86 @@
+# Calculator window: the menu's two numbers and four operations, plus a line
+# for expressions (see calc_expr).  CalcPage is a plain frame, so the
+# launcher can show it as one of its pages.
+#
+#   python Calculator.py gui
+
+import tkinter as tk
+from tkinter import ttk
+
+import calc_expr
+from calc_ops import DIVIDE_BY_ZERO, OPERATIONS, calculate
+
+BG = "#1a1a1a"
+
+
+class CalcPage(tk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, bg=BG)
+        self.calc = calc_expr.Calculator()
+        self.first = tk.StringVar()
+        self.second = tk.StringVar()
+        self.expr = tk.StringVar()
+        self.result = tk.StringVar(value="Enter two numbers and choose an operation")
+
+        tk.Label(self, text="CALCULATOR", font=("Segoe UI", 26, "bold"),
+                 fg="white", bg=BG).pack(pady=(20, 10))
+
+        numbers = tk.Frame(self, bg=BG)
+        numbers.pack(pady=5)
+        for row, (label, var) in enumerate((("First number", self.first),
+                                            ("Second number", self.second))):
+            tk.Label(numbers, text=label, font=("Segoe UI", 12), fg="white",
+                     bg=BG).grid(row=row, column=0, sticky="w", padx=10, pady=4)
+            ttk.Entry(numbers, textvariable=var, width=24,
+                      font=("Segoe UI", 12)).grid(row=row, column=1, padx=10, pady=4)
+
+        ops = tk.Frame(self, bg=BG)
+        ops.pack(pady=10)
+        for col, (choice, (name, _)) in enumerate(OPERATIONS.items()):
+            ttk.Button(ops, text=name.capitalize(),
+                       command=lambda c=choice: self.run(c)).grid(row=0, column=col, padx=5)
+
+        expr_row = tk.Frame(self, bg=BG)
+        expr_row.pack(pady=10)
+        tk.Label(expr_row, text="Expression", font=("Segoe UI", 12), fg="white",
+                 bg=BG).pack(side="left", padx=10)
+        entry = ttk.Entry(expr_row, textvariable=self.expr, width=30, font=("Segoe UI", 12))
+        entry.pack(side="left")
+        entry.bind("<Return>", self.evaluate)
+        ttk.Button(expr_row, text="=", width=3, command=self.evaluate).pack(side="left", padx=5)
+
+        tk.Label(self, textvariable=self.result, font=("Segoe UI", 16, "bold"),
+                 fg="#90ff9c", bg=BG).pack(pady=15)
+
+    def run(self, choice):
+        try:
+            num1 = float(self.first.get())
+            num2 = float(self.second.get())
+        except ValueError:
+            self.result.set("Error: enter two numbers")
+            return
+        try:
+            self.result.set(f"Result: {calculate(choice, num1, num2)}")
+        except ZeroDivisionError:
+            self.result.set(DIVIDE_BY_ZERO)
+
+    def evaluate(self, event=None):
+        text = self.expr.get().strip()
+        if not text:
+            return
+        try:
+            value = self.calc.evaluate(text)
+        except calc_expr.CalcError as e:
+            self.result.set(f"Error: {e}")
+            return
+        self.result.set("Defined" if value is None else f"Result: {value}")
+
+
+def main():
+    root = tk.Tk()
+    root.title("Calculator")
+    root.geometry("560x400")
+    root.configure(bg=BG)
+    CalcPage(root).pack(fill="both", expand=True)
+    root.mainloop()
+    return 0
@@ -0,0 +1,29 @@
+# The four operations of the calculator menu, shared by the interactive
+# menu, batch mode and the calculator service.
+
+import operator
+
+# menu choice -> (name, function)
+OPERATIONS = {
+    "1": ("add", operator.add),
+    "2": ("subtract", operator.sub),
+    "3": ("multiply", operator.mul),
+    "4": ("divide", operator.truediv),
+}
+BY_NAME = {name: choice for choice, (name, _) in OPERATIONS.items()}
+BY_NAME.update({"sub": "2", "mul": "3", "div": "4", "+": "1", "-": "2", "*": "3", "/": "4"})
+DIVIDE_BY_ZERO = "Error: Cannot divide by zero!"
+INVALID_CHOICE = "Invalid choice! Please choose 1–4."
+
+
+def choice_of(op):
+    # menu choice for "1".."4", a name ("add", "div", ...) or a symbol; None if unknown
+    op = str(op).strip().lower()
+    return op if op in OPERATIONS else BY_NAME.get(op)
+
+
+def calculate(choice, num1, num2):
+    # result of the menu operation; ZeroDivisionError for x / 0
+    if choice == "4" and num2 == 0:
+        raise ZeroDivisionError(DIVIDE_BY_ZERO)
+    return OPERATIONS[choice][1](num1, num2)
@@ -0,0 +1,265 @@
+# Calculator service: one long-running process on a Unix domain socket,
+# so a calculation costs a round trip instead of an interpreter start.
+#
+# Protocol: one JSON object per line, answered in order on the same
+# connection.  Requests may be pipelined: send as many as you like before
+# reading the answers.
+#   client -> {"id": 7, "op": "divide", "a": 8, "b": 2}   op: 1-4, name or + - * /
+#   server -> {"id": 7, "result": 4.0}
+#   server -> {"id": 7, "error": "Error: Cannot divide by zero!"}
+# Results that are not finite (1e308 * 10) are errors too, since JSON has
+# no infinity or NaN.
+# "id" is optional and echoed back.  The operations and messages are the
+# menu's (calc_ops); a and b are converted with float() as the menu does.
+#
+#   python calc_server.py serve
+#   python calc_server.py call 8 / 2
+#   python calc_server.py bench --calls 20000
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from calc_ops import DIVIDE_BY_ZERO, INVALID_CHOICE, calculate, choice_of
+
+SOCKET = os.path.join(tempfile.gettempdir(), f"calculator-{os.getuid()}.sock")
+MAX_LINE = 4096
+READ_SIZE = 1 << 16
+WINDOW = 1000            # requests the client sends before reading answers
+CALCULATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Calculator.py")
+
+
+def encode(msg):
+    return json.dumps(msg, separators=(",", ":"), allow_nan=False) + "\n"
+
+
+def respond(line):
+    # the encoded response line; a request whose id cannot be echoed back
+    # as JSON (NaN) gets a plain error
+    try:
+        return encode(answer(line))
+    except ValueError:
+        return encode({"error": "bad request"})
+
+
+def answer(line):
+    # the response object for one request line
+    try:
+        msg = json.loads(line)
+        rid = msg.get("id")
+    except (ValueError, AttributeError):
+        return {"error": "bad request"}
+    reply = {"id": rid} if rid is not None else {}
+    choice = choice_of(msg.get("op", ""))
+    if choice is None:
+        reply["error"] = INVALID_CHOICE
+        return reply
+    try:
+        a, b = msg["a"], msg["b"]
+        if isinstance(a, bool) or isinstance(b, bool):
+            raise TypeError
+        a, b = float(a), float(b)
+    except (KeyError, TypeError, ValueError, OverflowError):
+        reply["error"] = "bad request: a and b must be numbers"
+        return reply
+    try:
+        result = calculate(choice, a, b)
+    except ZeroDivisionError:
+        reply["error"] = DIVIDE_BY_ZERO
+        return reply
+    if math.isfinite(result):
+        reply["result"] = result
+    else:
+        reply["error"] = "Error: result is not a finite number"
+    return reply
+
+
+class CalcServer:
+    def __init__(self):
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        # reads whatever has arrived, answers every complete line in it with
+        # one write, and only then waits for the client to catch up
+        self.connections += 1
+        buf = b""
+        try:
+            while True:
+                data = await reader.read(READ_SIZE)
+                if not data:
+                    break
+                buf += data
+                *lines, buf = buf.split(b"\n")
+                if len(buf) > MAX_LINE:
+                    writer.write(encode({"error": "request too long"}).encode("utf-8"))
+                    break
+                if lines:
+                    out = [respond(line) for line in lines if line.strip()]
+                    self.requests += len(out)
+                    writer.write("".join(out).encode("utf-8"))
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def serve(self, path=SOCKET):
+        remove_stale(path)
+        server = await asyncio.start_unix_server(self.handle, path)
+        os.chmod(path, 0o600)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        print(f"Calculator service on {path}", flush=True)
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def remove_stale(path):
+    # a socket file left by a daemon that died; refuse to start over a live one
+    if not os.path.exists(path):
+        return
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except OSError:
+        os.unlink(path)
+    else:
+        raise SystemExit(f"a calculator service is already running on {path}")
+    finally:
+        probe.close()
+
+
+# ---------- client ----------
+class CalcClient:
+    def __init__(self, path=SOCKET):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(path)
+        self.file = self.sock.makefile("rb")
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def call(self, op, a, b):
+        # the result (a float), or the error message (a str)
+        return self.pipeline([(op, a, b)])[0]
+
+    def pipeline(self, calls):
+        # results of many (op, a, b) calls, sent WINDOW at a time on one
+        # connection; a failed call gives its error message string
+        results = []
+        for start in range(0, len(calls), WINDOW):
+            window = calls[start:start + WINDOW]
+            self.sock.sendall("".join(encode({"op": op, "a": a, "b": b})
+                                      for op, a, b in window).encode("utf-8"))
+            for _ in window:
+                reply = json.loads(self.file.readline())
+                results.append(reply["result"] if "result" in reply else reply["error"])
+        return results
+
+
+# ---------- benchmark ----------
+def bench(calls, spawns, path=None):
+    ops = [("+", "-", "*", "/")[i % 4] for i in range(calls)]
+    requests = [(op, i, i % 7) for i, op in enumerate(ops)]
+
+    t0 = time.perf_counter()
+    for i in range(spawns):
+        subprocess.run([sys.executable, CALCULATOR], input=f"{i}\n{i % 7}\n{i % 4 + 1}\n",
+                       capture_output=True, text=True, check=True)
+    spawn_rate = spawns / (time.perf_counter() - t0)
+
+    daemon = None
+    if path is None:
+        path = os.path.join(tempfile.mkdtemp(), "calc.sock")
+        daemon = subprocess.Popen([sys.executable, os.path.abspath(__file__), "serve",
+                                   "--socket", path], stdout=subprocess.PIPE)
+        daemon.stdout.readline()     # "Calculator service on ..." once it listens
+    try:
+        with CalcClient(path) as client:
+            singles = max(1, calls // 10)
+            t0 = time.perf_counter()
+            for op, a, b in requests[:singles]:
+                client.call(op, a, b)
+            single_rate = singles / (time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            results = client.pipeline(requests)
+            pipe_rate = calls / (time.perf_counter() - t0)
+    finally:
+        if daemon is not None:
+            daemon.terminate()
+            daemon.wait()
+            os.rmdir(os.path.dirname(path))
+    expected = [answer(encode({"op": op, "a": a, "b": b})) for op, a, b in requests]
+    if results != [r.get("result", r.get("error")) for r in expected]:
+        raise SystemExit("the service gave different answers from calc_ops")
+    print(f"spawn Calculator.py:       {spawn_rate:12,.1f} calls/s ({spawns} processes)")
+    print(f"service, one call a time:  {single_rate:12,.0f} calls/s ({single_rate / spawn_rate:,.0f}x)")
+    print(f"service, pipelined:        {pipe_rate:12,.0f} calls/s ({pipe_rate / spawn_rate:,.0f}x)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calculator service on a Unix domain socket.")
+    parser.add_argument("--socket", default=None, help=f"default: {SOCKET}")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("serve")
+    s.add_argument("--socket", default=argparse.SUPPRESS)
+    c = sub.add_parser("call", help="e.g. call 8 / 2")
+    c.add_argument("--socket", default=argparse.SUPPRESS)
+    c.add_argument("a")
+    c.add_argument("op")
+    c.add_argument("b")
+    b = sub.add_parser("bench")
+    b.add_argument("--socket", default=argparse.SUPPRESS,
+                   help="use this running service instead of starting one")
+    b.add_argument("--calls", type=int, default=20000)
+    b.add_argument("--spawns", type=int, default=20)
+    args = parser.parse_args(argv)
+    if args.command == "bench" and args.calls < 1:
+        parser.error("--calls must be at least 1")
+    if args.command == "serve":
+        try:
+            asyncio.run(CalcServer().serve(args.socket or SOCKET))
+        except KeyboardInterrupt:
+            pass
+    elif args.command == "call":
+        path = args.socket or SOCKET
+        try:
+            with CalcClient(path) as client:
+                result = client.call(args.op, args.a, args.b)
+        except OSError as e:
+            print(f"cannot reach the calculator service on {path}: {e}", file=sys.stderr)
+            return 1
+        print(result if isinstance(result, str) else f"Result: {result}")
+        return 1 if isinstance(result, str) else 0
+    else:
+        bench(args.calls, args.spawns, args.socket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,274 @@
+# Exact calculator mode: a small numeric tower  float -> Decimal -> Fraction.
+#
+#   python Calculator.py exact 0.1 + 0.2                  Result: 0.3
+#   python Calculator.py exact 12345678901234567891 "*" 3 --precision 60
+#   python Calculator.py exact 1 / 3 --fraction           Result: 1/3
+#   python Calculator.py exact --bench
+#
+# A number stays a native float only while that is exact: the input text
+# has to be exactly a binary float ("0.5", "1234", not "0.1"), and a result
+# is kept as a float only when the float operation was exact and finite,
+# which is checked with an error-free transformation (TwoSum for + and -,
+# Dekker's product, or math.fma where there is one, for * and /) instead of
+# redoing the sum in Decimal.  Anything else is promoted: to Decimal with
+# `precision` significant digits, and with fractions=True to Fraction when
+# even that would round (1/3).  Results that are exact floats again are
+# demoted, so a chain of operations gets back onto the fast path.  The
+# function for each (operation, type, type) is resolved once and cached.
+
+import argparse
+import math
+import sys
+import time
+from decimal import Context, Decimal, Inexact, InvalidOperation, MAX_EMAX, MIN_EMIN
+from fractions import Fraction
+
+from calc_ops import DIVIDE_BY_ZERO, INVALID_CHOICE, OPERATIONS, calculate, choice_of
+
+PRECISION = 50           # significant digits of promoted Decimal results
+RANK = {float: 0, Decimal: 1, Fraction: 2}
+
+_SPLIT = 134217729.0     # 2**27 + 1, Veltkamp split of a double into two halves
+_SAFE_HI = 2.0 ** 995    # beyond this the split overflows
+_SAFE_LO = 2.0 ** -969   # below this the error term may not be representable
+
+
+def _split(a):
+    c = _SPLIT * a
+    hi = c - (c - a)
+    return hi, a - hi
+
+
+def _mul_error(a, b, p):
+    # a*b - p exactly, for p = fl(a*b) away from overflow and underflow
+    ah, al = _split(a)
+    bh, bl = _split(b)
+    return ((ah * bh - p) + ah * bl + al * bh) + al * bl
+
+
+if hasattr(math, "fma"):
+    def _mul_error(a, b, p):     # noqa: F811  (Python 3.13+)
+        return math.fma(a, b, -p)
+
+
+# ---------- float fast path: the result, or None when it would not be exact ----------
+def _float_add(a, b):
+    s = a + b
+    t = s - a
+    if s - s == 0 and (a - (s - t)) + (b - t) == 0:
+        return s
+    return None
+
+
+def _float_sub(a, b):
+    s = a - b
+    t = s - a
+    if s - s == 0 and (a - (s - t)) - (b + t) == 0:
+        return s
+    return None
+
+
+def _float_mul(a, b):
+    p = a * b
+    if p - p != 0:
+        return None
+    if a == 0 or b == 0:
+        return p
+    if _SAFE_LO <= abs(p) <= _SAFE_HI and abs(a) <= _SAFE_HI and abs(b) <= _SAFE_HI:
+        return p if _mul_error(a, b, p) == 0 else None
+    return p if Fraction(a) * Fraction(b) == p else None
+
+
+def _float_div(a, b):
+    if b == 0:
+        raise ZeroDivisionError(DIVIDE_BY_ZERO)
+    q = a / b
+    if q - q != 0:
+        return None
+    if a == 0:
+        return q
+    if _SAFE_LO <= abs(q) <= _SAFE_HI and _SAFE_LO <= abs(a) and abs(b) <= _SAFE_HI:
+        return q if q * b == a and _mul_error(q, b, a) == 0 else None
+    return q if Fraction(a) / Fraction(b) == q else None
+
+
+FLOAT_OPS = {"1": _float_add, "2": _float_sub, "3": _float_mul, "4": _float_div}
+
+
+def demote(value):
+    # an exact float for value if there is one, else value itself
+    try:
+        f = float(value)
+    except OverflowError:
+        return value
+    if f - f == 0 and f == value:
+        return f
+    return value
+
+
+def number(text):
+    # float if the text is exactly a float, else Decimal; "a/b" gives a Fraction
+    text = text.strip().replace("_", "")
+    if "/" in text:
+        try:
+            return demote(Fraction(text))      # ZeroDivisionError for "1/0"
+        except ValueError:
+            raise ValueError(f"not a number: {text!r}") from None
+    try:
+        d = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"not a number: {text!r}") from None
+    if not d.is_finite():
+        raise ValueError(f"not a finite number: {text!r}")
+    return demote(d)
+
+
+def show(value):
+    # fractions with a finite decimal expansion (only 2s and 5s below) as decimals
+    if not isinstance(value, Fraction):
+        return str(value)
+    den = value.denominator
+    twos = (den & -den).bit_length() - 1
+    rest, fives = den >> twos, 0
+    while rest % 5 == 0:
+        rest, fives = rest // 5, fives + 1
+    if rest != 1:
+        return f"{value.numerator}/{den}"
+    k = max(twos, fives)
+    return str(Decimal(value.numerator * 10**k // den).scaleb(-k))
+
+
+class Tower:
+    def __init__(self, precision=PRECISION, fractions=False):
+        self.context = Context(prec=precision, Emax=MAX_EMAX, Emin=MIN_EMIN,
+                               traps=[InvalidOperation])
+        self.fractions = fractions
+        self._dispatch = {}      # (choice, type, type) -> function
+
+    def calculate(self, choice, a, b):
+        # like calc_ops.calculate, for float, Decimal and Fraction operands
+        try:
+            func = self._dispatch[choice, type(a), type(b)]
+        except KeyError:
+            func = self._dispatch[choice, type(a), type(b)] = self._resolve(choice, a, b)
+        result = func(a, b)
+        # None: the float result would not be exact
+        return self._decimal(choice, a, b) if result is None else result
+
+    def _resolve(self, choice, a, b):
+        rank = max(RANK[type(a)], RANK[type(b)])
+        if rank == 0:
+            return FLOAT_OPS[choice]
+        if rank == 1:
+            return lambda a, b: self._decimal(choice, a, b)
+        return lambda a, b: self._fraction(choice, a, b)
+
+    def _decimal(self, choice, a, b):
+        if choice == "4" and b == 0:
+            raise ZeroDivisionError(DIVIDE_BY_ZERO)
+        ctx = self.context
+        ctx.clear_flags()
+        method = (ctx.add, ctx.subtract, ctx.multiply, ctx.divide)[int(choice) - 1]
+        result = method(Decimal(a), Decimal(b))
+        if self.fractions and ctx.flags[Inexact]:
+            return self._fraction(choice, a, b)
+        return demote(result)
+
+    def _fraction(self, choice, a, b):
+        if choice == "4" and b == 0:
+            raise ZeroDivisionError(DIVIDE_BY_ZERO)
+        return demote(OPERATIONS[choice][1](Fraction(a), Fraction(b)))
+
+
+# ---------- benchmark ----------
+def bench(n=200_000):
+    tower = Tower()
+    pairs = [(float(i), float(i % 97 + 1)) for i in range(n)]
+    ops = [str(i % 3 + 1) for i in range(n)]          # + - *: all exact on these
+    plain = [OPERATIONS[c][1] for c in ops]
+
+    t0 = time.perf_counter()
+    for f, (a, b) in zip(plain, pairs):
+        f(a, b)
+    base = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for c, (a, b) in zip(ops, pairs):
+        calculate(c, a, b)
+    menu = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    calc = tower.calculate
+    for c, (a, b) in zip(ops, pairs):
+        calc(c, a, b)
+    fast = time.perf_counter() - t0
+    print(f"plain float:            {n / base:12,.0f} ops/s")
+    print(f"calc_ops.calculate:     {n / menu:12,.0f} ops/s ({menu / base:.1f}x plain)")
+    print(f"tower, float fast path: {n / fast:12,.0f} ops/s ({fast / base:.1f}x plain)")
+
+    m = n // 10
+    cases = [
+        ("money, 0.1 + 0.2", "1", lambda i: (number(f"{i}.10"), number("0.20"))),
+        ("overflow, 1e300 * 1e300", "3", lambda i: (number(f"{i + 1}e300"), number("1e300"))),
+        ("big ints, 30 digits * 30", "3", lambda i: (number(str(10**29 + i)), number(str(10**29 + 7)))),
+        ("inexact division, x / 3", "4", lambda i: (float(i + 1), 3.0)),
+    ]
+    for label, choice, make in cases:
+        operands = [make(i) for i in range(m)]
+        t0 = time.perf_counter()
+        for a, b in operands:
+            calc(choice, a, b)
+        elapsed = time.perf_counter() - t0
+        print(f"{label + ':':<32}{m / elapsed:12,.0f} ops/s ({elapsed / m / (base / n):,.0f}x plain)")
+    ftower = Tower(fractions=True)
+    t0 = time.perf_counter()
+    for i in range(m):
+        ftower.calculate("4", float(i + 1), 3.0)
+    elapsed = time.perf_counter() - t0
+    print(f"{'x / 3 with --fraction:':<32}{m / elapsed:12,.0f} ops/s ({elapsed / m / (base / n):,.0f}x plain)")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(
+        prog="Calculator.py exact",
+        description="Calculator that stays exact: float when exact, else Decimal or Fraction.")
+    parser.add_argument("expr", nargs="*", metavar="a op b",
+                        help="e.g. 0.1 + 0.2; without it the menu asks for the numbers")
+    parser.add_argument("--precision", type=int, default=PRECISION,
+                        help="significant digits of Decimal results")
+    parser.add_argument("--fraction", action="store_true",
+                        help="give an exact fraction instead of rounding (1/3)")
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args(argv)
+    if args.bench:
+        bench()
+        return 0
+    if args.expr and len(args.expr) != 3:
+        parser.error("expected: a op b")
+    if args.precision < 1:
+        parser.error("--precision must be at least 1")
+    tower = Tower(args.precision, args.fraction)
+    if args.expr:
+        a, op, b = args.expr
+        choice = choice_of(op)
+    else:
+        a = input("Enter first number: ")
+        b = input("Enter second number: ")
+        print("\nChoose operation:")
+        for key, (name, _) in OPERATIONS.items():
+            print(f"{key}. {name.capitalize()}")
+        choice = choice_of(input("Enter choice (1/2/3/4): "))
+    if choice is None:
+        print(INVALID_CHOICE)
+        return 1
+    try:
+        print("Result:", show(tower.calculate(choice, number(a), number(b))))
+    except ValueError as e:
+        print("Error:", e)
+        return 1
+    except ZeroDivisionError:
+        print(DIVIDE_BY_ZERO)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
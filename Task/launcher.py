@@ -0,0 +1,186 @@
+# One window, one Tk root and one process for all three apps.
+#
+#   python launcher.py                       the home page; pick an app at the top
+#   python launcher.py --page todo           straight into an app (todo, rps, calc)
+#   python launcher.py --measure --runs 10   cold start to first paint
+#
+# At startup only tkinter is imported and a small frame is drawn.  Each app
+# is imported and built the first time its page is shown, and PIL only
+# when an app actually finds one of its images.  Hidden pages are unpacked,
+# so they neither draw nor animate; every page that was built is saved
+# and closed when the window closes.
+#
+# --measure starts the launcher in fresh processes and times each from
+# spawn to the first paint of the window, interpreter start-up included.
+
+import time
+
+START = time.perf_counter()
+
+import argparse
+import os
+import sys
+import tkinter as tk
+from tkinter import messagebox, ttk
+
+import tk_latency
+
+TARGET_MS = 150          # cold start to first paint
+BG = "#1a1a1a"
+PAINTED = "painted"      # what a --paint-and-exit child prints
+
+
+# ---------- pages ----------
+# factory(parent, launcher) -> (frame, close function), imported on first use
+def todo_page(parent, launcher):
+    import To_Do_List
+    return To_Do_List.build(parent), To_Do_List.close
+
+
+def rps_page(parent, launcher):
+    from RockPaperScissor import RPSGame
+    game = RPSGame(parent, on_quit=launcher.on_close)
+    return game, game.close
+
+
+def calc_page(parent, launcher):
+    from calc_gui import CalcPage
+    return CalcPage(parent), None
+
+
+PAGES = {
+    "todo": ("To-Do List", todo_page),
+    "rps": ("Rock-Paper-Scissors", rps_page),
+    "calc": ("Calculator", calc_page),
+}
+
+
+class Launcher(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("SUPER Apps")
+        self.geometry("900x640")
+        self.minsize(820, 560)
+        self.configure(bg=BG)
+
+        nav = tk.Frame(self, bg="#111")
+        nav.pack(fill="x")
+        for key, (title, _) in PAGES.items():
+            ttk.Button(nav, text=title,
+                       command=lambda k=key: self.show(k)).pack(side="left", padx=6, pady=6)
+
+        self.body = tk.Frame(self, bg=BG)
+        self.body.pack(fill="both", expand=True)
+        self.home = tk.Label(self.body, text="Pick an app above", font=("Segoe UI", 20),
+                             fg="#aaaaaa", bg=BG)
+        self.home.pack(expand=True)
+
+        self.pages = {}          # key -> (frame, close function), built on first show
+        self.current = None
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+
+    def show(self, key):
+        if key == self.current:
+            return
+        if key not in self.pages:
+            # build it before anything is hidden: if the app fails to start,
+            # the page that was showing stays as it was
+            self.configure(cursor="watch")
+            self.update_idletasks()
+            before = set(self.body.winfo_children())
+            try:
+                self.pages[key] = PAGES[key][1](self.body, self)
+            except Exception as e:
+                for widget in set(self.body.winfo_children()) - before:
+                    widget.destroy()       # whatever it built before failing
+                messagebox.showerror(PAGES[key][0], f"Could not start:\n{e}")
+                return
+            finally:
+                self.configure(cursor="")
+        if self.current is None:
+            self.home.pack_forget()
+        else:
+            old = self.pages[self.current][0]
+            if hasattr(old, "on_hide"):
+                old.on_hide()
+            old.pack_forget()
+        frame = self.pages[key][0]
+        frame.pack(fill="both", expand=True)
+        if hasattr(frame, "on_show"):
+            frame.on_show()
+        self.current = key
+
+    def on_close(self):
+        for key, (frame, close) in self.pages.items():
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    print(f"{PAGES[key][0]}: close error:", e)
+        self.destroy()
+
+    def exit_after_paint(self):
+        # for --measure: report the first paint of the window and quit
+        def mapped(event):
+            if event.widget is self:
+                self.after_idle(painted)
+
+        def painted():
+            self.update_idletasks()
+            print(PAINTED, f"{(time.perf_counter() - START) * 1000:.1f}", flush=True)
+            self.on_close()
+        self.bind("<Map>", mapped)
+
+
+def measure(page, runs):
+    import statistics
+    import subprocess        # only needed here, so kept off the start-up path
+
+    cmd = [sys.executable, os.path.abspath(__file__), "--paint-and-exit"]
+    if page:
+        cmd += ["--page", page]
+    totals, inner = [], []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        child = subprocess.Popen(cmd, stdout=subprocess.PIPE, text=True)
+        for line in child.stdout:
+            if line.startswith(PAINTED):
+                totals.append((time.perf_counter() - t0) * 1000)
+                inner.append(float(line.split()[1]))
+                break
+        child.wait()
+        if child.returncode:
+            print(f"launcher exited with {child.returncode}", file=sys.stderr)
+            return 1
+    median = statistics.median(totals)
+    print(f"cold start to first paint ({page or 'home'}, {runs} runs): median {median:.0f} ms, "
+          f"best {min(totals):.0f} ms; after the launcher module started: "
+          f"{statistics.median(inner):.0f} ms")
+    print(f"target {TARGET_MS} ms: {'met' if median <= TARGET_MS else 'MISSED'}")
+    return 0 if median <= TARGET_MS else 1
+
+
+def main(argv=None):
+    argv = sys.argv if argv is None else argv
+    tk_latency.install(argv)
+    parser = argparse.ArgumentParser(description="All three apps in one window.")
+    parser.add_argument("--page", choices=sorted(PAGES), help="page to open at start")
+    parser.add_argument("--measure", action="store_true",
+                        help="time cold starts to first paint in fresh processes")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--paint-and-exit", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv[1:])
+    if args.measure:
+        return measure(args.page, args.runs)
+    app = Launcher()
+    if args.page:
+        app.show(args.page)
+    if args.paint_and_exit:
+        app.exit_after_paint()
+    tk_latency.attach(app)
+    app.mainloop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# Headless Rock-Paper-Scissors engine.
+#
+# Moves are small integers (rock=0, paper=1, scissors=2).  With that
+# encoding (user - comp) % 3 is 0 for a tie, 1 for a user win and 2 for a
+# loss, so whole arrays of rounds are judged with one NumPy expression
+# instead of one dict lookup per round.
+#
+#   python rps_engine.py --rounds 10000000 --seed 1
+#   python rps_engine.py --rounds 1000000 --user rock --check
+
+import argparse
+import random
+import sys
+import time
+
+try:
+    import numpy as np
+except ImportError:          # the game still runs, only the batch API needs NumPy
+    np = None
+
+MOVES = ("rock", "paper", "scissors")
+CODE = {m: i for i, m in enumerate(MOVES)}
+RESULTS = ("tie", "win", "lose")     # indexed by (user - comp) % 3
+BLOCK = 1 << 20                      # rounds drawn / judged per chunk
+
+
+def judge(user, comp):
+    # same answers as GamePage.judge, for move names
+    return RESULTS[(CODE[user] - CODE[comp]) % 3]
+
+
+def judge_codes(user, comp):
+    # result codes (0 tie, 1 win, 2 lose) for two arrays of move codes
+    return (np.asarray(user, dtype=np.uint8) + 3 - np.asarray(comp, dtype=np.uint8)) % 3
+
+
+class MoveStream:
+    # random moves drawn `block` at a time from one seeded generator, so the
+    # GUI pays for the RNG once per block instead of once per click
+    def __init__(self, seed=None, block=4096):
+        self.block = block
+        if np is not None:
+            self.rng = np.random.default_rng(seed)
+        else:
+            self.rng = random.Random(seed)
+        self._buf = []
+        self._pos = 0
+
+    def next(self):
+        if self._pos == len(self._buf):
+            if np is not None:
+                self._buf = self.draw(self.block).tolist()
+            else:
+                self._buf = [self.rng.randrange(3) for _ in range(self.block)]
+            self._pos = 0
+        move = self._buf[self._pos]
+        self._pos += 1
+        return move
+
+    def draw(self, n):
+        # n move codes as a uint8 array (NumPy only)
+        return self.rng.integers(0, 3, size=n, dtype=np.uint8)
+
+
+def simulate(rounds, seed=None, user=None, block=BLOCK):
+    # play `rounds` rounds against a uniformly random computer; the user plays
+    # a fixed move or, when user is None, random moves from the same stream.
+    # Returns counts indexed like RESULTS.
+    if np is None:
+        raise RuntimeError("simulate() needs NumPy")
+    stream = MoveStream(seed)
+    counts = np.zeros(3, dtype=np.int64)
+    done = 0
+    while done < rounds:
+        n = min(block, rounds - done)
+        comp = stream.draw(n)
+        if user is None:
+            moves = stream.draw(n)
+        else:
+            moves = np.full(n, CODE[user], dtype=np.uint8)
+        counts += np.bincount(judge_codes(moves, comp), minlength=3)
+        done += n
+    return counts
+
+
+def check(samples=100000, seed=0):
+    # judge_codes against the scalar judge: all nine pairs plus random rounds
+    rng = np.random.default_rng(seed)
+    user = np.concatenate([np.repeat(np.arange(3), 3), rng.integers(0, 3, samples)])
+    comp = np.concatenate([np.tile(np.arange(3), 3), rng.integers(0, 3, samples)])
+    got = judge_codes(user, comp).tolist()
+    for u, c, r in zip(user.tolist(), comp.tolist(), got):
+        if RESULTS[r] != judge(MOVES[u], MOVES[c]):
+            return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulate Rock-Paper-Scissors rounds.")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--user", choices=MOVES, help="fixed user move (default: random)")
+    parser.add_argument("--check", action="store_true",
+                        help="verify the vectorized judge against the scalar one first")
+    args = parser.parse_args(argv)
+    if np is None:
+        print("rps_engine: NumPy is required for simulations")
+        return 2
+    if args.check:
+        ok = check()
+        print("check:", "ok" if ok else "MISMATCH")
+        if not ok:
+            return 1
+    t0 = time.perf_counter()
+    counts = simulate(args.rounds, args.seed, args.user)
+    elapsed = time.perf_counter() - t0
+    for name, n in zip(RESULTS, counts.tolist()):
+        print(f"{name:5} {n:>12,}  {n / max(args.rounds, 1):7.3%}")
+    print(f"{args.rounds:,} rounds in {elapsed:.3f} s "
+          f"({args.rounds / max(elapsed, 1e-9):,.0f} rounds/s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
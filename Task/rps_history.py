@@ -0,0 +1,234 @@
+# Round history for Rock-Paper-Scissors.
+#
+# Every round is appended to four column files next to rps_scores.json:
+#   rps_history.time    float64 Unix time   (array "d")
+#   rps_history.user    uint8 move code     (array "B", rock=0 paper=1 scissors=2)
+#   rps_history.comp    uint8 move code
+#   rps_history.result  uint8 result code   (0 tie, 1 win, 2 lose, as rps_engine)
+# Rounds are buffered and appended in batches.  RoundStats keeps totals,
+# move frequencies, streaks and per-bucket win rates up to date round by
+# round; it is saved to rps_history.json with each batch, and rebuilt from
+# the memory-mapped columns (chunked bytes.count, find, rfind; no
+# Python loop per round) only when that summary is missing or out of step
+# with the files.
+
+import json
+import mmap
+import os
+import time
+from array import array
+from collections import deque
+
+COLUMNS = (("time", "d"), ("user", "B"), ("comp", "B"), ("result", "B"))
+BATCH = 64           # rounds buffered before they are appended
+BUCKET = 100         # rounds per point of the win-rate-over-time chart
+CHART_BUCKETS = 40   # buckets kept for the chart
+RECENT = 100         # rounds behind the "recent win rate"
+CHUNK = 1 << 20      # bytes counted at a time when rebuilding from the columns
+
+WIN, LOSE, TIE = 1, 2, 0
+
+
+class RoundStats:
+    def __init__(self):
+        self.rounds = 0
+        self.results = [0, 0, 0]         # by result code
+        self.user_moves = [0, 0, 0]      # by move code
+        self.comp_moves = [0, 0, 0]
+        self.streak_kind = TIE
+        self.streak = 0                  # length of the current run of streak_kind
+        self.best_win = 0
+        self.best_lose = 0
+        self.recent = deque(maxlen=RECENT)
+        self.buckets = deque(maxlen=CHART_BUCKETS)   # win rate of each full bucket
+        self.bucket_wins = 0
+        self.bucket_rounds = 0
+
+    def add(self, user, comp, result):
+        self.rounds += 1
+        self.results[result] += 1
+        self.user_moves[user] += 1
+        self.comp_moves[comp] += 1
+        if result == self.streak_kind:
+            self.streak += 1
+        else:
+            self.streak_kind, self.streak = result, 1
+        if result == WIN:
+            self.best_win = max(self.best_win, self.streak)
+        elif result == LOSE:
+            self.best_lose = max(self.best_lose, self.streak)
+        self.recent.append(result)
+        self.bucket_rounds += 1
+        self.bucket_wins += result == WIN
+        if self.bucket_rounds == BUCKET:
+            self.buckets.append(self.bucket_wins / BUCKET)
+            self.bucket_wins = self.bucket_rounds = 0
+
+    def win_rate(self):
+        return self.results[WIN] / self.rounds if self.rounds else 0.0
+
+    def recent_win_rate(self):
+        return self.recent.count(WIN) / len(self.recent) if self.recent else 0.0
+
+    def to_json(self):
+        return {"rounds": self.rounds, "results": self.results,
+                "user_moves": self.user_moves, "comp_moves": self.comp_moves,
+                "streak_kind": self.streak_kind, "streak": self.streak,
+                "best_win": self.best_win, "best_lose": self.best_lose}
+
+    def load_json(self, data):
+        for key in ("rounds", "streak_kind", "streak", "best_win", "best_lose"):
+            setattr(self, key, int(data[key]))
+        for key in ("results", "user_moves", "comp_moves"):
+            value = [int(n) for n in data[key]]
+            if len(value) != 3:
+                raise ValueError(key)
+            setattr(self, key, value)
+
+    def load_tail(self, results):
+        # recent window and chart buckets from the last results in the log
+        # (a bytes-like of result codes ending at round self.rounds)
+        self.recent.clear()
+        self.recent.extend(results[-RECENT:])
+        partial = self.rounds % BUCKET
+        full = results[:len(results) - partial] if partial else results
+        self.buckets.clear()
+        for i in range(max(len(full) - CHART_BUCKETS * BUCKET, 0), len(full), BUCKET):
+            chunk = full[i:i + BUCKET]
+            if len(chunk) == BUCKET:
+                self.buckets.append(chunk.count(WIN) / BUCKET)
+        tail = results[len(results) - partial:] if partial else b""
+        self.bucket_rounds = len(tail)
+        self.bucket_wins = tail.count(WIN)
+
+
+def _counts(data):
+    # occurrences of each code, a chunk at a time so an mmap is never copied whole
+    counts = [0, 0, 0]
+    for i in range(0, len(data), CHUNK):
+        chunk = data[i:i + CHUNK]
+        for code in range(3):
+            counts[code] += chunk.count(code)
+    return counts
+
+
+def _longest_run(data, code):
+    # a run of k exists iff code * k occurs: double k, then binary search,
+    # each probe one C-speed find() over the column
+    byte = bytes([code])
+    if data.find(byte) < 0:
+        return 0
+    lo, hi = 1, 2
+    while hi <= len(data) and data.find(byte * hi) >= 0:
+        lo, hi = hi, hi * 2
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if data.find(byte * mid) >= 0:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def stats_from_columns(user, comp, result):
+    # full rebuild from the column bytes (mmap objects or bytes)
+    stats = RoundStats()
+    stats.rounds = len(result)
+    stats.results = _counts(result)
+    stats.user_moves = _counts(user)
+    stats.comp_moves = _counts(comp)
+    stats.best_win = _longest_run(result, WIN)
+    stats.best_lose = _longest_run(result, LOSE)
+    if stats.rounds:
+        last = result[-1]
+        other = max(result.rfind(bytes([c])) for c in range(3) if c != last)
+        stats.streak_kind = last
+        stats.streak = stats.rounds - 1 - other
+    return stats
+
+
+class HistoryLog:
+    def __init__(self, base="rps_history", batch=BATCH):
+        self.base = base
+        self.batch = batch
+        self.summary_path = base + ".json"
+        self.pending = {name: array(code) for name, code in COLUMNS}
+        self.stats = RoundStats()
+
+    def path(self, column):
+        return f"{self.base}.{column}"
+
+    # ---------- loading ----------
+    def load(self):
+        rounds = self._trim_columns()
+        try:
+            with open(self.summary_path, "r", encoding="utf-8") as f:
+                self.stats.load_json(json.load(f))
+            if self.stats.rounds != rounds:
+                raise ValueError("summary out of date")
+            self.stats.load_tail(self._read_tail("result", CHART_BUCKETS * BUCKET + BUCKET))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.stats = self._rebuild(rounds)
+        return self.stats
+
+    def _trim_columns(self):
+        # a crash between column appends leaves them uneven: cut to the shortest
+        counts = []
+        for name, code in COLUMNS:
+            try:
+                size = os.path.getsize(self.path(name))
+            except OSError:
+                size = 0
+            counts.append(size // array(code).itemsize)
+        rounds = min(counts)
+        for (name, code), n in zip(COLUMNS, counts):
+            if n != rounds:
+                with open(self.path(name), "ab") as f:
+                    f.truncate(rounds * array(code).itemsize)
+        return rounds
+
+    def _read_tail(self, column, n):
+        with open(self.path(column), "rb") as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(f.tell() - n, 0))
+            return f.read()
+
+    def _rebuild(self, rounds):
+        if not rounds:
+            return RoundStats()
+        files = [open(self.path(name), "rb") for name in ("user", "comp", "result")]
+        try:
+            maps = [mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) for f in files]
+            try:
+                stats = stats_from_columns(*maps)
+                stats.load_tail(maps[2][-(CHART_BUCKETS * BUCKET + BUCKET):])
+                return stats
+            finally:
+                for m in maps:
+                    m.close()
+        finally:
+            for f in files:
+                f.close()
+
+    # ---------- recording ----------
+    def record(self, user, comp, result, when=None):
+        pending = self.pending
+        pending["time"].append(time.time() if when is None else when)
+        pending["user"].append(user)
+        pending["comp"].append(comp)
+        pending["result"].append(result)
+        self.stats.add(user, comp, result)
+        if len(pending["result"]) >= self.batch:
+            self.flush()
+
+    def flush(self):
+        if not self.pending["result"]:
+            return
+        for name, code in COLUMNS:
+            with open(self.path(name), "ab") as f:
+                self.pending[name].tofile(f)
+            self.pending[name] = array(code)
+        tmp = self.summary_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.stats.to_json(), f)
+        os.replace(tmp, self.summary_path)
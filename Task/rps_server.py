@@ -0,0 +1,344 @@
+# Networked Rock-Paper-Scissors: one asyncio server, many concurrent matches.
+#
+# Protocol: one JSON object per line over TCP.
+#   client -> {"op": "hello", "name": "ann", "mode": "pvp" | "bot", "strategy": "markov"}
+#   server -> {"op": "welcome", "name": "ann"}
+#   server -> {"op": "matched", "opponent": "bob"}        (or "bot:markov")
+#   client -> {"op": "move", "move": "rock"}
+#   server -> {"op": "result", "round": 1, "you": "rock", "opponent": "paper",
+#              "result": "lose", "score": [wins, losses, ties]}
+#   server -> {"op": "opponent_left"}                     (you are paired again)
+#   client -> {"op": "quit"}
+#   server -> {"op": "error", "error": "..."}
+#
+# One move per round: a move sent before the round's result arrived is
+# refused with an error, so results and moves always pair up.
+# "pvp" players wait up to PAIR_TIMEOUT seconds for another human and then
+# get a bot.  Rounds are judged with rps_engine.  Scores live in memory and
+# are written to SERVER_SCOREFILE every SAVE_INTERVAL seconds, only when
+# something changed, off the event loop.
+#
+#   python rps_server.py serve --port 8765
+#   python rps_server.py loadtest --players 1000 --rounds 50
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import sys
+import time
+from collections import deque
+
+from rps_engine import CODE, MOVES, RESULTS
+from rps_strategy import STRATEGIES, make_strategy
+
+HOST = "127.0.0.1"
+PORT = 8765
+SERVER_SCOREFILE = "rps_server_scores.json"
+SAVE_INTERVAL = 5.0
+PAIR_TIMEOUT = 3.0
+MAX_LINE = 4096
+
+
+def encode(msg):
+    return (json.dumps(msg, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def write_scores(path, scores):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(scores, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+class Player:
+    def __init__(self, name, mode, strategy, writer):
+        self.name = name
+        self.mode = mode
+        self.strategy = strategy
+        self.writer = writer
+        self.match = None
+        self.timer = None        # bot fallback while waiting for a human
+        self.pending = False     # a move was sent and its round is not judged yet
+
+    async def send(self, msg):
+        # a dropped connection is noticed and cleaned up by its handler
+        try:
+            self.writer.write(encode(msg))
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+
+class Bot:
+    def __init__(self, strategy):
+        self.name = "bot:" + strategy
+        self.strategy = make_strategy(strategy)
+
+
+class Match:
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+        self.moves = asyncio.Queue()     # (player, move code or None when they left)
+        self.humans = [p for p in (a, b) if isinstance(p, Player)]
+
+
+class Server:
+    def __init__(self, score_path=SERVER_SCOREFILE, save_interval=SAVE_INTERVAL,
+                 pair_timeout=PAIR_TIMEOUT):
+        self.score_path = score_path
+        self.save_interval = save_interval
+        self.pair_timeout = pair_timeout
+        self.scores = {}         # name -> [wins, losses, ties]
+        self.dirty = False
+        self.waiting = deque()
+        self.tasks = set()
+        self.rounds = 0
+        self.load_scores()
+
+    # ---------- scores ----------
+    def load_scores(self):
+        try:
+            with open(self.score_path, "r", encoding="utf-8") as f:
+                self.scores = {k: list(v) for k, v in json.load(f).items()}
+        except (OSError, ValueError, AttributeError, TypeError):
+            self.scores = {}
+
+    def record(self, name, result):
+        # result is a code: 0 tie, 1 win, 2 lose
+        score = self.scores.get(name)
+        if score is None:
+            score = self.scores[name] = [0, 0, 0]
+        score[(2, 0, 1)[result]] += 1
+        self.dirty = True
+        return score
+
+    async def save_loop(self):
+        while True:
+            await asyncio.sleep(self.save_interval)
+            await self.flush()
+
+    async def flush(self):
+        if not self.dirty:
+            return
+        self.dirty = False
+        snapshot = {name: list(s) for name, s in self.scores.items()}
+        try:
+            await asyncio.to_thread(write_scores, self.score_path, snapshot)
+        except OSError as e:
+            self.dirty = True
+            print("Save error:", e)
+
+    # ---------- pairing ----------
+    def spawn(self, coro):
+        task = asyncio.create_task(coro)
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    def pair(self, player):
+        if player.mode == "bot":
+            self.start(player, Bot(player.strategy))
+            return
+        while self.waiting:
+            other = self.waiting.popleft()
+            if other.match is None and not other.writer.is_closing():
+                other.timer.cancel()
+                self.start(other, player)
+                return
+        self.waiting.append(player)
+        loop = asyncio.get_running_loop()
+        player.timer = loop.call_later(self.pair_timeout, self._bot_fallback, player)
+
+    def _bot_fallback(self, player):
+        if player.match is None and not player.writer.is_closing():
+            try:
+                self.waiting.remove(player)
+            except ValueError:
+                pass
+            self.start(player, Bot(player.strategy))
+
+    def start(self, a, b):
+        match = Match(a, b)
+        for p in match.humans:
+            p.match = match
+        self.spawn(self.run_match(match))
+
+    async def run_match(self, match):
+        a, b = match.a, match.b
+        for p, other in ((a, b), (b, a)):
+            if isinstance(p, Player):
+                await p.send({"op": "matched", "opponent": other.name})
+        rnd = 0
+        while True:
+            moves = {}
+            while len(moves) < len(match.humans):
+                player, move = await match.moves.get()
+                if move is None:
+                    for p in match.humans:
+                        if p is not player:
+                            p.match = None
+                            p.pending = False      # that round will never be judged
+                            await p.send({"op": "opponent_left"})
+                            self.pair(p)
+                    return
+                moves[player] = move
+            ma = moves[a]
+            if isinstance(b, Bot):
+                mb = b.strategy.choose()
+                b.strategy.observe(ma, mb)
+            else:
+                mb = moves[b]
+            rnd += 1
+            self.rounds += 1
+            for p in match.humans:
+                p.pending = False
+            for p, mine, theirs in ((a, ma, mb), (b, mb, ma)):
+                if isinstance(p, Player):
+                    result = (mine - theirs) % 3
+                    score = self.record(p.name, result)
+                    await p.send({"op": "result", "round": rnd, "you": MOVES[mine],
+                                  "opponent": MOVES[theirs], "result": RESULTS[result],
+                                  "score": score})
+
+    # ---------- connections ----------
+    async def handle(self, reader, writer):
+        player = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                    op = msg["op"]
+                except (ValueError, KeyError, TypeError):
+                    writer.write(encode({"op": "error", "error": "bad message"}))
+                    continue
+                if op == "quit":
+                    break
+                if player is None:
+                    if op != "hello":
+                        writer.write(encode({"op": "error", "error": "say hello first"}))
+                        continue
+                    player = self.hello(msg, writer)
+                    await player.send({"op": "welcome", "name": player.name})
+                    self.pair(player)
+                elif op == "move":
+                    move = CODE.get(msg.get("move"))
+                    if move is None or player.match is None:
+                        await player.send({"op": "error", "error": "no match or bad move"})
+                    elif player.pending:
+                        await player.send({"op": "error",
+                                           "error": "wait for the result of your last move"})
+                    else:
+                        player.pending = True
+                        player.match.moves.put_nowait((player, move))
+                else:
+                    await player.send({"op": "error", "error": f"unknown op {op!r}"})
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            if player is not None:
+                if player.timer is not None:
+                    player.timer.cancel()
+                if player.match is not None:
+                    player.match.moves.put_nowait((player, None))
+            writer.close()
+
+    def hello(self, msg, writer):
+        name = str(msg.get("name") or f"guest{random.randrange(10**6)}")[:40]
+        mode = "bot" if msg.get("mode") == "bot" else "pvp"
+        strategy = msg.get("strategy") if msg.get("strategy") in STRATEGIES else "markov"
+        return Player(name, mode, strategy, writer)
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle, host, port, limit=MAX_LINE)
+        saver = asyncio.create_task(self.save_loop())
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop.set)
+            except (NotImplementedError, RuntimeError):
+                pass             # Windows: Ctrl+C still ends asyncio.run()
+        print(f"RPS server on {host}:{port}")
+        try:
+            async with server:
+                await stop.wait()
+        finally:
+            saver.cancel()
+            await self.flush()
+
+
+# ---------- load test ----------
+async def simulated_player(host, port, n, rounds, mode, latencies):
+    reader, writer = await asyncio.open_connection(host, port, limit=MAX_LINE)
+    writer.write(encode({"op": "hello", "name": f"load{n}", "mode": mode}))
+    rng = random.Random(n)
+    while json.loads(await reader.readline())["op"] != "matched":
+        pass
+    done = 0
+    while done < rounds:
+        t0 = time.perf_counter()
+        writer.write(encode({"op": "move", "move": MOVES[rng.randrange(3)]}))
+        await writer.drain()
+        msg = json.loads(await reader.readline())
+        if msg["op"] == "result":
+            latencies.append(time.perf_counter() - t0)
+            done += 1
+        elif msg["op"] == "opponent_left":
+            while json.loads(await reader.readline())["op"] != "matched":
+                pass
+    writer.write(encode({"op": "quit"}))
+    await writer.drain()
+    writer.close()
+
+
+async def loadtest(host, port, players, rounds, mode):
+    latencies = []
+    t0 = time.perf_counter()
+    await asyncio.gather(*(simulated_player(host, port, n, rounds, mode, latencies)
+                           for n in range(players)))
+    elapsed = time.perf_counter() - t0
+    if not latencies:
+        print(f"{players} players x {rounds} rounds ({mode}): no round finished")
+        return 1
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]
+    print(f"{players} players x {rounds} rounds ({mode}): {len(latencies):,} rounds "
+          f"in {elapsed:.2f} s = {len(latencies) / elapsed:,.0f} rounds/s")
+    print(f"round latency p50 {p50 * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Networked Rock-Paper-Scissors.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    s = sub.add_parser("serve")
+    s.add_argument("--host", default=HOST)
+    s.add_argument("--port", type=int, default=PORT)
+    s.add_argument("--scores", default=SERVER_SCOREFILE)
+    t = sub.add_parser("loadtest")
+    t.add_argument("--host", default=HOST)
+    t.add_argument("--port", type=int, default=PORT)
+    t.add_argument("--players", type=int, default=100)
+    t.add_argument("--rounds", type=int, default=100)
+    t.add_argument("--mode", choices=("bot", "pvp"), default="bot")
+    args = parser.parse_args(argv)
+    try:
+        if args.command == "serve":
+            asyncio.run(Server(args.scores).serve(args.host, args.port))
+        else:
+            return asyncio.run(loadtest(args.host, args.port, args.players, args.rounds,
+                                        args.mode))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# Computer strategies for Rock-Paper-Scissors.
+#
+# A strategy picks the computer's move with choose() and learns from each
+# finished round with observe(opponent, own).  Moves are rps_engine codes
+# (rock=0, paper=1, scissors=2).  state()/load_state() give a small JSON
+# dict so the model can be saved next to rps_scores.json and warm-start.
+#
+#   python rps_strategy.py bench --rounds 1000000
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from abc import ABC, abstractmethod
+from array import array
+
+from rps_engine import MoveStream
+
+MAX_COUNT = 1024     # a row is halved when one count reaches this: bounded and adaptive
+MAX_ORDER = 10       # 3**10 rows of counts, 354 KB per Markov player
+
+
+class Strategy(ABC):
+    # a subclass without choose() fails when it is built, not mid-game
+    name = "base"
+
+    def __init__(self, seed=None):
+        self.seed = seed
+
+    @abstractmethod
+    def choose(self):
+        pass
+
+    def observe(self, opponent, own):
+        pass
+
+    def state(self):
+        return {"strategy": self.name}
+
+    def load_state(self, data):
+        pass
+
+
+class RandomStrategy(Strategy):
+    name = "random"
+
+    def __init__(self, seed=None):
+        super().__init__(seed)
+        self.moves = MoveStream(seed)
+
+    def choose(self):
+        return self.moves.next()
+
+
+class MarkovStrategy(Strategy):
+    # Order-n Markov model of the opponent: the last n opponent moves, as a
+    # base-3 number, select a row of three counts (what they played next).
+    # The table has 3**n rows whatever the session length, and choose() /
+    # observe() touch one row, so a round is O(1).
+    name = "markov"
+
+    def __init__(self, seed=None, order=2):
+        super().__init__(seed)
+        self.order = order
+        self.contexts = 3 ** order
+        self.counts = array("H", bytes(2 * 3 * self.contexts))
+        self.context = 0
+        self.rounds = 0
+        self.rng = random.Random(seed)
+
+    def choose(self):
+        c = self.counts
+        base = self.context * 3
+        r, p, s = c[base], c[base + 1], c[base + 2]
+        if r == p == s:
+            return self.rng.randrange(3)
+        predicted = 0 if r >= p and r >= s else (1 if p >= s else 2)
+        return (predicted + 1) % 3          # the move that beats the prediction
+
+    def observe(self, opponent, own):
+        c = self.counts
+        i = self.context * 3 + opponent
+        if c[i] + 1 >= MAX_COUNT:
+            base = self.context * 3
+            for j in range(base, base + 3):
+                c[j] >>= 1
+        c[i] += 1
+        self.context = (self.context * 3 + opponent) % self.contexts
+        self.rounds += 1
+
+    def state(self):
+        return {"strategy": self.name, "order": self.order, "context": self.context,
+                "rounds": self.rounds, "counts": self.counts.tolist()}
+
+    def load_state(self, data):
+        counts = data.get("counts", [])
+        if data.get("order") != self.order or len(counts) != len(self.counts):
+            return          # saved for another order: start fresh
+        self.counts = array("H", (min(max(int(n), 0), MAX_COUNT) for n in counts))
+        self.context = int(data.get("context", 0)) % self.contexts
+        self.rounds = int(data.get("rounds", 0))
+
+
+STRATEGIES = {cls.name: cls for cls in (RandomStrategy, MarkovStrategy)}
+
+
+def make_strategy(name, seed=None):
+    return STRATEGIES[name](seed)
+
+
+def load_strategy(path, name="markov"):
+    # the strategy `name`, warm-started from `path` when it holds its state
+    strategy = make_strategy(name)
+    if os.path.exists(path):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("strategy") == name:
+                strategy.load_state(data)
+        except (OSError, ValueError, TypeError, AttributeError, OverflowError):
+            pass
+    return strategy
+
+
+def save_strategy(strategy, path):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(strategy.state(), f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+# ---------- benchmark ----------
+def patterned_player(seed, noise=0.2):
+    # a predictable opponent: cycles rock, rock, paper, scissors with some noise
+    rng = random.Random(seed)
+    pattern = (0, 0, 1, 2)
+    i = 0
+    while True:
+        yield rng.randrange(3) if rng.random() < noise else pattern[i % 4]
+        i += 1
+
+
+def bench(rounds, name="markov", buckets=10, seed=1):
+    strategy = make_strategy(name, seed)
+    player = patterned_player(seed)
+    size = max(rounds // buckets, 1)
+    wins = 0
+    print(f"{name}: {rounds:,} rounds, per-round choose()+observe() latency")
+    for b in range(buckets):
+        t0 = time.perf_counter()
+        for _ in range(size):
+            own = strategy.choose()
+            opp = next(player)
+            strategy.observe(opp, own)
+            if (own - opp) % 3 == 1:
+                wins += 1
+        elapsed = time.perf_counter() - t0
+        print(f"  rounds {b * size:>9,}-{(b + 1) * size:>9,}: "
+              f"{elapsed / size * 1e9:8.0f} ns/round")
+    print(f"  computer win rate: {wins / (size * buckets):.1%}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RPS strategy tools.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    b = sub.add_parser("bench", help="per-round decision latency over a long session")
+    b.add_argument("--rounds", type=int, default=1_000_000)
+    b.add_argument("--strategy", choices=sorted(STRATEGIES), default="markov")
+    args = parser.parse_args(argv)
+    bench(args.rounds, args.strategy)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
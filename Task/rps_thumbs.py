@@ -0,0 +1,123 @@
+# Disk cache of resized images for the Rock-Paper-Scissors window.
+#
+# A thumbnail is keyed on the source path, its mtime and size, and the
+# target size, and stored as a PNG under .rps_thumbs/.  On a hit Tk loads
+# that PNG itself, so PIL is neither imported nor asked to resample; it is
+# only used (on a worker thread) to make a missing thumbnail.
+# ThumbnailLoader hands finished images back to the Tk thread, so widgets
+# can show a placeholder first and get the picture when it is ready.
+
+import hashlib
+import os
+import queue
+import threading
+import tkinter as tk
+
+THUMB_DIR = ".rps_thumbs"
+MAX_FILES = 64        # oldest thumbnails are deleted beyond this
+POLL_MS = 30
+
+
+def cache_key(path, size):
+    st = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}|{size[0]}x{size[1]}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def thumbnail(path, size, cache_dir=THUMB_DIR):
+    # path of a PNG of `path` resized to `size`, or None if it cannot be read
+    try:
+        thumb = os.path.join(cache_dir, cache_key(path, size) + ".png")
+    except OSError:
+        return None
+    if os.path.exists(thumb):
+        try:
+            os.utime(thumb)          # keeps recently used thumbnails out of prune()
+        except OSError:
+            pass
+        return thumb
+    try:
+        from PIL import Image
+        img = Image.open(path).convert("RGBA").resize(size, Image.LANCZOS)
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{thumb}.{threading.get_ident()}.tmp"
+        img.save(tmp, "PNG", compress_level=1)
+        os.replace(tmp, thumb)
+    except Exception:
+        return None
+    prune(cache_dir)
+    return thumb
+
+
+def prune(cache_dir=THUMB_DIR, max_files=MAX_FILES):
+    try:
+        names = [n for n in os.listdir(cache_dir) if n.endswith(".png")]
+        if len(names) <= max_files:
+            return
+        paths = sorted((os.path.join(cache_dir, n) for n in names), key=os.path.getmtime)
+        for p in paths[:len(paths) - max_files]:
+            os.remove(p)
+    except OSError:
+        pass
+
+
+def load_photo(path, size, master=None, cache_dir=THUMB_DIR):
+    # synchronous version: a PhotoImage of the resized image, or None
+    thumb = thumbnail(path, size, cache_dir)
+    if thumb is None:
+        return None
+    try:
+        return tk.PhotoImage(master=master, file=thumb)
+    except tk.TclError:
+        return None
+
+
+class ThumbnailLoader:
+    def __init__(self, widget, cache_dir=THUMB_DIR, poll_ms=POLL_MS):
+        self.widget = widget
+        self.cache_dir = cache_dir
+        self.poll_ms = poll_ms
+        self.jobs = queue.Queue()
+        self.done = queue.Queue()
+        self.outstanding = 0
+        self._polling = False
+        self._thread = threading.Thread(target=self._run, name="rps-thumbs", daemon=True)
+        self._thread.start()
+
+    def request(self, path, size, callback):
+        # callback(PhotoImage or None) runs later on the Tk thread
+        self.outstanding += 1
+        self.jobs.put((path, size, callback))
+        if not self._polling:
+            self._polling = True
+            self.widget.after(self.poll_ms, self._poll)
+
+    def close(self):
+        self.jobs.put(None)
+
+    def _run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            path, size, callback = job
+            self.done.put((thumbnail(path, size, self.cache_dir), callback))
+
+    def _poll(self):
+        while True:
+            try:
+                thumb, callback = self.done.get_nowait()
+            except queue.Empty:
+                break
+            self.outstanding -= 1
+            photo = None
+            if thumb is not None:
+                try:
+                    photo = tk.PhotoImage(master=self.widget, file=thumb)
+                except tk.TclError:
+                    pass
+            callback(photo)
+        if self.outstanding:
+            self.widget.after(self.poll_ms, self._poll)
+        else:
+            self._polling = False
@@ -0,0 +1,184 @@
+# Round-robin tournament between the computer strategies.
+#
+# Every pair of players meets in `matches` seeded matches of `rounds` rounds.
+# Matches are grouped into tasks and spread over a ProcessPoolExecutor; at
+# most a few tasks per worker are in flight and results are consumed in
+# submission order, so memory stays bounded and the table is the same for
+# any number of workers.  Each match seeds its two players from
+# (root seed, pair, match, side) alone, so no two matches share an RNG stream.
+#
+#   python rps_tournament.py --matches 200 --rounds 1000 --seed 1
+#   python rps_tournament.py --players random markov:1 markov:3 --workers 8 --out matches.jsonl
+
+import argparse
+import hashlib
+import inspect
+import itertools
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from rps_strategy import MAX_ORDER, STRATEGIES
+
+DEFAULT_PLAYERS = ["random", "markov:1", "markov", "markov:3"]
+MATCHES_PER_TASK = 20
+IN_FLIGHT_PER_WORKER = 4
+Z95 = 1.96
+
+
+def build(spec, seed):
+    # "name" or "name:order", e.g. "markov:3"
+    name, _, arg = spec.partition(":")
+    cls = STRATEGIES[name]
+    return cls(seed, int(arg)) if arg else cls(seed)
+
+
+def spec_error(spec):
+    # why build() would fail on `spec`, or None when it is fine
+    name, _, arg = spec.partition(":")
+    if name not in STRATEGIES:
+        return f"unknown strategy {spec!r}"
+    if not arg:
+        return None
+    if "order" not in inspect.signature(STRATEGIES[name]).parameters:
+        return f"{name} takes no order: {spec!r}"
+    if not arg.isdigit() or int(arg) > MAX_ORDER:
+        return f"the order must be a whole number from 0 to {MAX_ORDER}: {spec!r}"
+    return None
+
+
+def match_seed(root, pair, match, side):
+    key = f"{root}:{pair}:{match}:{side}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+def play_match(spec_a, spec_b, rounds, seed_a, seed_b):
+    # (a wins, b wins, ties), judged like GamePage.judge: (a - b) % 3
+    a = build(spec_a, seed_a)
+    b = build(spec_b, seed_b)
+    counts = [0, 0, 0]
+    for _ in range(rounds):
+        ma = a.choose()
+        mb = b.choose()
+        a.observe(mb, ma)
+        b.observe(ma, mb)
+        counts[(ma - mb) % 3] += 1
+    return counts[1], counts[2], counts[0]
+
+
+def run_task(task):
+    # worker entry point: a run of consecutive matches of one pairing
+    pair, spec_a, spec_b, first, count, rounds, root = task
+    return [(pair, m) + play_match(spec_a, spec_b, rounds,
+                                   match_seed(root, pair, m, 0), match_seed(root, pair, m, 1))
+            for m in range(first, first + count)]
+
+
+def tasks(players, matches, rounds, root, per_task=MATCHES_PER_TASK):
+    for pair, (a, b) in enumerate(itertools.combinations(range(len(players)), 2)):
+        for first in range(0, matches, per_task):
+            yield (pair, players[a], players[b], first, min(per_task, matches - first),
+                   rounds, root)
+
+
+def stream_results(task_iter, workers):
+    # match results in submission order with a bounded number of tasks in flight
+    if workers <= 1:
+        for task in task_iter:
+            yield from run_task(task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        window = deque()
+        for task in task_iter:
+            window.append(pool.submit(run_task, task))
+            if len(window) >= workers * IN_FLIGHT_PER_WORKER:
+                yield from window.popleft().result()
+        while window:
+            yield from window.popleft().result()
+
+
+class Tally:
+    # running totals for one player; the per-match score (wins - losses) /
+    # rounds goes through Welford's update for the mean and its variance
+    def __init__(self, spec):
+        self.spec = spec
+        self.wins = self.losses = self.ties = 0
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+
+    def add(self, wins, losses, ties):
+        self.wins += wins
+        self.losses += losses
+        self.ties += ties
+        score = (wins - losses) / max(wins + losses + ties, 1)
+        self.n += 1
+        delta = score - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (score - self.mean)
+
+    def ci95(self):
+        if self.n < 2:
+            return float("inf")
+        return Z95 * math.sqrt(self.m2 / (self.n - 1) / self.n)
+
+
+def run(players, matches, rounds, seed, workers, out=None):
+    pairs = list(itertools.combinations(range(len(players)), 2))
+    tallies = [Tally(p) for p in players]
+    for pair, match, a_wins, b_wins, ties in stream_results(
+            tasks(players, matches, rounds, seed), workers):
+        a, b = pairs[pair]
+        tallies[a].add(a_wins, b_wins, ties)
+        tallies[b].add(b_wins, a_wins, ties)
+        if out is not None:
+            out.write(json.dumps({"a": players[a], "b": players[b], "match": match,
+                                  "a_wins": a_wins, "b_wins": b_wins, "ties": ties}) + "\n")
+    return sorted(tallies, key=lambda t: (-t.mean, t.spec))
+
+
+def print_table(ranked):
+    print(f"{'#':>2}  {'strategy':<12}{'matches':>8}{'wins':>12}{'losses':>12}"
+          f"{'ties':>12}   score (95% CI)")
+    for rank, t in enumerate(ranked, 1):
+        print(f"{rank:>2}  {t.spec:<12}{t.n:>8}{t.wins:>12,}{t.losses:>12,}{t.ties:>12,}"
+              f"   {t.mean:+.4f} ± {t.ci95():.4f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Round-robin RPS strategy tournament.")
+    parser.add_argument("--players", nargs="+", default=DEFAULT_PLAYERS,
+                        help=f"strategy specs, name[:order] with name in {sorted(STRATEGIES)}")
+    parser.add_argument("--matches", type=int, default=100, help="matches per pairing")
+    parser.add_argument("--rounds", type=int, default=1000, help="rounds per match")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", help="also write every match result to this JSON Lines file")
+    args = parser.parse_args(argv)
+    for spec in args.players:
+        error = spec_error(spec)
+        if error:
+            parser.error(error)
+    if len(args.players) < 2:
+        parser.error("need at least two players")
+
+    t0 = time.perf_counter()
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        ranked = run(args.players, args.matches, args.rounds, args.seed, args.workers, out)
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    print_table(ranked)
+    total = len(args.players) * (len(args.players) - 1) // 2 * args.matches * args.rounds
+    print(f"{total:,} rounds in {elapsed:.2f} s on {args.workers} worker(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
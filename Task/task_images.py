@@ -0,0 +1,79 @@
+# Lazily decoded images for the To-Do window (the header icon and the
+# animated GIF).
+#
+# Opening an image with PIL only reads its header.  Frames are decoded and
+# resized the first time animate() asks for them, so a long GIF costs no
+# startup time.  A looping animation asks for every frame in turn, so a
+# cache smaller than the whole animation would miss on every frame: when
+# all frames fit CACHE_BYTES they are all kept, otherwise only the frame on
+# screen and the next one, which animate() prefetches from an after_idle()
+# once the current one is drawn.
+# PIL itself is imported only when one of the images is actually there.
+
+import os
+
+DEFAULT_DURATION = 100     # ms, for frames without a duration in the file
+MIN_DURATION = 20          # browsers treat 0/10 ms GIF frames as "as fast as possible"
+CACHE_BYTES = 16 << 20     # decoded frames, estimated at 4 bytes a pixel
+
+
+class LazyImage:
+    def __init__(self, path, size, cache_bytes=CACHE_BYTES):
+        from PIL import Image
+        self.image = Image.open(path)
+        self.size = size
+        self.n_frames = getattr(self.image, "n_frames", 1)
+        self.cache_all = self.n_frames * size[0] * size[1] * 4 <= cache_bytes
+        self.cache = {}                # frame index -> PhotoImage
+        self.durations = {}            # frame index -> ms, filled while decoding
+
+    def frame(self, index=0):
+        photo = self.cache.get(index)
+        if photo is None:
+            photo = self.cache[index] = self._decode(index)
+        if not self.cache_all:
+            # the label holds no reference of its own, so the frame it shows
+            # has to stay; so does the next one if it was prefetched
+            keep = (index, (index + 1) % self.n_frames)
+            for old in [i for i in self.cache if i not in keep]:
+                del self.cache[old]
+        return photo
+
+    def prefetch(self, index):
+        # decode frame `index` ahead of its turn
+        if index not in self.cache:
+            self.cache[index] = self._decode(index)
+
+    def _decode(self, index):
+        # sequential playback only ever seeks one frame forward; PIL rewinds
+        # on its own when the animation wraps around
+        from PIL import ImageTk
+        self.image.seek(index)
+        self.durations[index] = self._duration()
+        return ImageTk.PhotoImage(self.image.convert("RGBA").resize(self.size))
+
+    def duration(self, index):
+        # delay after frame `index`, in ms; known once the frame was decoded
+        ms = self.durations.get(index)
+        if ms is None:
+            self.frame(index)
+            ms = self.durations[index]
+        return ms
+
+    def _duration(self):
+        ms = self.image.info.get("duration") or DEFAULT_DURATION
+        return max(int(ms), MIN_DURATION)
+
+    def close(self):
+        self.cache.clear()
+        self.image.close()
+
+
+def open_image(path, size, cache_bytes=CACHE_BYTES):
+    # None when the file is missing or not an image PIL can read
+    if not os.path.exists(path):
+        return None
+    try:
+        return LazyImage(path, size, cache_bytes)
+    except (OSError, ValueError, ImportError):
+        return None
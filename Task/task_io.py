@@ -0,0 +1,175 @@
+# Streaming import/export of To-Do tasks (CSV or JSON Lines).
+#
+# Files are read row by row through generators and inserted in fixed-size
+# batches with TaskStore.add_many(), so memory stays bounded by the batch
+# size and every batch is a single store event (one journal record, one
+# SQLite transaction, one redraw).
+#
+# CSV:   text[,state]   (a first row starting with "text" is a header)
+# JSONL: {"text": "...", "state": "completed"} or just "..." per line
+#
+# Command line (run from the Task folder, no window is opened):
+#   python To_Do_List.py import tasks.csv
+#   python To_Do_List.py export backup.jsonl
+#   python To_Do_List.py import notes.txt --format jsonl --state completed
+
+import argparse
+import csv
+import itertools
+import json
+import os
+import sys
+
+from task_store import STATES, TaskStore
+
+BATCH_SIZE = 1000
+FORMATS = ("csv", "jsonl")
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    return "jsonl" if ext in (".jsonl", ".ndjson", ".json") else "csv"
+
+
+def _state(value, default):
+    value = (value or "").strip().lower()
+    if value in ("completed", "done", "1", "true", "yes"):
+        return "completed"
+    if value in ("pending", "0", "false", "no"):
+        return "pending"
+    return default
+
+
+# ---------- reading ----------
+def read_csv(f, default_state="pending"):
+    rows = csv.reader(f)
+    for n, row in enumerate(rows):
+        if not row:
+            continue
+        if n == 0 and row[0].strip().lower() == "text":
+            continue
+        text = row[0].strip()
+        if text:
+            yield text, _state(row[1] if len(row) > 1 else "", default_state)
+
+
+def read_jsonl(f, default_state="pending"):
+    # ValueError for a line that is not JSON, or not a string or an object
+    for n, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except ValueError as e:
+            raise ValueError(f"line {n}: {e}") from None
+        if isinstance(item, str):
+            text, state = item, default_state
+        elif not isinstance(item, dict):
+            raise ValueError(f"line {n}: expected a string or an object, found {line[:40]}")
+        else:
+            text = str(item.get("text", ""))
+            state = item.get("state", default_state)
+            if item.get("done") is True:
+                state = "completed"
+            state = _state(str(state), default_state)
+        text = text.strip()
+        if text:
+            yield text, state
+
+
+def read_tasks(f, fmt, default_state="pending"):
+    reader = read_jsonl if fmt == "jsonl" else read_csv
+    return reader(f, default_state)
+
+
+def batched(items, size=BATCH_SIZE):
+    it = iter(items)
+    while True:
+        batch = list(itertools.islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_batches(store, f, fmt, batch_size=BATCH_SIZE, default_state="pending"):
+    # generator: adds one batch per step and yields the running total, so the
+    # GUI can drive it from root.after() and stay responsive
+    total = 0
+    for batch in batched(read_tasks(f, fmt, default_state), batch_size):
+        store.add_many(batch)
+        total += len(batch)
+        yield total
+
+
+# ---------- writing ----------
+def export_rows(store, f, fmt, batch_size=BATCH_SIZE):
+    # generator: writes batch_size tasks per step and yields the running total
+    writer = csv.writer(f) if fmt == "csv" else None
+    if writer:
+        writer.writerow(["text", "state"])
+    total = 0
+    for state in STATES:
+        # copy the references so edits made while the GUI exports in steps
+        # cannot change the dict under the iterator
+        for batch in batched(list(store.tasks_in(state)), batch_size):
+            if writer:
+                writer.writerows([t.text, t.state] for t in batch)
+            else:
+                f.write("".join(json.dumps({"text": t.text, "state": t.state}) + "\n"
+                                for t in batch))
+            total += len(batch)
+            yield total
+
+
+def run(steps):
+    # drain one of the generators above, returning the final count
+    total = 0
+    for total in steps:
+        pass
+    return total
+
+
+# ---------- command line ----------
+def main(argv, backend):
+    # backend is a Journal or SqliteStore; the store is loaded from it,
+    # changed, and written back once when the backend is closed.  Bad
+    # arguments print the usage and exit with 2 (argparse).
+    parser = argparse.ArgumentParser(prog="To_Do_List.py",
+                                     description="Import or export tasks without a window.")
+    parser.add_argument("command", choices=("import", "export"))
+    parser.add_argument("path", metavar="FILE")
+    parser.add_argument("--format", choices=FORMATS,
+                        help="default: from the file extension")
+    parser.add_argument("--state", choices=STATES, default="pending",
+                        help="for imported rows that do not say")
+    args = parser.parse_args(argv)
+    command, path, default_state = args.command, args.path, args.state
+    fmt = args.format or detect_format(path)
+
+    store = TaskStore()
+    if hasattr(backend, "reserve_ids"):
+        store.id_block = backend.reserve_ids
+    backend.load(store)
+    try:
+        if command == "import":
+            store.subscribe(lambda event, task: backend.append(event))
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                count = run(import_batches(store, f, fmt, default_state=default_state))
+            print(f"Imported {count} tasks from {path}")
+        else:
+            with open(path, "w", encoding="utf-8", newline="") as f:
+                count = run(export_rows(store, f, fmt))
+            print(f"Exported {count} tasks to {path}")
+    except (OSError, ValueError, csv.Error) as e:
+        # batches already imported stay imported
+        print(f"{command.capitalize()} failed: {e}")
+        return 1
+    finally:
+        backend.close()
+    return 0
+
+
+if __name__ == "__main__":
+    from task_journal import Journal
+    sys.exit(main(sys.argv[1:], Journal("tasks.json")))
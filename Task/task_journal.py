@@ -0,0 +1,327 @@
+# Append-only journal persistence for the To-Do list.
+#
+# tasks.json holds a compacted snapshot of the TaskStore and tasks.json.log
+# holds one small JSON record per change event the store emitted since that
+# snapshot.  Both carry a generation number: a log is only replayed on top of
+# the snapshot with the same generation, so a crash in the middle of
+# compaction can never apply the same records twice.
+#
+# Several instances can share the same files.  Every write happens under an
+# advisory fcntl lock (tasks.json.lock), and each instance remembers how many
+# bytes of the log it has already applied.  Before writing, and whenever a
+# stat() of the log changes, it reads only the records appended since then
+# and merges them into its store.  Compaction moves the old log aside to
+# tasks.json.log.prev so a lagging instance can still pick up the tail it
+# missed.  Task ids are handed out in blocks from tasks.json.ids so two
+# instances never create the same id.
+
+import itertools
+import json
+import os
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:          # Windows: no advisory locks, single instance only
+    fcntl = None
+
+from task_store import TaskStore
+
+LOG_SUFFIX = ".log"
+COMPACT_EVERY = 500      # records in the log before it is folded into the snapshot
+ID_BLOCK = 1024          # task ids reserved per trip to the shared id counter
+OTHER = {"pending": "completed", "completed": "pending"}
+
+
+def atomic_write_json(path, data):
+    # write to a temp file next to the target, then rename over it
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def apply_record(store, rec, notify=False):
+    if "list" in rec:
+        rec = _upgrade_record(store, rec)
+    store.apply(rec, notify)
+
+
+def _upgrade_record(store, rec):
+    # logs written before tasks had ids address them by list position
+    op, lst = rec["op"], rec["list"]
+    if op == "add":
+        return {"op": "add", "id": store.next_id, "state": lst, "text": rec["text"]}
+    task_id = next(itertools.islice(store.states[lst], rec["index"], None))
+    if op == "move":
+        return {"op": "move", "id": task_id, "state": OTHER[lst]}
+    if op == "edit":
+        return {"op": "edit", "id": task_id, "text": rec["text"]}
+    return {"op": "delete", "id": task_id}
+
+
+def read_header(path):
+    # (generation, header length in bytes) of a log file, or (None, 0)
+    try:
+        with open(path, "rb") as f:
+            line = f.readline()
+        return json.loads(line).get("generation"), len(line)
+    except (OSError, ValueError, AttributeError):
+        return None, 0
+
+
+def read_records(path, offset):
+    # complete records after `offset` and the offset just past the last one;
+    # a torn line at the end (writer crashed or still writing) is left alone
+    with open(path, "rb") as f:
+        f.seek(offset)
+        data = f.read()
+    end = data.rfind(b"\n") + 1
+    records = []
+    for line in data[:end].splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+    return records, offset + end
+
+
+def _contents(store):
+    return {t.id: (t.text, t.state, t.priority, t.due) for t in store.tasks.values()}
+
+
+def diff_records(before, store):
+    # records that turn a store holding `before` into `store`
+    records = []
+    for task_id in before.keys() - store.tasks.keys():
+        records.append({"op": "delete", "id": task_id})
+    for task in store.tasks.values():
+        old = before.get(task.id)
+        if old is None:
+            records.append({"op": "add", "id": task.id, "state": task.state, "text": task.text,
+                            "priority": task.priority, "due": task.due})
+            continue
+        if old[0] != task.text:
+            records.append({"op": "edit", "id": task.id, "text": task.text})
+        if old[1] != task.state:
+            records.append({"op": "move", "id": task.id, "state": task.state})
+        if old[2:] != (task.priority, task.due):
+            records.append({"op": "schedule", "id": task.id,
+                            "priority": task.priority, "due": task.due})
+    return records
+
+
+class Journal:
+    def __init__(self, path, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.log_path = path + LOG_SUFFIX
+        self.prev_path = self.log_path + ".prev"
+        self.lock_path = path + ".lock"
+        self.ids_path = path + ".ids"
+        self.compact_every = compact_every
+        self.store = None
+        self.generation = 0
+        self.pending_records = 0
+        self.offset = 0          # bytes of the current log already applied
+        self.log_stat = None     # stat of the log when we last looked
+        self.apply_own = False   # apply appended records to self.store too
+        self.on_remote = None    # called with records written by other instances
+
+    # ---------- locking ----------
+    @contextmanager
+    def locked(self, exclusive=True):
+        if fcntl is None:
+            yield
+            return
+        with open(self.lock_path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def reserve_ids(self, hint=1, count=ID_BLOCK):
+        # next free block of task ids, shared by every instance
+        with self.locked():
+            try:
+                with open(self.ids_path, "r", encoding="utf-8") as f:
+                    start = int(f.read().strip() or 0)
+            except (OSError, ValueError):
+                start = 0
+            start = max(start, hint)
+            tmp = self.ids_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(str(start + count))
+            os.replace(tmp, self.ids_path)
+        return start, start + count
+
+    def use_shadow(self, store):
+        # the background writer hands over its own copy of the store and
+        # lets the journal apply records in log order
+        self.store = store
+        self.apply_own = True
+
+    # ---------- loading ----------
+    def load(self, store):
+        # fill the store and make sure a log for this generation exists; the
+        # caller feeds store events to append()
+        with self.locked():
+            self.load_readonly(store)
+            gen, _ = read_header(self.log_path)
+            if gen != self.generation:
+                self._write_log_header()
+            self._remember_log()
+        return store
+
+    def load_readonly(self, store=None):
+        # snapshot + log tail, without creating the log
+        if store is None:
+            store = TaskStore()
+        self.store = store
+        self.generation = 0
+        store.clear()
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    snap = json.load(f)
+                store.load_snapshot(snap)
+                self.generation = int(snap.get("generation", 0))
+            except (OSError, ValueError, KeyError, IndexError, TypeError):
+                store.clear()
+
+        self.pending_records = 0
+        self.offset = 0
+        gen, header_len = read_header(self.log_path)
+        if gen == self.generation:
+            # otherwise: stale log left behind by an interrupted compaction
+            records, self.offset = read_records(self.log_path, header_len)
+            self.pending_records = self._apply(records)
+        return store
+
+    def _apply(self, records, notify=False):
+        count = 0
+        for rec in records:
+            try:
+                apply_record(self.store, rec, notify)
+            except (KeyError, StopIteration):
+                continue
+            count += 1
+        return count
+
+    def _remember_log(self):
+        self.log_stat = self._stat_log()
+
+    def _stat_log(self):
+        try:
+            st = os.stat(self.log_path)
+        except OSError:
+            return None
+        return st.st_ino, st.st_size, st.st_mtime_ns
+
+    def _write_log_header(self):
+        tmp = self.log_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"generation": self.generation}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.log_path)
+        self.offset = os.path.getsize(self.log_path)
+
+    # ---------- merging other instances ----------
+    def changed(self):
+        # cheap check without the lock: has anyone touched the log?
+        return self._stat_log() != self.log_stat
+
+    def poll(self):
+        if self.changed():
+            with self.locked():
+                self.sync()
+
+    def sync(self, own=()):
+        # caller holds the lock; merge whatever other instances appended.
+        # `own` are records about to be appended, already applied to the store
+        if not self.changed():
+            return
+        # a log is identified by the generation in its header, not by its
+        # inode: inode numbers get reused once the old .prev is deleted
+        gen, header_len = read_header(self.log_path)
+        if gen == self.generation:
+            records, self.offset = read_records(self.log_path, self.offset)
+        else:
+            prev_gen, _ = read_header(self.prev_path)
+            if gen == self.generation + 1 and prev_gen == self.generation:
+                # one compaction happened elsewhere: finish the old log, then
+                # continue in the new one
+                records, _ = read_records(self.prev_path, self.offset)
+                more, self.offset = read_records(self.log_path, header_len)
+                records += more
+                self.generation = gen
+                self.pending_records = 0
+            else:
+                # fell too far behind: reload everything and tell the
+                # listener what changed as ordinary records
+                before = _contents(self.store) if self.on_remote else None
+                self.load_readonly(self.store)
+                self._remember_log()
+                if not self.apply_own:
+                    self._apply(own)
+                if self.on_remote:
+                    self.on_remote(diff_records(before, self.store))
+                return
+        self._remember_log()
+        self.pending_records += self._apply(records)
+        if records and self.on_remote:
+            self.on_remote(records)
+
+    # ---------- writing ----------
+    def append(self, rec):
+        self.append_many((rec,))
+
+    def append_many(self, records):
+        # one locked write + flush for a whole burst of records
+        with self.locked():
+            self.sync(records)
+            if self.apply_own:
+                # drop changes to tasks another instance already deleted
+                kept = []
+                for rec in records:
+                    try:
+                        apply_record(self.store, rec)
+                    except (KeyError, StopIteration):
+                        continue
+                    kept.append(rec)
+                records = kept
+            if records:
+                data = "".join(json.dumps(rec, separators=(",", ":")) + "\n"
+                               for rec in records).encode("utf-8")
+                with open(self.log_path, "ab") as f:
+                    f.write(data)
+                self.offset += len(data)
+                self.pending_records += len(records)
+                self._remember_log()
+            if self.pending_records >= self.compact_every:
+                self._compact()
+
+    def compact(self):
+        with self.locked():
+            self.sync()
+            self._compact()
+
+    def _compact(self):
+        # new snapshot first, then move the old log aside and start the next
+        # generation's log
+        snap = self.store.snapshot()
+        snap["generation"] = self.generation + 1
+        atomic_write_json(self.path, snap)
+        self.generation += 1
+        if os.path.exists(self.log_path):
+            os.replace(self.log_path, self.prev_path)
+        self._write_log_header()
+        self._remember_log()
+        self.pending_records = 0
+
+    def close(self):
+        if self.store is not None and self.pending_records:
+            self.compact()
@@ -0,0 +1,221 @@
+# Priority / due-date ordering and reminders for the To-Do tasks.
+#
+# ScheduleIndex follows TaskStore change events and keeps the pending tasks
+# in two sorted containers (by priority and by due date), so the sorted
+# pending view is read straight from the index instead of sorting 100k tasks
+# on every redraw.  A heap of (due, id) gives the next reminder in O(1);
+# entries that went stale (task completed, deleted or rescheduled) are
+# dropped lazily when they reach the top.
+
+import heapq
+from bisect import bisect_left, bisect_right, insort
+
+LOAD = 512       # keys per chunk of a SortedList
+ORDERS = ("priority", "due")
+
+
+class SortedList:
+    # list of sorted chunks: O(log n) search, inserts and removals only move
+    # one chunk, and positional access bisects a lazily rebuilt offset table
+    def __init__(self, load=LOAD):
+        self.load = load
+        self._lists = []
+        self._maxes = []
+        self._offsets = None
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def __iter__(self):
+        for lst in self._lists:
+            yield from lst
+
+    def add(self, key):
+        if not self._maxes:
+            self._lists.append([key])
+            self._maxes.append(key)
+        else:
+            i = bisect_left(self._maxes, key)
+            if i == len(self._maxes):
+                i -= 1
+                self._lists[i].append(key)
+                self._maxes[i] = key
+            else:
+                insort(self._lists[i], key)
+            lst = self._lists[i]
+            if len(lst) > 2 * self.load:
+                self._lists[i:i + 1] = [lst[:self.load], lst[self.load:]]
+                self._maxes[i:i + 1] = [lst[self.load - 1], lst[-1]]
+        self._len += 1
+        self._offsets = None
+
+    def remove(self, key):
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            raise ValueError(key)
+        lst = self._lists[i]
+        j = bisect_left(lst, key)
+        if j == len(lst) or lst[j] != key:
+            raise ValueError(key)
+        del lst[j]
+        if lst:
+            self._maxes[i] = lst[-1]
+        else:
+            del self._lists[i]
+            del self._maxes[i]
+        self._len -= 1
+        self._offsets = None
+
+    def _locate(self):
+        if self._offsets is None:
+            offsets, total = [], 0
+            for lst in self._lists:
+                offsets.append(total)
+                total += len(lst)
+            self._offsets = offsets
+        return self._offsets
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._len))]
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError("SortedList index out of range")
+        offsets = self._locate()
+        i = bisect_right(offsets, index) - 1
+        return self._lists[i][index - offsets[i]]
+
+    def index(self, key):
+        i = bisect_left(self._maxes, key)
+        if i < len(self._maxes):
+            lst = self._lists[i]
+            j = bisect_left(lst, key)
+            if j < len(lst) and lst[j] == key:
+                return self._locate()[i] + j
+        raise ValueError(key)
+
+    def clear(self):
+        self._lists.clear()
+        self._maxes.clear()
+        self._offsets = None
+        self._len = 0
+
+
+def priority_key(task):
+    # highest priority first, then the order the tasks were added
+    return (-task.priority, task.seq, task.id)
+
+
+def due_key(task):
+    # earliest due date first, tasks without one at the end
+    return (task.due is None, task.due or 0, task.seq, task.id)
+
+
+SORT_KEYS = {"priority": priority_key, "due": due_key}
+
+
+class SortedView:
+    # read-only sequence of Tasks over one of the index's SortedLists, in the
+    # shape VirtualList expects (len, [i], [a:b], index)
+    def __init__(self, schedule, order):
+        self.schedule = schedule
+        self.keys = schedule.sorted[order]
+        self.key = SORT_KEYS[order]
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, i):
+        tasks = self.schedule.store.tasks
+        if isinstance(i, slice):
+            return [tasks[k[-1]] for k in self.keys[i]]
+        return tasks[self.keys[i][-1]]
+
+    def __iter__(self):
+        tasks = self.schedule.store.tasks
+        return (tasks[k[-1]] for k in self.keys)
+
+    def index(self, task):
+        if task.state != "pending" or task.id not in self.schedule.store.tasks:
+            raise ValueError(task)
+        return self.keys.index(self.key(task))
+
+
+class ScheduleIndex:
+    def __init__(self, store=None):
+        self.store = store
+        self.sorted = {order: SortedList() for order in ORDERS}
+        self.keys_of = {}      # task id -> (priority key, due key) currently indexed
+        self.heap = []         # (due, id) reminders, possibly stale
+        self.armed = {}        # task id -> due of its live heap entry
+        if store is not None:
+            self.rebuild(store)
+            store.subscribe(self.on_change)
+
+    # ---------- maintenance ----------
+    def rebuild(self, store):
+        self.store = store
+        for keys in self.sorted.values():
+            keys.clear()
+        self.keys_of.clear()
+        self.heap = []
+        self.armed.clear()
+        for task in store.tasks_in("pending"):
+            self._insert(task)
+
+    def on_change(self, event, task):
+        op = event["op"]
+        if op == "add_many":
+            for t in task:
+                if t.state == "pending":
+                    self._insert(t)
+            return
+        if op not in ("add", "move", "schedule", "delete"):
+            return
+        self._remove(task.id)
+        if op != "delete" and task.state == "pending":
+            self._insert(task)
+
+    def _insert(self, task):
+        keys = (priority_key(task), due_key(task))
+        self.keys_of[task.id] = keys
+        self.sorted["priority"].add(keys[0])
+        self.sorted["due"].add(keys[1])
+        if task.due is not None:
+            self.armed[task.id] = task.due
+            heapq.heappush(self.heap, (task.due, task.id))
+
+    def _remove(self, task_id):
+        keys = self.keys_of.pop(task_id, None)
+        if keys is not None:
+            self.sorted["priority"].remove(keys[0])
+            self.sorted["due"].remove(keys[1])
+        self.armed.pop(task_id, None)
+
+    # ---------- queries ----------
+    def view(self, order):
+        return SortedView(self, order)
+
+    def next_due(self):
+        # due time of the earliest pending reminder, or None
+        heap = self.heap
+        while heap:
+            due, task_id = heap[0]
+            if self.armed.get(task_id) == due:
+                return due
+            heapq.heappop(heap)
+        return None
+
+    def pop_due(self, now):
+        # pending tasks due at or before `now`; each is returned once until
+        # it is rescheduled
+        tasks = []
+        while True:
+            due = self.next_due()
+            if due is None or due > now:
+                return tasks
+            _, task_id = heapq.heappop(self.heap)
+            del self.armed[task_id]
+            tasks.append(self.store.tasks[task_id])
@@ -0,0 +1,157 @@
+# Live search over the To-Do tasks.
+#
+# An inverted index (token -> task ids) plus a prefix trie over the tokens,
+# both kept up to date from TaskStore change events instead of being rebuilt.
+# A query matches a task when every query word is a prefix of some word in
+# the task, so typing "buy mi" finds "Buy milk".
+
+import re
+
+_WORD = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return set(_WORD.findall(text.lower()))
+
+
+class _Node:
+    __slots__ = ("children", "terminal")
+
+    def __init__(self):
+        self.children = {}
+        self.terminal = False
+
+
+class SearchIndex:
+    def __init__(self, store=None):
+        self.postings = {}     # token -> set of task ids
+        self.tokens_of = {}    # task id -> tokens, so edits/deletes can unindex
+        self.root = _Node()
+        self._prefix_cache = {}
+        if store is not None:
+            self.rebuild(store)
+            store.subscribe(self.on_change)
+
+    # ---------- maintenance ----------
+    def rebuild(self, store):
+        self.postings.clear()
+        self.tokens_of.clear()
+        self.root = _Node()
+        for task in store.tasks.values():
+            self._index(task.id, task.text)
+
+    def on_change(self, event, task):
+        op = event["op"]
+        if op == "add":
+            self._index(task.id, task.text)
+        elif op == "add_many":
+            for t in task:
+                self._index(t.id, t.text)
+        elif op == "edit":
+            self._unindex(task.id)
+            self._index(task.id, task.text)
+        elif op == "delete":
+            self._unindex(task.id)
+
+    def _index(self, task_id, text):
+        tokens = tokenize(text)
+        self.tokens_of[task_id] = tokens
+        for token in tokens:
+            ids = self.postings.get(token)
+            if ids is None:
+                ids = self.postings[token] = set()
+                self._trie_insert(token)
+            ids.add(task_id)
+        if tokens:
+            self._prefix_cache.clear()
+
+    def _unindex(self, task_id):
+        tokens = self.tokens_of.pop(task_id, ())
+        for token in tokens:
+            ids = self.postings[token]
+            ids.discard(task_id)
+            if not ids:
+                del self.postings[token]
+                self._trie_remove(token)
+        if tokens:
+            self._prefix_cache.clear()
+
+    def _trie_insert(self, token):
+        node = self.root
+        for ch in token:
+            child = node.children.get(ch)
+            if child is None:
+                child = node.children[ch] = _Node()
+            node = child
+        node.terminal = True
+
+    def _trie_remove(self, token):
+        path = [self.root]
+        for ch in token:
+            path.append(path[-1].children[ch])
+        path[-1].terminal = False
+        # prune branches that no longer lead to any token
+        for i in range(len(token) - 1, -1, -1):
+            node = path[i + 1]
+            if node.terminal or node.children:
+                break
+            del path[i].children[token[i]]
+
+    # ---------- queries ----------
+    def tokens_with_prefix(self, prefix):
+        node = self.root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        found = []
+        stack = [(node, prefix)]
+        while stack:
+            node, word = stack.pop()
+            if node.terminal:
+                found.append(word)
+            for ch, child in node.children.items():
+                stack.append((child, word + ch))
+        return found
+
+    def ids_with_prefix(self, prefix):
+        ids = self._prefix_cache.get(prefix)
+        if ids is None:
+            tokens = self.tokens_with_prefix(prefix)
+            if len(tokens) == 1:
+                ids = self.postings[tokens[0]]
+            else:
+                ids = set()
+                for token in tokens:
+                    ids |= self.postings[token]
+            self._prefix_cache[prefix] = ids
+        return ids
+
+    def search(self, query):
+        # ids of the tasks matching every word of the query (None for an
+        # empty query); the returned set belongs to the index, do not modify
+        words = tokenize(query)
+        if not words:
+            return None
+        sets = sorted((self.ids_with_prefix(w) for w in words), key=len)
+        if len(sets) == 1:
+            return sets[0]
+        result = set(sets[0])
+        for ids in sets[1:]:
+            result &= ids
+            if not result:
+                break
+        return result
+
+
+def brute_force_search(store, query):
+    # reference implementation: scan every task
+    words = tokenize(query)
+    if not words:
+        return None
+    result = set()
+    for task in store.tasks.values():
+        tokens = tokenize(task.text)
+        if all(any(t.startswith(w) for t in tokens) for w in words):
+            result.add(task.id)
+    return result
@@ -0,0 +1,176 @@
+# Optional SQLite backend for the To-Do list.
+#
+# One row per task with its stable TaskStore id, its state
+# (pending/completed), its position inside that state and created/updated
+# timestamps.  It takes the same store events as task_journal.Journal, so the
+# GUI does not care which backend is in use; every event becomes a single
+# keyed INSERT/UPDATE/DELETE.
+
+import os
+import sqlite3
+import sys
+import time
+
+from task_journal import Journal
+from task_store import STATES, TaskStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id       INTEGER PRIMARY KEY,
+    text     TEXT    NOT NULL,
+    state    TEXT    NOT NULL,
+    position INTEGER NOT NULL,
+    created  REAL    NOT NULL,
+    updated  REAL    NOT NULL,
+    priority INTEGER NOT NULL DEFAULT 0,
+    due      REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_state_pos ON tasks (state, position);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# databases created before tasks had a priority and a due date
+UPGRADES = [
+    ("priority", "ALTER TABLE tasks ADD COLUMN priority INTEGER NOT NULL DEFAULT 0"),
+    ("due", "ALTER TABLE tasks ADD COLUMN due REAL"),
+]
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS tasks_state_due ON tasks (state, due);
+CREATE INDEX IF NOT EXISTS tasks_state_priority ON tasks (state, priority);
+"""
+
+
+class SqliteStore:
+    def __init__(self, path, json_path=None):
+        self.path = path
+        self.json_path = json_path
+        self.conn = None
+        self.next_pos = {s: 0 for s in STATES}
+
+    # ---------- setup ----------
+    def open(self):
+        if self.conn is None:
+            # opened on the GUI thread, written from the background writer
+            self.conn = sqlite3.connect(self.path, check_same_thread=False)
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+            columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+            for column, sql in UPGRADES:
+                if column not in columns:
+                    self.conn.execute(sql)
+            self.conn.executescript(INDEXES)
+        return self.conn
+
+    def migrate_json(self):
+        # one-shot import of tasks.json (plus any journal tail) into an empty
+        # db; a db that already holds tasks is left alone, since the ids in
+        # the two can clash
+        conn = self.open()
+        done = conn.execute("SELECT value FROM meta WHERE key='migrated'").fetchone()
+        if done or not self.json_path or not os.path.exists(self.json_path):
+            return 0
+        if conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone():
+            print(f"{self.path} already holds tasks; {self.json_path} was not imported",
+                  file=sys.stderr)
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated', ?)", ("",))
+            return 0
+        old = Journal(self.json_path).load_readonly(TaskStore())
+        now = time.time()
+        rows = []
+        for state in STATES:
+            for pos, task in enumerate(old.tasks_in(state)):
+                rows.append((task.id, task.text, state, pos, now, now, task.priority, task.due))
+        with conn:
+            conn.executemany(
+                "INSERT INTO tasks (id, text, state, position, created, updated, priority, due) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            conn.execute("INSERT OR REPLACE INTO meta VALUES ('migrated', ?)", (self.json_path,))
+        return len(rows)
+
+    def load(self, store):
+        conn = self.open()
+        self.migrate_json()
+        store.clear()
+        with store.muted():
+            for state in STATES:
+                for row_id, text, pos, priority, due in conn.execute(
+                        "SELECT id, text, position, priority, due FROM tasks "
+                        "WHERE state=? ORDER BY position", (state,)):
+                    store.add(text, state, row_id, priority, due)
+                    self.next_pos[state] = pos + 1
+        return store
+
+    # ---------- writing ----------
+    def append(self, event):
+        self.append_many((event,))
+
+    def append_many(self, events):
+        # a whole burst of events in one transaction
+        conn = self.open()
+        now = time.time()
+        with conn:
+            for event in events:
+                self._write_event(conn, event, now)
+
+    def _write_event(self, conn, event, now):
+        op, task_id = event["op"], event.get("id")
+        if op == "add_many":
+            conn.executemany(
+                "INSERT INTO tasks (id, text, state, position, created, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(tid, text, state, self._take_pos(state), now, now)
+                 for tid, state, text in event["tasks"]])
+        elif op == "add":
+            state = event["state"]
+            conn.execute(
+                "INSERT INTO tasks (id, text, state, position, created, updated, priority, due) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (task_id, event["text"], state, self._place(conn, state, event.get("before")),
+                 now, now, event.get("priority", 0), event.get("due")))
+        elif op == "edit":
+            conn.execute("UPDATE tasks SET text=?, updated=? WHERE id=?",
+                         (event["text"], now, task_id))
+        elif op == "move":
+            state = event["state"]
+            conn.execute("UPDATE tasks SET state=?, position=?, updated=? WHERE id=?",
+                         (state, self._place(conn, state, event.get("before")), now, task_id))
+        elif op == "schedule":
+            conn.execute("UPDATE tasks SET priority=?, due=?, updated=? WHERE id=?",
+                         (event["priority"], event["due"], now, task_id))
+        elif op == "delete":
+            conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
+
+    def _take_pos(self, state):
+        pos = self.next_pos[state]
+        self.next_pos[state] = pos + 1
+        return pos
+
+    def _place(self, conn, state, before=None):
+        # a position at the end of `state`, or the one of the task `before`
+        # after shifting it and everything behind it down a row (undo)
+        row = None
+        if before is not None:
+            row = conn.execute("SELECT position FROM tasks WHERE id=? AND state=?",
+                               (before, state)).fetchone()
+        if row is None:
+            return self._take_pos(state)
+        conn.execute("UPDATE tasks SET position=position+1 WHERE state=? AND position>=?",
+                     (state, row[0]))
+        self._take_pos(state)
+        return row[0]
+
+    def compact(self):
+        if self.conn is not None:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        if self.conn is not None:
+            self.compact()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,247 @@
+# Headless task model for the To-Do app.
+#
+# TaskStore owns the tasks; the Tk widgets and the persistence backends only
+# listen to it.  Every task has a stable integer id.  Lookup by id is a dict
+# hit and each state keeps its tasks in an insertion-ordered dict, so add,
+# edit, move and delete are all O(1); only putting a task back in front of
+# another one (undo) is O(n).  Nothing in here imports tkinter.
+
+from contextlib import contextmanager, nullcontext
+
+STATES = ("pending", "completed")
+
+
+class Task:
+    # seq grows every time a task is appended to a state, so sorting by it
+    # reproduces the display order without storing positions.  A task put
+    # back in front of another one (undo) gets a seq halfway to its neighbour.
+    # priority: 0 (none) .. 3 (high); due: Unix timestamp or None
+    __slots__ = ("id", "text", "state", "seq", "priority", "due")
+
+    def __init__(self, task_id, text, state="pending", seq=0, priority=0, due=None):
+        self.id = task_id
+        self.text = text
+        self.state = state
+        self.seq = seq
+        self.priority = priority
+        self.due = due
+
+    def __repr__(self):
+        return f"Task({self.id!r}, {self.text!r}, {self.state!r})"
+
+
+class TaskStore:
+    def __init__(self):
+        self.tasks = {}
+        self.states = {s: {} for s in STATES}
+        self.next_id = 1
+        # optional callable(hint) -> (start, end) handing out blocks of ids
+        # shared with other processes (see Journal.reserve_ids)
+        self.id_block = None
+        self._block = (0, 0)
+        self._seq = 0
+        self._listeners = []
+        self._muted = 0
+
+    # ---------- change notifications ----------
+    # listener(event, task) is called after every mutation; event is a small
+    # dict such as {"op": "move", "id": 7, "state": "completed"} that the
+    # persistence backends can write out as-is and replay through apply().
+    # For "add_many" the second argument is the list of new tasks.
+    def subscribe(self, listener):
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        self._listeners.remove(listener)
+
+    @contextmanager
+    def muted(self):
+        # bulk loads and replays should not echo back to the listeners
+        self._muted += 1
+        try:
+            yield self
+        finally:
+            self._muted -= 1
+
+    def _emit(self, event, task):
+        if self._muted:
+            return
+        for listener in self._listeners:
+            listener(event, task)
+
+    # ---------- queries ----------
+    def get(self, task_id):
+        return self.tasks[task_id]
+
+    def tasks_in(self, state):
+        return self.states[state].values()
+
+    def in_order(self, ids):
+        # the given task ids as tasks, in display order
+        return sorted((self.tasks[i] for i in ids), key=lambda t: t.seq)
+
+    def task_after(self, state, seq):
+        # id of the first task in `state` that comes after position `seq`, or None
+        return next((t.id for t in self.states[state].values() if t.seq > seq), None)
+
+    def count(self, state=None):
+        if state is None:
+            return len(self.tasks)
+        return len(self.states[state])
+
+    def __len__(self):
+        return len(self.tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self.tasks
+
+    # ---------- mutations ----------
+    def _new_id(self):
+        if self.id_block is None:
+            return self.next_id
+        start, end = self._block
+        if start >= end or start in self.tasks:
+            start, end = self.id_block(self.next_id)
+        self._block = (start + 1, end)
+        return start
+
+    def _place(self, task, before=None, seq=None):
+        # file `task` under its state: at the end, or in front of the task
+        # `before` when that one is there (O(n), only undo asks for it), with
+        # the seq it had before when that still fits; returns `before` when
+        # it was used
+        tasks = self.states[task.state]
+        if before is None or before not in tasks:
+            last = next(reversed(tasks.values()), None)
+            if seq is not None and (last is None or last.seq < seq):
+                task.seq = seq
+            else:
+                self._seq += 1
+                task.seq = self._seq
+            tasks[task.id] = task
+            return None
+        placed = {}
+        prev = 0
+        for t in tasks.values():
+            if t.id == before:
+                task.seq = seq if seq is not None and prev < seq < t.seq else (prev + t.seq) / 2
+                placed[task.id] = task
+            placed[t.id] = t
+            prev = t.seq
+        tasks.clear()                  # in place: views may hold tasks_in() of it
+        tasks.update(placed)
+        return before
+
+    def add(self, text, state="pending", task_id=None, priority=0, due=None, before=None,
+            seq=None):
+        if task_id is None:
+            task_id = self._new_id()
+        if task_id in self.tasks:
+            raise KeyError(f"duplicate task id {task_id}")
+        self.next_id = max(self.next_id, task_id + 1)
+        task = Task(task_id, text, state, 0, priority, due)
+        self.tasks[task_id] = task
+        before = self._place(task, before, seq)
+        event = {"op": "add", "id": task_id, "state": state, "text": text}
+        if priority or due is not None:
+            event["priority"] = priority
+            event["due"] = due
+        if before is not None:
+            event["before"] = before
+        self._emit(event, task)
+        return task
+
+    def add_many(self, items):
+        # bulk insert of (text, state) pairs announced as one "add_many"
+        # event, so listeners and backends handle a whole batch at once
+        tasks = []
+        with self.muted():
+            for text, state in items:
+                tasks.append(self.add(text, state))
+        rows = [[t.id, t.state, t.text] for t in tasks]
+        self._emit({"op": "add_many", "tasks": rows}, tasks)
+        return tasks
+
+    def edit(self, task_id, text):
+        task = self.tasks[task_id]
+        task.text = text
+        self._emit({"op": "edit", "id": task_id, "text": text}, task)
+        return task
+
+    def schedule(self, task_id, priority=0, due=None):
+        task = self.tasks[task_id]
+        task.priority = priority
+        task.due = due
+        self._emit({"op": "schedule", "id": task_id, "priority": priority, "due": due}, task)
+        return task
+
+    def move(self, task_id, state, before=None, seq=None):
+        task = self.tasks[task_id]
+        if task.state == state:
+            return task
+        del self.states[task.state][task_id]
+        task.state = state
+        before = self._place(task, before, seq)
+        event = {"op": "move", "id": task_id, "state": state}
+        if before is not None:
+            event["before"] = before
+        self._emit(event, task)
+        return task
+
+    def delete(self, task_id):
+        task = self.tasks.pop(task_id)
+        del self.states[task.state][task_id]
+        self._emit({"op": "delete", "id": task_id}, task)
+        return task
+
+    def clear(self):
+        self.tasks.clear()
+        for tasks in self.states.values():
+            tasks.clear()
+        self.next_id = 1
+
+    # ---------- replay / snapshots ----------
+    def apply(self, event, notify=False):
+        # replay a recorded event (an "add" without an id gets a new one) and
+        # return the task it touched; listeners only hear about it with notify
+        with nullcontext() if notify else self.muted():
+            op = event["op"]
+            if op == "add":
+                return self.add(event["text"], event.get("state", "pending"), event.get("id"),
+                                event.get("priority", 0), event.get("due"), event.get("before"),
+                                event.get("seq"))
+            elif op == "add_many":
+                return [self.add(text, state, task_id) for task_id, state, text in event["tasks"]]
+            elif op == "edit":
+                return self.edit(event["id"], event["text"])
+            elif op == "move":
+                return self.move(event["id"], event["state"], event.get("before"),
+                                 event.get("seq"))
+            elif op == "schedule":
+                return self.schedule(event["id"], event.get("priority", 0), event.get("due"))
+            elif op == "delete":
+                return self.delete(event["id"])
+
+    def snapshot(self):
+        # [id, text] per task, or [id, text, priority, due] when scheduled
+        data = {"next_id": self.next_id}
+        for state in STATES:
+            data[state] = [[t.id, t.text, t.priority, t.due]
+                           if t.priority or t.due is not None else [t.id, t.text]
+                           for t in self.states[state].values()]
+        return data
+
+    def load_snapshot(self, data):
+        # accepts the snapshot() format as well as the original plain
+        # {"pending": ["text", ...], "completed": [...]} tasks.json
+        with self.muted():
+            self.clear()
+            for state in STATES:
+                for item in data.get(state, []):
+                    if isinstance(item, str):
+                        self.add(item, state, self.next_id)
+                    elif len(item) > 2:
+                        self.add(item[1], state, item[0], item[2], item[3])
+                    else:
+                        self.add(item[1], state, item[0])
+            self.next_id = max(self.next_id, int(data.get("next_id", 1)))
@@ -0,0 +1,199 @@
+# Undo / redo for the To-Do app.
+#
+# Each step is stored as one small store event that reverses it (the
+# inverse of an edit is an edit back to the old text, of a delete an add of
+# the same task with its id, text, state, schedule and position), never as
+# a copy of the task lists.  Undo reads the current state of the task it is
+# about to touch to build the matching redo event, then replays the inverse
+# through TaskStore.apply(notify=True).  Views and the journal therefore see
+# an ordinary edit/move/add/delete, and the journal appends one line for it,
+# so undo writes only that change.
+#
+# Memory is held to a budget in bytes, not to a number of steps.  Recent
+# steps are kept as dicts.  Every `block` older steps are packed into one
+# zlib-compressed checkpoint, and undo unpacks a checkpoint only when it
+# reaches it.  Past the budget the furthest redo steps go first, then the
+# oldest checkpoints, then the oldest steps.
+#
+# A delete or move remembers the task's seq, so undoing it puts the task
+# back in front of whatever followed it (TaskStore.task_after, O(n) for the
+# undo only; recording stays O(1)).  Only what the user does through the
+# history is recorded.  Imports and changes merged from other instances go
+# straight to the store, and a step whose task another instance has deleted
+# since is skipped.
+
+import json
+import sys
+import zlib
+from collections import deque
+
+BUDGET = 1 << 20         # bytes for undo + redo together
+BLOCK = 256              # steps per compressed checkpoint
+
+
+def inverse(store, event):
+    # the event that undoes `event`, from the store's state before it runs;
+    # None when it would change nothing
+    op = event["op"]
+    if op == "add":
+        return {"op": "delete", "id": event["id"]}
+    task = store.get(event["id"])            # KeyError: the task is gone
+    if op == "edit":
+        return {"op": "edit", "id": task.id, "text": task.text}
+    if op == "schedule":
+        return {"op": "schedule", "id": task.id, "priority": task.priority, "due": task.due}
+    if op == "move":
+        if task.state == event["state"]:
+            return None
+        return {"op": "move", "id": task.id, "state": task.state, "seq": task.seq}
+    if op == "delete":
+        undo = {"op": "add", "id": task.id, "state": task.state, "text": task.text,
+                "seq": task.seq}
+        if task.priority or task.due is not None:
+            undo["priority"] = task.priority
+            undo["due"] = task.due
+        return undo
+    raise ValueError(f"cannot undo {op!r}")
+
+
+def event_size(event):
+    # rough bytes held by one event dict and its values
+    return sys.getsizeof(event) + sum(sys.getsizeof(v) for v in event.values())
+
+
+class UndoHistory:
+    def __init__(self, store, budget=BUDGET, block=BLOCK):
+        self.store = store
+        self.budget = budget
+        self.block = block
+        self.undo_steps = deque()    # newest on the right
+        self.checkpoints = deque()   # (steps, compressed bytes), older than undo_steps
+        self.redo_steps = deque()
+        self.size = 0                # bytes, estimated for dicts and exact for checkpoints
+        self.packed = 0              # undo steps inside checkpoints
+        self.dropped = 0             # steps forgotten to stay within the budget
+
+    # ---------- recording ----------
+    def do(self, event):
+        # apply a user action (a store event; an "add" may leave out the id)
+        # and remember how to undo it
+        if event["op"] == "add":
+            task = self.store.apply(event, notify=True)
+            undo = {"op": "delete", "id": task.id}
+        else:
+            undo = inverse(self.store, event)
+            if undo is None:
+                return self.store.get(event["id"])
+            task = self.store.apply(event, notify=True)
+        self._clear_redo()
+        self._push_undo(undo)
+        return task
+
+    def _push_undo(self, event):
+        self.undo_steps.append(event)
+        self.size += event_size(event)
+        if len(self.undo_steps) >= 2 * self.block:
+            self._checkpoint()
+        self._trim()
+
+    def _checkpoint(self):
+        # pack the oldest `block` recent steps into one compressed block
+        steps = [self.undo_steps.popleft() for _ in range(self.block)]
+        data = zlib.compress(json.dumps(steps, separators=(",", ":")).encode())
+        self.size += sys.getsizeof(data) - sum(event_size(e) for e in steps)
+        self.checkpoints.append((len(steps), data))
+        self.packed += len(steps)
+
+    def _unpack(self):
+        count, data = self.checkpoints.pop()
+        steps = json.loads(zlib.decompress(data))
+        self.size += sum(event_size(e) for e in steps) - sys.getsizeof(data)
+        self.packed -= count
+        self.undo_steps.extendleft(reversed(steps))
+
+    def _trim(self):
+        while self.size > self.budget:
+            if self.redo_steps:
+                # the furthest redo step, the one the user is least likely to want
+                self.size -= event_size(self.redo_steps.popleft())
+                self.dropped += 1
+            elif self.checkpoints:
+                count, data = self.checkpoints.popleft()
+                self.size -= sys.getsizeof(data)
+                self.packed -= count
+                self.dropped += count
+            elif len(self.undo_steps) > 1:
+                self.size -= event_size(self.undo_steps.popleft())
+                self.dropped += 1
+            else:
+                break
+
+    def _clear_redo(self):
+        for event in self.redo_steps:
+            self.size -= event_size(event)
+        self.redo_steps.clear()
+
+    # ---------- undo / redo ----------
+    def can_undo(self):
+        return bool(self.undo_steps or self.checkpoints)
+
+    def can_redo(self):
+        return bool(self.redo_steps)
+
+    def __len__(self):
+        return len(self.undo_steps) + self.packed
+
+    def undo(self):
+        # the task the undone step touched, or None when there is nothing left
+        while self.can_undo():
+            if not self.undo_steps:
+                self._unpack()
+            event = self.undo_steps.pop()
+            self.size -= event_size(event)
+            task = self._replay(event, to_redo=True)
+            if task is not None:
+                return task
+        return None
+
+    def redo(self):
+        while self.redo_steps:
+            event = self.redo_steps.pop()
+            self.size -= event_size(event)
+            task = self._replay(event, to_redo=False)
+            if task is not None:
+                return task
+        return None
+
+    def _replay(self, event, to_redo):
+        # apply a stored step and push its own inverse onto the other stack;
+        # None when the task is gone
+        if "seq" in event:
+            # the position it had, as the task now standing there; the store
+            # writes out only that, the seq is for this store alone
+            event = dict(event)
+            event["before"] = self.store.task_after(event["state"], event["seq"])
+        try:
+            back = inverse(self.store, event)
+            task = self.store.apply(event, notify=True)
+        except KeyError:
+            return None
+        if back is None:
+            return task            # another instance already made this change
+        if to_redo:
+            self.redo_steps.append(back)
+            self.size += event_size(back)
+            self._trim()
+        else:
+            self._push_undo(back)
+        return task
+
+    def clear(self):
+        self.undo_steps.clear()
+        self.checkpoints.clear()
+        self.redo_steps.clear()
+        self.size = self.packed = self.dropped = 0
+
+    def summary(self):
+        return (f"undo history: {len(self)} steps ({self.packed} in {len(self.checkpoints)} "
+                f"checkpoints), {len(self.redo_steps)} redo, {self.size / 1024:.0f} of "
+                f"{self.budget / 1024:.0f} KiB, {self.dropped} dropped")
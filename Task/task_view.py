@@ -0,0 +1,249 @@
+# Virtualized task list for the To-Do app.
+#
+# Covers the subset of tkinter.Listbox that To_Do_List.py uses
+# (insert/delete/get/size/curselection), but the rows live in a Python list
+# and only the rows inside the viewport exist as Canvas items.  Rows can be
+# any object; text_of(row) gives the string to draw (Task.text in the app).
+# Scrolling and every mutation redraw a fixed pool of rows, so the cost is
+# O(visible rows) no matter how many tasks are loaded.  set_model() shows a
+# live read-only sequence (e.g. a sorted index) without copying it.
+#
+# index_of() finds a row through a map from row to index.  Appends keep it
+# up to date; an insert or delete in the middle only marks the rows from
+# there on as stale, and the next lookup past that point re-maps them.
+
+from tkinter import Frame, Canvas, END
+from tkinter import ttk
+import tkinter.font as tkfont
+
+# Like Listbox(exportselection=True): selecting in one list clears the
+# selection of the list that owned it before.
+_selection_owner = None
+
+
+class VirtualList(Frame):
+    def __init__(self, parent, font=("Segoe UI", 12), bg="#2b2b2b", fg="white",
+                 selectbackground="#6fa8dc", selectforeground="white", padding=4,
+                 text_of=str):
+        super().__init__(parent, bg=bg)
+        self.items = []
+        self.rows_at = {}      # id(row) -> index, right for rows before self.mapped
+        self.mapped = 0        # None: a set_model() sequence, which has its own index()
+        self.text_of = text_of
+        self.top = 0           # index of the first visible row
+        self.selected = None
+        self.selected_item = None
+        self.fg = fg
+        self.bg = bg
+        self.selectbackground = selectbackground
+        self.selectforeground = selectforeground
+        self.font = tkfont.Font(font=font)
+        self.row_h = self.font.metrics("linespace") + padding
+        self.padding = padding
+
+        self.canvas = Canvas(self, bg=bg, highlightthickness=0, bd=0)
+        self.scroll = ttk.Scrollbar(self, orient="vertical", command=self._on_scrollbar)
+        self.scroll.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self._rows = []        # pool of (rect_id, text_id), one per visible line
+        self.canvas.bind("<Configure>", self._on_resize)
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Button-4>", lambda e: self.yview_scroll(-3))
+        self.canvas.bind("<Button-5>", lambda e: self.yview_scroll(3))
+
+    # ---------- Listbox-compatible API ----------
+    def size(self):
+        return len(self.items)
+
+    def get(self, first, last=None):
+        if last is None:
+            return self.items[first]
+        end = len(self.items) if last == END else last + 1
+        return tuple(self.items[first:end])
+
+    def insert(self, index, text):
+        if index == END or index >= len(self.items):
+            self._map_append(text)
+            self.items.append(text)
+        else:
+            self.items.insert(index, text)
+            self._stale_from(index)
+            if self.selected is not None and self.selected >= index:
+                self.selected += 1
+        self.redraw()
+
+    def delete(self, index):
+        self.rows_at.pop(id(self.items[index]), None)
+        del self.items[index]
+        self._stale_from(index)
+        if self.selected is not None:
+            if self.selected == index:
+                self.selected = None
+                self.selected_item = None
+            elif self.selected > index:
+                self.selected -= 1
+        self._clamp_top()
+        self.redraw()
+
+    def extend(self, items):
+        for item in items:
+            self._map_append(item)
+            self.items.append(item)
+        self.redraw()
+
+    def _stale_from(self, index):
+        if self.mapped is not None:
+            self.mapped = min(self.mapped, index)
+
+    def _map_append(self, item):
+        if self.mapped == len(self.items):
+            self.rows_at[id(item)] = self.mapped
+            self.mapped += 1
+
+    def index_of(self, item):
+        # the selected row is almost always the one being changed
+        if self.selected is not None and self.items[self.selected] is item:
+            return self.selected
+        if self.mapped is None:
+            return self.items.index(item)
+        i = self.rows_at.get(id(item))
+        if i is not None and i < self.mapped and self.items[i] is item:
+            return i
+        # re-map the stale rows until the item turns up
+        while self.mapped < len(self.items):
+            row = self.items[self.mapped]
+            self.rows_at[id(row)] = self.mapped
+            self.mapped += 1
+            if row is item:
+                return self.mapped - 1
+        raise ValueError(f"{item!r} is not in the list")
+
+    def remove_item(self, item):
+        self.delete(self.index_of(item))
+
+    def set_items(self, items):
+        # bulk load: no per-row widget work at all (rows are mapped on lookup)
+        self.items = list(items)
+        self.rows_at = {}
+        self.mapped = 0
+        self.selected = None
+        self.selected_item = None
+        self.top = 0
+        self.redraw()
+
+    def set_model(self, items):
+        # show `items` as they are; the owner changes them in place and calls
+        # refresh() instead of insert()/delete()
+        self.items = items
+        self.rows_at = {}
+        self.mapped = None
+        self.selected = None
+        self.selected_item = None
+        self.top = 0
+        self.redraw()
+
+    def refresh(self):
+        # the model changed underneath: follow the selected item to its new row
+        if self.selected is not None:
+            try:
+                self.selected = self.items.index(self.selected_item)
+            except ValueError:
+                self.selected = None
+        self._clamp_top()
+        self.redraw()
+
+    def curselection(self):
+        return () if self.selected is None else (self.selected,)
+
+    def selection_set(self, index):
+        global _selection_owner
+        if _selection_owner is not None and _selection_owner is not self:
+            _selection_owner.selection_clear()
+        _selection_owner = self
+        self.selected = index
+        self.selected_item = self.items[index]
+        self.see(index)
+        self.redraw()
+
+    def selection_clear(self, *args):
+        if self.selected is not None:
+            self.selected = None
+            self.selected_item = None
+            self.redraw()
+
+    def see(self, index):
+        visible = self._visible_count()
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + visible:
+            self.top = index - visible + 1
+        self._clamp_top()
+
+    def yview_scroll(self, rows):
+        self.top += rows
+        self._clamp_top()
+        self.redraw()
+
+    # ---------- drawing ----------
+    def _visible_count(self):
+        height = max(self.canvas.winfo_height(), 1)
+        return max(height // self.row_h, 1)
+
+    def _clamp_top(self):
+        max_top = max(len(self.items) - self._visible_count(), 0)
+        self.top = min(max(self.top, 0), max_top)
+
+    def _on_resize(self, event):
+        needed = event.height // self.row_h + 1
+        while len(self._rows) < needed:
+            y = len(self._rows) * self.row_h
+            rect = self.canvas.create_rectangle(0, y, 0, y + self.row_h, width=0, fill=self.bg)
+            text = self.canvas.create_text(self.padding, y + self.row_h // 2, anchor="w",
+                                           font=self.font, fill=self.fg)
+            self._rows.append((rect, text))
+        for rect, _ in self._rows:
+            x0, y0, _, y1 = self.canvas.coords(rect)
+            self.canvas.coords(rect, 0, y0, event.width, y1)
+        self._clamp_top()
+        self.redraw()
+
+    def redraw(self):
+        n = len(self.items)
+        for i, (rect, text) in enumerate(self._rows):
+            idx = self.top + i
+            if idx < n:
+                sel = idx == self.selected
+                self.canvas.itemconfig(rect, fill=self.selectbackground if sel else self.bg,
+                                       state="normal")
+                self.canvas.itemconfig(text, text=self.text_of(self.items[idx]), state="normal",
+                                       fill=self.selectforeground if sel else self.fg)
+            else:
+                self.canvas.itemconfig(rect, state="hidden")
+                self.canvas.itemconfig(text, state="hidden")
+        if n:
+            visible = self._visible_count()
+            self.scroll.set(self.top / n, min((self.top + visible) / n, 1.0))
+        else:
+            self.scroll.set(0.0, 1.0)
+
+    # ---------- events ----------
+    def _on_click(self, event):
+        idx = self.top + event.y // self.row_h
+        if idx < len(self.items):
+            self.selection_set(idx)
+
+    def _on_wheel(self, event):
+        self.yview_scroll(-3 if event.delta > 0 else 3)
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.items))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if args[2] == "pages":
+                step *= self._visible_count()
+            self.top += step
+        self._clamp_top()
+        self.redraw()
@@ -0,0 +1,162 @@
+# Background persistence for the To-Do app.
+#
+# The GUI thread only pushes store events onto a queue.  A writer thread
+# collects them until no new event arrived for `debounce` seconds (or
+# `max_delay` passed since the first one) and hands the whole burst to the
+# backend as one write.  While idle it polls the backend for changes made by
+# other instances.  Errors and those remote changes are kept in queues the
+# GUI polls, because Tk must not be touched from the writer thread.
+
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+from task_store import TaskStore
+
+_STOP = object()
+
+
+class _Flush:
+    def __init__(self):
+        self.done = threading.Event()
+
+
+class BackgroundWriter:
+    def __init__(self, backend, debounce=0.25, max_delay=2.0, poll_interval=0.5):
+        self.backend = backend
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.queue = queue.Queue()
+        self.errors = queue.Queue()
+        self.remote = queue.Queue()
+        self.shadow = None
+        self._thread = None
+        self._suspended = False
+        # metrics
+        self.mutations = 0
+        self.batches = 0
+        self.submit_time = 0.0   # seconds spent in submit() on the GUI thread
+        self.write_time = 0.0    # seconds spent writing on the writer thread
+
+    def start(self, store):
+        # the journal snapshots its store on compaction; give it a private
+        # copy that only the writer thread touches
+        if hasattr(self.backend, "use_shadow"):
+            self.shadow = TaskStore()
+            self.shadow.load_snapshot(store.snapshot())
+            self.backend.use_shadow(self.shadow)
+        if hasattr(self.backend, "on_remote"):
+            self.backend.on_remote = self.remote.put
+        self._thread = threading.Thread(target=self._run, name="task-writer", daemon=True)
+        self._thread.start()
+
+    # ---------- GUI thread ----------
+    def submit(self, event, task=None):
+        if self._suspended:
+            return
+        t0 = time.perf_counter()
+        self.queue.put(event)
+        self.submit_time += time.perf_counter() - t0
+
+    @contextmanager
+    def suspended(self):
+        # store changes made inside this block are not written (used when
+        # merging changes that came from the file in the first place)
+        self._suspended = True
+        try:
+            yield
+        finally:
+            self._suspended = False
+
+    def poll_remote(self):
+        records = []
+        while True:
+            try:
+                records.extend(self.remote.get_nowait())
+            except queue.Empty:
+                return records
+
+    def poll_errors(self):
+        errors = []
+        while True:
+            try:
+                errors.append(self.errors.get_nowait())
+            except queue.Empty:
+                return errors
+
+    def flush(self, timeout=10.0, wait=True):
+        # write out everything queued so far and compact the backend
+        if self._thread is None:
+            self.backend.compact()
+            return True
+        marker = _Flush()
+        self.queue.put(marker)
+        return marker.done.wait(timeout) if wait else True
+
+    def close(self, timeout=10.0):
+        # flush whatever is queued, then close the backend
+        if self._thread is not None:
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+        self.backend.close()
+
+    def saved_per_mutation(self):
+        # GUI-thread time a synchronous save would have cost, minus what
+        # submit() actually cost, averaged per mutation
+        if not self.mutations:
+            return 0.0
+        return (self.write_time - self.submit_time) / self.mutations
+
+    def summary(self):
+        return (f"{self.mutations} mutations in {self.batches} writes, "
+                f"UI time saved per mutation: {self.saved_per_mutation() * 1000:.3f} ms")
+
+    # ---------- writer thread ----------
+    def _run(self):
+        stop = False
+        can_poll = hasattr(self.backend, "poll")
+        while not stop:
+            try:
+                item = self.queue.get(timeout=self.poll_interval if can_poll else None)
+            except queue.Empty:
+                self._guard(self.backend.poll)
+                continue
+            batch = []
+            deadline = time.monotonic() + self.max_delay
+            while True:
+                if item is _STOP:
+                    stop = True
+                    break
+                if isinstance(item, _Flush):
+                    self._write(batch)
+                    batch = []
+                    self._guard(self.backend.compact)
+                    item.done.set()
+                else:
+                    batch.append(item)
+                timeout = min(self.debounce, deadline - time.monotonic())
+                if timeout <= 0:
+                    break
+                try:
+                    item = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            self._write(batch)
+
+    def _write(self, batch):
+        if not batch:
+            return
+        t0 = time.perf_counter()
+        self._guard(self.backend.append_many, batch)
+        self.write_time += time.perf_counter() - t0
+        self.mutations += len(batch)
+        self.batches += 1
+
+    def _guard(self, func, *args):
+        try:
+            func(*args)
+        except Exception as e:
+            self.errors.put(e)
@@ -0,0 +1,66 @@
+import random
+
+from RockPaperScissor import AnimationClock
+
+
+class FakeWidget:
+    # after()/after_cancel() without Tk: timers wait in a dict until run_due()
+    def __init__(self):
+        self.timers = {}
+        self.next_id = 0
+
+    def after(self, ms, func):
+        self.next_id += 1
+        job = f"after#{self.next_id}"
+        self.timers[job] = func
+        return job
+
+    def after_cancel(self, job):
+        self.timers.pop(job, None)
+
+    def run_due(self):
+        for job in list(self.timers):
+            self.timers.pop(job)()
+
+
+def test_pending_timers_stay_bounded_over_10000_rounds():
+    rng = random.Random(0)
+    widget = FakeWidget()
+    clock = AnimationClock(widget, interval=60, budget=1000)
+    home, game, result = object(), object(), object()
+    frames = {"pulse": 0}
+
+    def pulse():
+        frames["pulse"] += 1
+        return None
+
+    def bounded():
+        assert clock.pending() <= 1
+        assert len(widget.timers) <= 1
+
+    clock.set_active(home)
+    for _ in range(10_000):
+        # a round: the game page, then the result page pulsing, then back
+        clock.set_active(game)
+        bounded()
+        clock.register(result, "pulse", pulse)     # re-registered every round
+        clock.set_active(result)
+        bounded()
+        for _ in range(rng.randint(0, 3)):
+            widget.run_due()
+            bounded()
+        if rng.random() < 0.1:
+            # a one-shot animation that ends itself
+            clock.register(result, "flash", lambda: False)
+            widget.run_due()
+            bounded()
+        clock.set_active(game if rng.random() < 0.9 else None)
+        bounded()
+        widget.run_due()
+        bounded()
+
+    assert frames["pulse"] > 0
+    # nothing to animate on the raised page: the timer stops altogether
+    clock.set_active(home)
+    widget.run_due()
+    assert clock.pending() == 0 and not widget.timers
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+from calc_expr import MAX_HEIGHT, CalcError, Calculator
+
+
+def test_operators_and_functions():
+    calc = Calculator()
+    assert calc.evaluate("(3+4)*2^10 / sqrt(16)") == 1792.0
+    assert calc.evaluate("-2^2") == -4.0
+    assert calc.evaluate("round(2.567, 2)") == 2.57
+    calc.evaluate("f(a, b) = a^2 + b")
+    assert calc.evaluate("f(3, 1)") == 10.0
+
+
+def test_integer_functions_return_floats():
+    calc = Calculator()
+    for text in ("floor(2.5)", "ceil(2.5)", "round(2.5)", "round(7)"):
+        assert type(calc.evaluate(text)) is float
+
+
+def test_huge_integer_power_is_refused_quickly():
+    calc = Calculator()
+    t0 = time.perf_counter()
+    for text in ("round(9)^round(99999999)", "floor(9.5)^ceil(99999999.2)",
+                 "x = round(9)", "x^round(99999999)"):
+        try:
+            calc.evaluate(text)
+        except CalcError as e:
+            assert "too large" in str(e)
+    assert time.perf_counter() - t0 < 1.0
+
+
+def test_long_chain_is_a_calc_error():
+    calc = Calculator()
+    assert calc.evaluate("+".join(["1"] * MAX_HEIGHT)) == MAX_HEIGHT
+    with pytest.raises(CalcError):
+        calc.evaluate("1" + "+1" * 3000)
+    with pytest.raises(CalcError):
+        calc.evaluate("-" * 3000 + "1")
+
+
+def test_runaway_user_recursion_is_a_calc_error():
+    calc = Calculator()
+    calc.evaluate("f(a) = f(a) + 1")
+    with pytest.raises(CalcError):
+        calc.evaluate("f(1)")
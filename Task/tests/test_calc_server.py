@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import threading
+import types
+
+import pytest
+
+import calc_server
+from calc_server import CalcServer, answer, respond
+
+
+def test_answers_like_the_menu():
+    assert answer('{"id": 1, "op": "/", "a": 8, "b": 2}') == {"id": 1, "result": 4.0}
+    assert answer('{"op": "divide", "a": 1, "b": 0}') == {"error": "Error: Cannot divide by zero!"}
+
+
+def test_huge_integer_is_a_bad_request():
+    reply = answer(json.dumps({"id": 2, "op": "+", "a": 10 ** 400, "b": 1}))
+    assert reply["id"] == 2 and reply["error"].startswith("bad request")
+
+
+@pytest.mark.parametrize("a, b", [(1e308, 10), ("inf", 1), ("nan", 1)])
+def test_non_finite_results_are_errors(a, b):
+    line = respond(json.dumps({"op": "*", "a": a, "b": b}))
+    reply = json.loads(line)               # strict JSON: no Infinity / NaN
+    assert "error" in reply and "result" not in reply
+
+
+def test_nan_id_is_a_bad_request():
+    assert json.loads(respond('{"id": NaN, "op": "+", "a": 1, "b": 2}')) == {"error": "bad request"}
+
+
+@pytest.fixture
+def live_server(tmp_path):
+    # a CalcServer on a unix socket, run by an event loop in a thread
+    path = str(tmp_path / "calc.sock")
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    stop = asyncio.Event()
+
+    async def run():
+        server = await asyncio.start_unix_server(CalcServer().handle, path)
+        ready.set()
+        async with server:
+            await stop.wait()
+        await asyncio.sleep(0.05)          # let the connection handler finish
+
+    thread = threading.Thread(target=loop.run_until_complete, args=(run(),), daemon=True)
+    thread.start()
+    assert ready.wait(5)
+    yield path
+    loop.call_soon_threadsafe(stop.set)
+    thread.join(5)
+    loop.close()
+    if os.path.exists(path):
+        os.unlink(path)
+
+
+def test_bad_request_does_not_drop_pipelined_replies(live_server):
+    requests = [{"id": 1, "op": "+", "a": 1, "b": 2},
+                {"id": 2, "op": "+", "a": 10 ** 400, "b": 1},
+                {"id": 3, "op": "*", "a": 1e308, "b": 10},
+                {"id": 4, "op": "-", "a": 5, "b": 3}]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(live_server)
+        sock.sendall("".join(json.dumps(r) + "\n" for r in requests).encode())
+        with sock.makefile("rb") as f:
+            replies = [json.loads(f.readline()) for _ in requests]
+    assert [r["id"] for r in replies] == [1, 2, 3, 4]
+    assert replies[0]["result"] == 3.0 and replies[3]["result"] == 2.0
+    assert "error" in replies[1] and "error" in replies[2]
+
+
+@pytest.mark.parametrize("where", ["top", "bench", "default path"])
+def test_bench_uses_the_given_socket(where, live_server, monkeypatch, capsys):
+    if where == "default path":
+        monkeypatch.setattr(calc_server, "SOCKET", live_server)
+
+    def no_daemon(*args, **kwargs):
+        raise AssertionError("bench started a service of its own")
+    monkeypatch.setattr(calc_server, "subprocess",
+                        types.SimpleNamespace(run=subprocess.run, Popen=no_daemon))
+    args = ["bench", "--calls", "5", "--spawns", "1"]
+    if where == "top":
+        args = ["--socket", live_server] + args
+    else:
+        args += ["--socket", live_server]
+    assert calc_server.main(args) == 0
+    out = capsys.readouterr().out
+    single = out.split("one call a time:")[1].split()[0]
+    assert float(single.replace(",", "")) > 0          # fewer than 10 calls still time one
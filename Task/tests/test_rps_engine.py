@@ -0,0 +1,61 @@
+import itertools
+
+import pytest
+
+import rps_engine
+from rps_engine import MOVES, RESULTS, judge
+
+
+def old_judge(user, comp):
+    # GamePage.judge as it was before the engine existed
+    if user == comp:
+        return "tie"
+    wins = {
+        "rock": "scissors",
+        "scissors": "paper",
+        "paper": "rock"
+    }
+    return "win" if wins[user] == comp else "lose"
+
+
+PAIRS = list(itertools.product(MOVES, repeat=2))
+
+
+@pytest.mark.parametrize("user,comp", PAIRS)
+def test_judge_matches_the_old_judge(user, comp):
+    assert judge(user, comp) == old_judge(user, comp)
+
+
+def test_judge_codes_match_the_old_judge():
+    np = pytest.importorskip("numpy")
+    user = [rps_engine.CODE[u] for u, _ in PAIRS]
+    comp = [rps_engine.CODE[c] for _, c in PAIRS]
+    got = rps_engine.judge_codes(np.array(user), np.array(comp)).tolist()
+    assert [RESULTS[r] for r in got] == [old_judge(u, c) for u, c in PAIRS]
+
+
+def test_numpy_and_pure_python_paths_agree():
+    pytest.importorskip("numpy")
+    assert rps_engine.check(samples=20000, seed=3)
+    # simulate() against the same rounds judged one at a time
+    rounds, seed = 5000, 11
+    counts = rps_engine.simulate(rounds, seed=seed, block=1000).tolist()
+    stream = rps_engine.MoveStream(seed)
+    expected = [0, 0, 0]
+    for _ in range(rounds // 1000):
+        comp = stream.draw(1000).tolist()
+        user = stream.draw(1000).tolist()
+        for u, c in zip(user, comp):
+            expected[RESULTS.index(judge(MOVES[u], MOVES[c]))] += 1
+    assert counts == expected
+    fixed = rps_engine.simulate(rounds, seed=seed, user="rock").tolist()
+    assert sum(fixed) == rounds
+
+
+def test_move_stream_without_numpy(monkeypatch):
+    monkeypatch.setattr(rps_engine, "np", None)
+    stream = rps_engine.MoveStream(5, block=16)
+    moves = [stream.next() for _ in range(100)]
+    assert set(moves) <= {0, 1, 2} and len(set(moves)) == 3
+    again = rps_engine.MoveStream(5, block=16)
+    assert [again.next() for _ in range(100)] == moves
@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+import rps_server
+from rps_server import MAX_LINE, Server, encode
+
+
+class Client:
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, port, name, mode="pvp"):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port, limit=MAX_LINE)
+        client = cls(reader, writer)
+        await client.send({"op": "hello", "name": name, "mode": mode})
+        assert (await client.recv())["op"] == "welcome"
+        return client
+
+    async def send(self, msg):
+        self.writer.write(encode(msg))
+        await self.writer.drain()
+
+    async def recv(self):
+        line = await asyncio.wait_for(self.reader.readline(), 5)
+        return json.loads(line)
+
+    async def move(self, move):
+        await self.send({"op": "move", "move": move})
+
+    def close(self):
+        self.writer.close()
+
+
+def run(test, tmp_path, pair_timeout=30.0):
+    # `test(port)` against a server on a free port, all in this process
+    async def main():
+        server = Server(str(tmp_path / "scores.json"), pair_timeout=pair_timeout)
+        listener = await asyncio.start_server(server.handle, "127.0.0.1", 0, limit=MAX_LINE)
+        try:
+            await test(listener.sockets[0].getsockname()[1])
+        finally:
+            listener.close()
+            await listener.wait_closed()
+            for task in list(server.tasks):
+                task.cancel()
+    asyncio.run(main())
+
+
+def test_two_players_play_each_other(tmp_path):
+    async def test(port):
+        ann = await Client.connect(port, "ann")
+        bob = await Client.connect(port, "bob")
+        assert (await ann.recv())["opponent"] == "bob"
+        assert (await bob.recv())["opponent"] == "ann"
+        for rnd, (a, b, result) in enumerate([("rock", "scissors", "win"),
+                                               ("rock", "paper", "lose"),
+                                               ("paper", "paper", "tie")], 1):
+            await ann.move(a)
+            if rnd == 1:
+                # a second move before the round is judged is refused
+                await ann.move("paper")
+                assert (await ann.recv())["op"] == "error"
+            await bob.move(b)
+            mine, theirs = await ann.recv(), await bob.recv()
+            assert (mine["round"], mine["you"], mine["opponent"], mine["result"]) == \
+                (rnd, a, b, result)
+            assert (theirs["round"], theirs["you"], theirs["opponent"]) == (rnd, b, a)
+        assert mine["score"] == [1, 1, 1] and theirs["score"] == [1, 1, 1]
+        ann.close()
+        bob.close()
+    run(test, tmp_path)
+
+
+def test_bot_match(tmp_path):
+    async def test(port):
+        ann = await Client.connect(port, "ann", mode="bot")
+        assert (await ann.recv())["opponent"] == "bot:markov"
+        for rnd in range(1, 11):
+            await ann.move("rock")
+            msg = await ann.recv()
+            assert msg["op"] == "result" and msg["round"] == rnd
+        assert sum(msg["score"]) == 10
+        ann.close()
+    run(test, tmp_path)
+
+
+def test_disconnect_tells_the_opponent_and_pairs_them_again(tmp_path):
+    async def test(port):
+        ann = await Client.connect(port, "ann")
+        bob = await Client.connect(port, "bob")
+        await ann.recv()
+        await bob.recv()
+        await ann.move("rock")                 # left waiting for bob's move
+        bob.close()
+        assert (await ann.recv())["op"] == "opponent_left"
+        assert (await ann.recv())["opponent"].startswith("bot:")
+        await ann.move("paper")                # the unjudged move is forgotten
+        msg = await ann.recv()
+        assert (msg["op"], msg["round"], msg["you"]) == ("result", 1, "paper")
+        ann.close()
+    run(test, tmp_path, pair_timeout=0.1)
+
+
+def test_loadtest_with_no_rounds_reports_instead_of_crashing(tmp_path, capsys):
+    async def test(port):
+        assert await rps_server.loadtest("127.0.0.1", port, 2, 0, "bot") == 1
+    run(test, tmp_path)
+    assert "no round finished" in capsys.readouterr().out
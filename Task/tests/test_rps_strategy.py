@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from rps_strategy import MAX_COUNT, STRATEGIES, Strategy, load_strategy, save_strategy
+
+
+def test_a_strategy_without_choose_fails_when_built():
+    class Forgetful(Strategy):
+        name = "forgetful"
+
+    with pytest.raises(TypeError):
+        Forgetful(1)
+    with pytest.raises(TypeError):
+        Strategy(1)
+
+
+@pytest.mark.parametrize("name", sorted(STRATEGIES))
+def test_strategies_play_and_reload(name, tmp_path):
+    strategy = STRATEGIES[name](1)
+    for opponent in [0, 0, 1, 2] * 50:
+        own = strategy.choose()
+        assert own in (0, 1, 2)
+        strategy.observe(opponent, own)
+    path = str(tmp_path / "state.json")
+    save_strategy(strategy, path)
+    assert load_strategy(path, name).state() == strategy.state()
+
+
+@pytest.mark.parametrize("count", [-1, 70000, 10**30, float("inf")])
+def test_out_of_range_counts_are_clamped(count, tmp_path):
+    path = str(tmp_path / "rps_model.json")
+    strategy = STRATEGIES["markov"](1)
+    data = strategy.state()
+    data["counts"][0] = count
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    loaded = load_strategy(path)
+    assert 0 <= loaded.counts[0] <= MAX_COUNT    # or a fresh model, for infinity
+    loaded.choose()
+
+
+@pytest.mark.parametrize("text", ["{", "[]", '{"strategy": "markov", "order": 2, "counts": 5}'])
+def test_a_corrupt_model_file_starts_fresh(text, tmp_path):
+    path = str(tmp_path / "rps_model.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+    assert load_strategy(path).rounds == 0
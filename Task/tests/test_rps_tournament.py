@@ -0,0 +1,39 @@
+import io
+
+import pytest
+
+import rps_tournament
+
+
+@pytest.mark.parametrize("spec", ["random:2", "markov:x", "markov:-1", "markov:11",
+                                  "markov:100000", "nope"])
+def test_bad_specs_are_refused(spec, capsys):
+    with pytest.raises(SystemExit) as exc:
+        rps_tournament.main(["--players", spec, "markov", "--workers", "1"])
+    assert exc.value.code == 2
+    assert repr(spec) in capsys.readouterr().err
+
+
+def test_every_spec_that_passes_builds():
+    for spec in ["random", "markov", "markov:0", "markov:3", "markov:10"]:
+        assert rps_tournament.spec_error(spec) is None
+        rps_tournament.build(spec, 1).choose()
+
+
+def test_small_tournament(capsys):
+    args = ["--players", "random", "markov:1", "--matches", "3", "--rounds", "50",
+            "--workers", "1"]
+    assert rps_tournament.main(args) == 0
+    assert "markov:1" in capsys.readouterr().out
+
+
+def test_same_seed_same_table_for_any_worker_count():
+    players = ["random", "markov:1", "markov", "markov:3"]
+    tables, logs = [], []
+    for workers in (1, 2):
+        out = io.StringIO()
+        ranked = rps_tournament.run(players, 45, 200, 7, workers, out)
+        tables.append([(t.spec, t.n, t.wins, t.losses, t.ties, t.mean, t.m2) for t in ranked])
+        logs.append(out.getvalue())
+    assert tables[0] == tables[1]
+    assert logs[0] == logs[1]
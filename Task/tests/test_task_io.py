@@ -0,0 +1,66 @@
+import io
+
+import pytest
+
+import task_io
+from task_store import TaskStore
+
+
+def test_jsonl_strings_and_objects():
+    f = io.StringIO('"buy milk"\n\n{"text": "report", "state": "done"}\n{"text": "bike", "done": true}\n')
+    assert list(task_io.read_jsonl(f)) == [("buy milk", "pending"), ("report", "completed"),
+                                           ("bike", "completed")]
+
+
+@pytest.mark.parametrize("line", ["3", "[]", "null", "true", "not json"])
+def test_jsonl_rejects_other_values(line):
+    f = io.StringIO('"ok"\n' + line + "\n")
+    with pytest.raises(ValueError, match="line 2"):
+        task_io.run(task_io.import_batches(TaskStore(), f, "jsonl"))
+
+
+def test_csv_round_trip():
+    store = TaskStore()
+    store.add("buy milk, 2 litres")
+    store.move(store.add("report").id, "completed")
+    out = io.StringIO()
+    assert task_io.run(task_io.export_rows(store, out, "csv")) == 2
+    copy = TaskStore()
+    task_io.run(task_io.import_batches(copy, io.StringIO(out.getvalue()), "csv"))
+    assert sorted((t.text, t.state) for t in copy.tasks.values()) == \
+        [("buy milk, 2 litres", "pending"), ("report", "completed")]
+
+
+def test_command_line_reports_a_bad_file(tmp_path, capsys):
+    from task_journal import Journal
+    bad = tmp_path / "bad.jsonl"
+    bad.write_text('"fine"\n[]\n', encoding="utf-8")
+    journal = Journal(str(tmp_path / "tasks.json"))
+    assert task_io.main(["import", str(bad)], journal) == 1
+    assert "line 2" in capsys.readouterr().out
+    assert task_io.main(["import", str(tmp_path / "missing.csv")], Journal(str(tmp_path / "tasks.json"))) == 1
+
+
+@pytest.mark.parametrize("args", [["import", "x.csv", "--format"], ["export", "x.csv", "--state"],
+                                  ["import", "x.csv", "--format", "xml"],
+                                  ["import", "x.csv", "--state", "later"],
+                                  ["import"], ["delete", "x.csv"]])
+def test_command_line_rejects_bad_arguments(args, tmp_path, capsys):
+    from task_journal import Journal
+    journal = Journal(str(tmp_path / "tasks.json"))
+    with pytest.raises(SystemExit) as exc:
+        task_io.main(args, journal)
+    assert exc.value.code == 2
+    assert "usage:" in capsys.readouterr().err
+
+
+def test_command_line_format_and_state(tmp_path):
+    from task_journal import Journal
+    src = tmp_path / "tasks.txt"
+    src.write_text('"a"\n{"text": "b", "state": "pending"}\n', encoding="utf-8")
+    path = str(tmp_path / "tasks.json")
+    assert task_io.main(["import", str(src), "--format", "jsonl", "--state", "completed"],
+                        Journal(path)) == 0
+    store = Journal(path).load_readonly()
+    assert sorted((t.text, t.state) for t in store.tasks.values()) == [("a", "completed"),
+                                                                       ("b", "pending")]
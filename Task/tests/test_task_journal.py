@@ -0,0 +1,82 @@
+import multiprocessing
+import queue
+import random
+import time
+
+import pytest
+
+import task_journal
+from task_journal import Journal
+from task_store import TaskStore
+
+WORKERS = 6
+OPS = 300
+COMPACT_EVERY = 13       # compact often, so workers keep crossing generations
+
+
+def worker(path, seed, results):
+    # one app instance: its own store, a shadow the journal writes from (as
+    # BackgroundWriter sets it up), and random changes to its own tasks
+    # written in small bursts
+    rng = random.Random(seed)
+    journal = Journal(path, compact_every=COMPACT_EVERY)
+    store = journal.load(TaskStore())
+    store.id_block = lambda hint: journal.reserve_ids(hint, count=8)
+    shadow = TaskStore()
+    shadow.load_snapshot(store.snapshot())
+    journal.use_shadow(shadow)
+    burst = []
+    store.subscribe(lambda event, task: burst.append(event))
+    mine = {}
+    for i in range(OPS):
+        r = rng.random()
+        if r < 0.4 or not mine:
+            task = store.add(f"w{seed}-{i}")
+        elif r < 0.65:
+            task = store.edit(rng.choice(list(mine)), f"w{seed}-{i} edited")
+        elif r < 0.85:
+            task = store.get(rng.choice(list(mine)))
+            store.move(task.id, "completed" if task.state == "pending" else "pending")
+        else:
+            task = store.delete(rng.choice(list(mine)))
+            del mine[task.id]
+            task = None
+        if task is not None:
+            mine[task.id] = (task.text, task.state)
+        if len(burst) >= rng.randint(1, 5):
+            journal.append_many(burst)
+            burst.clear()
+    if burst:
+        journal.append_many(burst)
+    journal.close()
+    results.put(mine)
+
+
+@pytest.mark.skipif(task_journal.fcntl is None, reason="needs fcntl locks")
+def test_concurrent_writers_lose_nothing(tmp_path):
+    path = str(tmp_path / "tasks.json")
+    ctx = multiprocessing.get_context("fork")
+    results = ctx.Queue()
+    procs = [ctx.Process(target=worker, args=(path, seed, results)) for seed in range(WORKERS)]
+    for p in procs:
+        p.start()
+    written = []
+    deadline = time.monotonic() + 120
+    while len(written) < len(procs):
+        try:
+            written.append(results.get(timeout=0.5))
+        except queue.Empty:
+            crashed = [p.exitcode for p in procs if p.exitcode not in (None, 0)]
+            assert not crashed, f"a writer crashed: exit codes {crashed}"
+            assert time.monotonic() < deadline, "writers did not finish"
+    for p in procs:
+        p.join(30)
+        assert p.exitcode == 0
+
+    expected = {}
+    for mine in written:
+        assert not expected.keys() & mine.keys(), "two instances created the same id"
+        expected.update(mine)
+    store = Journal(path).load(TaskStore())
+    assert {t.id: (t.text, t.state) for t in store.tasks.values()} == expected
+    assert len(store.tasks) == sum(len(store.states[s]) for s in store.states)
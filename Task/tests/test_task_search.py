@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from task_search import SearchIndex, brute_force_search
+from task_store import TaskStore
+
+WORDS = ["buy", "butter", "milk", "mild", "report", "rep", "call", "calendar",
+         "mum", "müsli", "fix", "bike", "bik", "2024", "a"]
+
+
+def random_text(rng):
+    return " ".join(rng.choice(WORDS) for _ in range(rng.randint(0, 4))) + rng.choice(["", "!", ", ok"])
+
+
+def random_query(rng):
+    # prefixes of known words, whole words, words nothing has, several at once
+    words = []
+    for _ in range(rng.randint(0, 3)):
+        word = rng.choice(WORDS + ["zzz", "xy"])
+        words.append(word[:rng.randint(1, len(word))])
+    return rng.choice(["", " ", "  "]).join(words) if words else rng.choice(["", "  ", "!!"])
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_index_matches_brute_force(seed):
+    rng = random.Random(seed)
+    store = TaskStore()
+    store.add_many((random_text(rng), "pending") for _ in range(20))
+    index = SearchIndex(store)
+    for step in range(300):
+        ids = list(store.tasks)
+        r = rng.random()
+        if r < 0.3 or not ids:
+            store.add(random_text(rng), rng.choice(["pending", "completed"]))
+        elif r < 0.55:
+            store.edit(rng.choice(ids), random_text(rng))
+        elif r < 0.75:
+            task = store.get(rng.choice(ids))
+            store.move(task.id, "completed" if task.state == "pending" else "pending")
+        elif r < 0.9:
+            store.delete(rng.choice(ids))
+        else:
+            store.add_many((random_text(rng), "pending") for _ in range(rng.randint(1, 5)))
+        for _ in range(3):
+            query = random_query(rng)
+            assert index.search(query) == brute_force_search(store, query), (step, query)
+
+
+def test_rebuild_matches_incremental():
+    rng = random.Random(99)
+    store = TaskStore()
+    live = SearchIndex(store)
+    for _ in range(200):
+        store.add(random_text(rng))
+    for task_id in list(store.tasks)[::3]:
+        store.delete(task_id)
+    fresh = SearchIndex(store)
+    assert live.postings == fresh.postings
+    for word in WORDS:
+        assert live.search(word[:2]) == fresh.search(word[:2]) == brute_force_search(store, word[:2])
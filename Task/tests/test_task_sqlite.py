@@ -0,0 +1,47 @@
+import json
+
+from task_sqlite import SqliteStore
+from task_store import TaskStore
+
+
+def write_json(path, texts):
+    store = TaskStore()
+    for text in texts:
+        store.add(text)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(store.snapshot(), f)
+
+
+def texts(store):
+    return sorted(t.text for t in store.tasks.values())
+
+
+def test_migrates_into_an_empty_db(tmp_path):
+    json_path = str(tmp_path / "tasks.json")
+    write_json(json_path, ["a", "b"])
+    db = SqliteStore(str(tmp_path / "tasks.db"), json_path)
+    assert texts(db.load(TaskStore())) == ["a", "b"]
+    db.close()
+
+
+def test_populated_db_is_not_migrated_over(tmp_path, capsys):
+    # the ids in tasks.json are the same as the ones already in the db
+    json_path = str(tmp_path / "tasks.json")
+    write_json(json_path, ["old 1", "old 2"])
+    db_path = str(tmp_path / "tasks.db")
+    db = SqliteStore(db_path)
+    store = db.load(TaskStore())
+    store.subscribe(lambda event, task: db.append(event))
+    store.add("new 1")
+    store.add("new 2")
+    db.close()
+
+    db = SqliteStore(db_path, json_path)
+    assert texts(db.load(TaskStore())) == ["new 1", "new 2"]
+    assert "was not imported" in capsys.readouterr().err
+    db.close()
+    # warned once, not on every start
+    db = SqliteStore(db_path, json_path)
+    db.load(TaskStore())
+    assert capsys.readouterr().err == ""
+    db.close()
@@ -0,0 +1,153 @@
+import random
+
+import pytest
+
+from task_journal import Journal
+from task_sqlite import SqliteStore
+from task_store import TaskStore
+from task_undo import UndoHistory
+
+
+def lists(store):
+    return {state: [(t.id, t.text, t.priority, t.due) for t in store.tasks_in(state)]
+            for state in ("pending", "completed")}
+
+
+def make_store(n=10):
+    store = TaskStore()
+    for i in range(n):
+        store.add(f"task {i}")
+    return store
+
+
+def random_event(rng, store, i):
+    ids = list(store.tasks)
+    r = rng.random()
+    if r < 0.25 or not ids:
+        return {"op": "add", "state": rng.choice(["pending", "completed"]), "text": f"new {i}"}
+    task_id = rng.choice(ids)
+    if r < 0.45:
+        return {"op": "edit", "id": task_id, "text": f"edit {i}"}
+    if r < 0.6:
+        return {"op": "schedule", "id": task_id, "priority": rng.randint(0, 3),
+                "due": rng.choice([None, 1000.0 + i])}
+    if r < 0.8:
+        return {"op": "move", "id": task_id, "state": rng.choice(["pending", "completed"])}
+    return {"op": "delete", "id": task_id}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_undo_and_redo_across_checkpoints_restore_every_state(seed):
+    rng = random.Random(seed)
+    store = make_store()
+    history = UndoHistory(store, block=4)
+    states = [lists(store)]
+    for i in range(60):
+        steps = len(history)
+        history.do(random_event(rng, store, i))
+        if len(history) > steps:             # a move to the same state records nothing
+            states.append(lists(store))
+    assert history.checkpoints
+    for expected in reversed(states[:-1]):
+        assert history.undo() is not None
+        assert lists(store) == expected      # order included
+    assert not history.can_undo() and history.undo() is None
+    for expected in states[1:]:
+        assert history.redo() is not None
+        assert lists(store) == expected
+    assert not history.can_redo()
+
+
+def test_undo_puts_deleted_and_moved_tasks_back_in_place():
+    store = make_store(5)
+    history = UndoHistory(store)
+    before = lists(store)
+    history.do({"op": "delete", "id": 3})
+    history.do({"op": "move", "id": 2, "state": "completed"})
+    history.do({"op": "move", "id": 4, "state": "completed"})
+    history.undo()
+    history.undo()
+    history.undo()
+    assert lists(store) == before
+
+
+def test_restored_positions_reach_the_backends(tmp_path):
+    db = SqliteStore(str(tmp_path / "tasks.db"))
+    store = db.load(TaskStore())
+    store.subscribe(lambda event, task: db.append(event))
+    for i in range(5):
+        store.add(f"task {i}")
+    history = UndoHistory(store)
+    history.do({"op": "delete", "id": 2})
+    history.do({"op": "move", "id": 4, "state": "completed"})
+    history.undo()
+    history.undo()
+    db.close()
+    assert lists(SqliteStore(str(tmp_path / "tasks.db")).load(TaskStore())) == lists(store)
+
+    path = str(tmp_path / "tasks.json")
+    journal = Journal(path)
+    store = journal.load(TaskStore())
+    events = []
+    store.subscribe(lambda event, task: events.append(event))
+    for i in range(5):
+        store.add(f"task {i}")
+    history = UndoHistory(store)
+    history.do({"op": "delete", "id": 3})
+    history.undo()
+    journal.append_many(events)
+    journal.close()
+    assert lists(Journal(path).load_readonly()) == lists(store)
+
+
+def test_budget_drops_redo_then_oldest_checkpoints_then_oldest_steps():
+    store = make_store(1)
+    history = UndoHistory(store, budget=1 << 30, block=2)
+    for i in range(12):
+        history.do({"op": "edit", "id": 1, "text": f"edit {i}"})
+    history.undo()
+    assert history.can_redo() and len(history.checkpoints) >= 2
+    steps = len(history)
+
+    history.budget = history.size - 1
+    history._trim()
+    assert not history.can_redo() and history.dropped == 1
+    assert len(history) == steps
+
+    oldest = history.checkpoints[0]
+    history.budget = history.size - 1
+    history._trim()
+    assert history.checkpoints[0] is not oldest
+    assert len(history) == steps - oldest[0]
+
+    history.budget = 0
+    history._trim()
+    assert not history.checkpoints and len(history) == 1
+    assert history.dropped == 1 + 10
+    history.undo()                           # the newest step is the one kept
+    assert store.get(1).text == "edit 9"
+    assert history.undo() is None
+
+
+def test_steps_for_tasks_deleted_elsewhere_are_skipped():
+    store = make_store(2)
+    history = UndoHistory(store)
+    history.do({"op": "edit", "id": 1, "text": "one"})
+    history.do({"op": "edit", "id": 2, "text": "two"})
+    history.do({"op": "edit", "id": 1, "text": "uno"})
+    store.delete(1)                          # e.g. merged from another instance
+    assert history.undo().id == 2
+    assert store.get(2).text == "task 1"
+    assert history.undo() is None
+    assert not history.can_undo()
+
+
+def test_clear_resets_everything():
+    store = make_store(1)
+    history = UndoHistory(store, budget=400, block=2)
+    for i in range(20):
+        history.do({"op": "edit", "id": 1, "text": f"edit {i}"})
+    assert history.dropped
+    history.clear()
+    assert (len(history), history.size, history.dropped) == (0, 0, 0)
+    assert not history.can_undo() and not history.can_redo()
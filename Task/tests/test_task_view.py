@@ -0,0 +1,51 @@
+import random
+import tkinter as tk
+
+import pytest
+
+from task_view import VirtualList
+
+
+class Row:
+    def __init__(self, n):
+        self.n = n
+
+
+@pytest.fixture
+def view():
+    try:
+        root = tk.Tk()
+    except tk.TclError:
+        pytest.skip("needs a display")
+    root.withdraw()
+    view = VirtualList(root, text_of=lambda row: str(row.n))
+    yield view
+    root.destroy()
+
+
+def test_index_of_matches_a_scan(view):
+    rng = random.Random(1)
+    view.set_items([Row(i) for i in range(50)])
+    for step in range(5000):
+        r = rng.random()
+        if r < 0.3 or not view.items:
+            index = tk.END if rng.random() < 0.5 else rng.randrange(len(view.items) + 1)
+            view.insert(index, Row(step))
+        elif r < 0.45:
+            view.extend([Row(step) for _ in range(rng.randrange(3))])
+        elif r < 0.65:
+            view.remove_item(rng.choice(view.items))
+        else:
+            row = rng.choice(view.items)
+            assert view.index_of(row) == view.items.index(row)
+
+
+def test_delete_clears_the_selection(view):
+    rows = [Row(i) for i in range(5)]
+    view.set_items(rows)
+    view.selection_set(2)
+    view.remove_item(rows[2])
+    assert view.curselection() == () and view.selected_item is None
+    view.selection_set(3)
+    view.delete(0)
+    assert view.curselection() == (2,) and view.selected_item is rows[4]
@@ -0,0 +1,54 @@
+import tkinter as tk
+
+import pytest
+
+import tk_latency
+
+
+@pytest.fixture
+def latency(monkeypatch):
+    # install() patches tkinter for the whole process: undo it afterwards
+    monkeypatch.setattr(tk.Misc, "after", tk.Misc.after)
+    monkeypatch.setattr(tk.Misc, "_register", tk.Misc._register)
+    monkeypatch.setattr(tk.Variable, "_register", tk.Variable._register)
+    monkeypatch.setattr(tk_latency.atexit, "register", lambda func: None)
+    monkeypatch.setattr(tk_latency, "_mode", None)
+    monkeypatch.setattr(tk_latency, "_stats", {})
+    monkeypatch.setattr(tk_latency, "_folded", {})
+    assert tk_latency.install(["app.py", "--latency"], env={})
+    yield tk.Tcl()                         # no display needed
+
+
+def counts(kind):
+    return {name.rsplit(".", 1)[-1]: s.count
+            for (k, name), s in tk_latency._stats.items() if k == kind}
+
+
+def test_variable_traces_are_timed(latency):
+    var = tk.StringVar(latency)
+    seen = []
+
+    def apply_filter(*args):
+        seen.append(var.get())
+    name = var.trace_add("write", apply_filter)
+    for text in ("b", "bu", "buy"):
+        var.set(text)
+    assert seen == ["b", "bu", "buy"]
+    assert counts("trace") == {"apply_filter": 3}
+    var.trace_remove("write", name)
+    var.set("buy milk")
+    assert counts("trace") == {"apply_filter": 3}
+
+
+def test_timers_are_timed_with_lateness(latency):
+    ran = []
+
+    def tick():
+        ran.append(1)
+    latency.after(0, tick)
+    latency.after_idle(tick)
+    while len(ran) < 2:
+        latency.dooneevent()
+    assert counts("after") == {"tick": 1} and counts("idle") == {"tick": 1}
+    (stats,) = [s for (kind, _), s in tk_latency._stats.items() if kind == "after"]
+    assert stats.late is not None and stats.late.n == 1
@@ -0,0 +1,215 @@
+# Opt-in event-loop latency instrumentation for the Tk apps.
+#
+#   TK_LATENCY=1 python To_Do_List.py             summary + tk_latency.folded on exit
+#   TK_LATENCY=overlay python RockPaperScissor.py  live overlay in the window as well
+#   python RockPaperScissor.py --latency[=overlay] same, as a flag
+#
+# When enabled, every callback Tk runs (button commands, bindings,
+# protocol handlers, variable traces, after() and after_idle() timers) is
+# wrapped to record its wall time, and timers also record how late they ran
+# against the time they were scheduled for.  The last RING samples per
+# callback are kept in fixed-size arrays, with running totals beside them.
+# On exit a table goes to stderr and tk_latency.folded is written in the
+# "frame;frame value" format flamegraph.pl and speedscope read: self time
+# in microseconds per call path, so a callback run from inside another one
+# shows up nested under it.  When not enabled nothing is patched, so the only cost is
+# the install()/attach() calls at startup.
+
+import atexit
+import os
+import sys
+import time
+import tkinter as tk
+from array import array
+
+ENV = "TK_LATENCY"
+FLAG = "--latency"
+FOLDED_FILE = "tk_latency.folded"
+RING = 1024              # recent samples kept per callback
+OVERLAY_MS = 500
+OVERLAY_ROWS = 6
+
+_orig_after = tk.Misc.after
+_orig_register = tk.Misc._register
+_orig_var_register = tk.Variable._register     # trace_add() callbacks
+_stats = {}              # (kind, name) -> CallbackStats
+_folded = {}             # "tk;kind;name;kind;name" call path -> self time in seconds
+_active = []             # [path, time spent in nested callbacks] of running callbacks
+_mode = None             # None (off), "dump" or "overlay"
+_in_after = False        # after() registers its own Tcl command: don't wrap it twice
+
+
+class Ring:
+    def __init__(self, size=RING):
+        self.values = array("d", bytes(8 * size))
+        self.size = size
+        self.n = 0
+
+    def add(self, value):
+        self.values[self.n % self.size] = value
+        self.n += 1
+
+    def recent(self):
+        return sorted(self.values[:min(self.n, self.size)])
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return 0.0
+    return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+
+class CallbackStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.worst = 0.0
+        self.times = Ring()
+        self.late = None         # Ring of lateness, timers only
+
+    def add(self, seconds, late=None):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.worst:
+            self.worst = seconds
+        self.times.add(seconds)
+        if late is not None:
+            if self.late is None:
+                self.late = Ring()
+            self.late.add(late)
+
+
+def _name(func):
+    func = getattr(func, "__func__", func)
+    module = getattr(func, "__module__", None) or "?"
+    qual = getattr(func, "__qualname__", None) or type(func).__qualname__
+    return f"{module}.{qual}"
+
+
+def _timed(kind, func, args=(), due=None):
+    key = (kind, _name(func))
+    stats = _stats.get(key)
+    if stats is None:
+        stats = _stats[key] = CallbackStats()
+    clock = time.perf_counter
+    frame = f"{kind};{key[1].replace(';', ',')}"
+
+    def wrapper(*call_args):
+        # callbacks can run inside others (update(), event_generate(), a
+        # command invoked from a timer), so self time is kept per call path
+        start = clock()
+        entry = [f"{_active[-1][0] if _active else 'tk'};{frame}", 0.0]
+        _active.append(entry)
+        try:
+            return func(*args, *call_args)
+        finally:
+            elapsed = clock() - start
+            _active.pop()
+            if _active:
+                _active[-1][1] += elapsed
+            _folded[entry[0]] = _folded.get(entry[0], 0.0) + elapsed - entry[1]
+            stats.add(elapsed, None if due is None else max(start - due, 0.0))
+    wrapper.__name__ = getattr(func, "__name__", type(func).__name__)
+    return wrapper
+
+
+# ---------- patched tkinter methods ----------
+def _after(self, ms, func=None, *args):
+    global _in_after
+    if func is None:
+        return _orig_after(self, ms)
+    delay = 0 if ms == "idle" else ms
+    kind = "idle" if ms == "idle" else "after"
+    wrapped = _timed(kind, func, args, time.perf_counter() + delay / 1000)
+    _in_after = True
+    try:
+        return _orig_after(self, ms, wrapped)
+    finally:
+        _in_after = False
+
+
+def _register(self, func, subst=None, needcleanup=1):
+    if not _in_after:
+        func = _timed("command", func)
+    return _orig_register(self, func, subst, needcleanup)
+
+
+def _var_register(self, callback):
+    # variable traces are registered through Variable, not Misc
+    return _orig_var_register(self, _timed("trace", callback))
+
+
+def install(argv=None, env=None):
+    # patch tkinter when TK_LATENCY or --latency asks for it; the flag is
+    # removed from argv so the app's own argument handling never sees it
+    global _mode
+    mode = (os.environ if env is None else env).get(ENV, "")
+    if argv is not None:
+        for arg in list(argv[1:]):
+            if arg == FLAG or arg.startswith(FLAG + "="):
+                mode = arg.partition("=")[2] or "1"
+                argv.remove(arg)
+    if not mode or mode == "0" or _mode is not None:
+        return False
+    _mode = "overlay" if mode == "overlay" else "dump"
+    tk.Misc.after = _after
+    tk.Misc._register = _register
+    tk.Variable._register = _var_register
+    atexit.register(dump)
+    return True
+
+
+def attach(root):
+    # the live overlay, when asked for; nothing at all when not enabled
+    if _mode != "overlay":
+        return
+    label = tk.Label(root, justify="left", anchor="nw", font=("Courier", 9),
+                     bg="#000000", fg="#9eff9e")
+    label.place(relx=1.0, x=-6, y=6, anchor="ne")
+
+    def refresh():
+        label.configure(text=overlay_text())
+        label.lift()
+        _orig_after(root, OVERLAY_MS, refresh)     # not measured itself
+    refresh()
+
+
+# ---------- reports ----------
+def rows():
+    # (kind, name, stats) ordered by the slowest recent p99
+    return sorted(((kind, name, s) for (kind, name), s in _stats.items() if s.count),
+                  key=lambda r: -percentile(r[2].times.recent(), 0.99))
+
+
+def overlay_text():
+    lines = [f"{'callback':<28}{'p99':>7}{'max':>7}{'late':>7} ms"]
+    for kind, name, s in rows()[:OVERLAY_ROWS]:
+        late = percentile(s.late.recent(), 0.99) * 1000 if s.late else 0.0
+        lines.append(f"{name.split('.', 1)[-1][-28:]:<28}"
+                     f"{percentile(s.times.recent(), 0.99) * 1000:>7.1f}"
+                     f"{s.worst * 1000:>7.1f}{late:>7.1f}")
+    return "\n".join(lines)
+
+
+def folded_lines():
+    for path, seconds in sorted(_folded.items()):
+        yield f"{path} {max(int(seconds * 1e6), 1)}"
+
+
+def dump(path=FOLDED_FILE, out=None):
+    out = sys.stderr if out is None else out
+    if not any(s.count for s in _stats.values()):
+        return
+    print(f"\n{'kind':<8}{'callback':<52}{'calls':>8}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'max ms':>9}{'late p99':>10}", file=out)
+    for kind, name, s in rows():
+        recent = s.times.recent()
+        late = f"{percentile(s.late.recent(), 0.99) * 1000:>10.1f}" if s.late else f"{'':>10}"
+        print(f"{kind:<8}{name[-51:]:<52}{s.count:>8}{percentile(recent, 0.5) * 1000:>9.2f}"
+              f"{percentile(recent, 0.99) * 1000:>9.2f}{s.worst * 1000:>9.2f}{late}", file=out)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(folded_lines()) + "\n")
+        print(f"profile written to {path} (flamegraph.pl / speedscope folded format)", file=out)
+    except OSError as e:
+        print("Could not write the profile:", e, file=out)